@@ -94,6 +94,8 @@ document.addEventListener('DOMContentLoaded', () => {
     // Logout
     if (logoutButton) {
         logoutButton.addEventListener('click', () => {
+            // Clear the HttpOnly session token cookie on the server
+            fetch('/api/vanna/v2/logout', { method: 'POST' }).catch(() => {});
             deleteCookie('vanna_user');
             deleteCookie('vanna_groups');
             deleteCookie('vanna_auth');
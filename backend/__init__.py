@@ -14,6 +14,7 @@ Quick Start:
 Configuration:
     Set environment variables or create a .env file:
     - ORACLE_USER, ORACLE_PASSWORD, ORACLE_DSN
+    - ORACLE_POOL_MIN, ORACLE_POOL_MAX, ORACLE_POOL_INCREMENT, etc.
     - OLLAMA_MODEL, OLLAMA_HOST
     - MILVUS_HOST, MILVUS_PORT, MILVUS_COLLECTION
     - VANNA_HOST, VANNA_PORT
@@ -25,12 +26,31 @@ Modules:
     - server.py: Custom Flask server with LDAP authentication
     - auth.py: Hybrid LDAP + database role authentication
     - agent_factory.py: Agent creation and configuration
+    - db_pool.py: Shared Oracle connection pools (sync and async)
+    - executor.py: Bounded per-dependency executor for blocking I/O
+    - metrics.py: Runtime metrics registry
+    - user_directory.py: In-memory AI_USERS directory for roles and RLS values
+    - catalog_index.py: Bulk USER_TAB_COLUMNS index for RLS table metadata
+    - rls_rewriter.py: Single-pass RLS query rewriter
+    - rls_vpd.py: Oracle VPD (DBMS_RLS) policies and session context for RLS
+    - result_cache.py: Byte-budgeted run_sql result cache with table invalidation
+    - single_flight.py: Deduplication of identical concurrent calls
+    - result_fetch.py: Bounded fetch of run_sql results into Arrow tables
+    - result_store.py: Server-side store of run_sql results for paged access
+    - result_export.py: Streaming CSV/Parquet/NDJSON export of stored results
+    - result_files.py: Memory-mapped Arrow IPC result files and on-demand CSV
+    - result_encoding.py: Single-pass encoding of run_sql results (LLM preview, UI rows)
+    - result_profile.py: Vectorized per-column profile of run_sql results for the LLM
+    - query_timeout.py: Per-role run_sql time limits and query cancellation
+    - plan_gate.py: EXPLAIN PLAN cost gate for run_sql queries
+    - approx_query.py: Approximate answers (SAMPLE, APPROX_* functions) with error bounds
 """
 
 from .config import (
     config,
     AppConfig,
     OracleConfig,
+    OraclePoolConfig,
     OllamaConfig,
     OpenAIConfig,
     MilvusConfig,
@@ -40,6 +60,9 @@ from .config import (
 from .main import main
 from .server import VannaFlaskServer
 from .auth import HybridUserResolver
+from .db_pool import OraclePool, AsyncOraclePool
+from .executor import BlockingExecutor
+from .user_directory import UserDirectory
 from .agent_factory import create_agent
 
 __all__ = [
@@ -47,6 +70,7 @@ __all__ = [
     "config",
     "AppConfig",
     "OracleConfig",
+    "OraclePoolConfig",
     "OllamaConfig",
     "OpenAIConfig",
     "MilvusConfig",
@@ -56,6 +80,10 @@ __all__ = [
     "main",
     "VannaFlaskServer",
     "HybridUserResolver",
+    "OraclePool",
+    "AsyncOraclePool",
+    "BlockingExecutor",
+    "UserDirectory",
     "create_agent",
 ]
 
@@ -5,11 +5,11 @@ This module provides the factory function for creating and configuring
 the Vanna Agent with all required services, tools, and integrations.
 """
 
+from typing import Optional
+
 from vanna import Agent, AgentConfig
 from vanna.core.registry import ToolRegistry
-from vanna.tools import VisualizeDataTool
 from vanna.tools.file_system import WriteFileTool
-from vanna.integrations.local import LocalFileSystem
 from vanna.tools.agent_memory import (
     SaveQuestionToolArgsTool,
     SearchSavedCorrectToolUsesTool,
@@ -22,6 +22,22 @@ from vanna.integrations.milvus import MilvusAgentMemory
 
 from .config import config
 from .auth import HybridUserResolver
+from .db_pool import OraclePool, AsyncOraclePool
+from .executor import BlockingExecutor
+from .session_tokens import SessionTokenSigner
+from .user_directory import UserDirectory
+from .catalog_index import ColumnIndex
+from .result_cache import ResultCache
+from .result_fetch import FetchLimits
+from .result_store import ResultStore
+from .result_export import ResultExporter
+from .result_files import ResultFileSystem
+from .result_encoding import PreviewLimits
+from .result_profile import ProfileLimits
+from .approx_query import ApproximateAnswers, ApproxLimits
+from .plan_gate import PlanGate, PlanLimits
+from .query_timeout import QueryTimeouts
+from .metrics import register_metrics_source
 from .rls_service import RowLevelSecurityService, RLSConfig
 from .secure_sql_tool import SecureRunSqlTool
 from .system_prompt_builder import UserAwareSystemPromptBuilder
@@ -29,18 +45,71 @@ from .schema_trainer import SchemaTrainer
 from .gather_schema_tool import GatherSchemaTool
 from .cleanup_memory_tool import CleanupMemoryTool
 from .discover_tables_tool import ListAllTablesTool
+from .sql_version_report_tool import SqlVersionReportTool
+from .visualize_data_tool import ArrowVisualizeDataTool
+
+
+def create_result_store() -> Optional[ResultStore]:
+    """Create the server-side store that keeps run_sql results for paging.
+    
+    The same store is passed to create_agent() (run_sql stores results) and
+    to the server (/api/results serves their pages).
+    
+    Returns:
+        ResultStore, or None when RESULT_STORE_ENABLED is false.
+    """
+    if not config.result_store.enabled:
+        return None
+    
+    result_store = ResultStore(
+        ttl=config.result_store.ttl,
+        max_bytes=int(config.result_store.max_mb * 1024 * 1024),
+        page_size=config.result_store.page_size,
+        max_page_size=config.result_store.max_page_size
+    )
+    register_metrics_source("result_store", result_store.stats)
+    
+    print(
+        f"Result store: {config.result_store.max_mb}MB, TTL={config.result_store.ttl}s, "
+        f"first page {config.result_store.page_size} rows"
+    )
+    
+    return result_store
+
+
+def create_result_exporter() -> Optional[ResultExporter]:
+    """Create the exporter that streams stored run_sql results for download.
+    
+    Returns:
+        ResultExporter, or None when RESULT_STORE_ENABLED is false (exports
+        re-run the queries of stored results).
+    """
+    if not config.result_store.enabled:
+        return None
+    
+    result_exporter = ResultExporter(
+        batch_rows=config.result_store.export_batch_rows,
+        max_concurrent=config.result_store.export_max_concurrent
+    )
+    register_metrics_source("result_export", result_exporter.stats)
+    return result_exporter
 
 
-def create_agent() -> Agent:
+def create_agent(result_store: Optional[ResultStore] = None) -> Agent:
     """Create and configure the Vanna Agent with Oracle database connection.
     
     This factory function:
     1. Configures LLM service (OpenAI or Ollama based on INFERENCE_PROVIDER)
-    2. Sets up Oracle database runner and Milvus agent memory
+    2. Sets up the shared Oracle connection pool, blocking I/O executor,
+       database runner and Milvus agent memory
     3. Configures Row-Level Security (RLS) for query filtering
     4. Registers all tools with appropriate access controls
     5. Creates user-aware system prompt builder
     
+    Args:
+        result_store: Optional server-side result store (see
+            create_result_store) in which run_sql keeps its results.
+    
     Returns:
         Configured Agent instance ready to handle requests.
         
@@ -48,30 +117,50 @@ def create_agent() -> Agent:
         ValueError: If LLM provider is not properly configured.
     """
     llm = _create_llm_service()
+    db_pool = _create_db_pool()
+    async_db_pool = _create_async_db_pool()
+    executor = _create_executor()
     oracle_runner = _create_oracle_runner()
     agent_memory = _create_agent_memory()
-    rls_service = _create_rls_service()
+    user_directory = _create_user_directory(db_pool)
+    column_index = _create_column_index(db_pool)
+    rls_service = _create_rls_service(db_pool, user_directory, column_index)
+    result_cache = _create_result_cache(db_pool)
     user_resolver = HybridUserResolver(
         ldap_config=config.ldap, 
-        oracle_config=config.oracle
+        oracle_config=config.oracle,
+        pool=db_pool,
+        executor=executor,
+        token_signer=SessionTokenSigner(
+            secret=config.session.secret,
+            ttl=config.session.token_ttl
+        ),
+        session_cookie_name=config.session.cookie_name,
+        user_directory=user_directory
     )
+    register_metrics_source("auth_user_cache", user_resolver.cache_stats)
     
     # Create schema trainer for /gather command
     schema_trainer = SchemaTrainer(
         oracle_config=config.oracle,
         agent_memory=agent_memory,
         llm_service=llm,
-        openai_config=config.openai
+        openai_config=config.openai,
+        pool=db_pool
     )
     
     # Register all tools
-    tools = _register_tools(oracle_runner, rls_service, schema_trainer)
+    tools = _register_tools(
+        oracle_runner, rls_service, schema_trainer, db_pool, executor, async_db_pool, result_cache,
+        result_store
+    )
     
     # Create system prompt builder with RLS awareness
     system_prompt_builder = UserAwareSystemPromptBuilder(
         rls_service=rls_service,
         company_name="Database Chat",
-        include_rls_values=True
+        include_rls_values=True,
+        executor=executor
     )
     
     # Create agent configuration
@@ -131,6 +220,63 @@ def _create_llm_service():
         )
 
 
+def _create_db_pool() -> OraclePool:
+    """Create the process-wide Oracle connection pool.
+    
+    The pool is shared by every component that talks to Oracle and its
+    statistics are registered with the metrics registry.
+    
+    Returns:
+        Configured OraclePool instance.
+    """
+    db_pool = OraclePool(
+        oracle_config=config.oracle,
+        pool_config=config.oracle_pool
+    )
+    register_metrics_source("oracle_pool", db_pool.stats)
+    
+    print(
+        f"Oracle pool: min={config.oracle_pool.min}, max={config.oracle_pool.max}, "
+        f"increment={config.oracle_pool.increment}, wait_timeout={config.oracle_pool.wait_timeout}ms"
+    )
+    
+    return db_pool
+
+
+def _create_async_db_pool() -> Optional[AsyncOraclePool]:
+    """Create the async Oracle pool used by run_sql in async execution mode.
+    
+    Returns:
+        Configured AsyncOraclePool, or None when ORACLE_EXECUTION_MODE is not 'async'.
+    """
+    if not config.oracle_pool.use_async:
+        return None
+    
+    async_db_pool = AsyncOraclePool(
+        oracle_config=config.oracle,
+        pool_config=config.oracle_pool
+    )
+    register_metrics_source("oracle_async_pool", async_db_pool.stats)
+    
+    print("Oracle execution mode: async (run_sql uses python-oracledb async API)")
+    
+    return async_db_pool
+
+
+def _create_executor() -> BlockingExecutor:
+    """Create the central executor for blocking I/O inside async tools.
+    
+    Returns:
+        BlockingExecutor with oracle, ldap, milvus and llm lanes.
+    """
+    executor = BlockingExecutor(lane_sizes=config.executor.lane_sizes)
+    register_metrics_source("executor", executor.stats)
+    
+    print(f"Executor lanes: {config.executor.lane_sizes}")
+    
+    return executor
+
+
 def _create_oracle_runner() -> OracleRunner:
     """Create the Oracle database runner.
     
@@ -157,24 +303,212 @@ def _create_agent_memory() -> MilvusAgentMemory:
     )
 
 
-def _create_rls_service() -> RowLevelSecurityService:
+def _create_user_directory(db_pool: OraclePool) -> Optional[UserDirectory]:
+    """Create, load and start the in-memory AI_USERS directory.
+    
+    Args:
+        db_pool: The shared Oracle connection pool.
+        
+    Returns:
+        Started UserDirectory, or None when USER_DIRECTORY_ENABLED is false.
+    """
+    if not config.user_directory.enabled:
+        return None
+    
+    user_directory = UserDirectory(
+        oracle_config=config.oracle,
+        pool=db_pool,
+        refresh_interval=config.user_directory.refresh_interval,
+        use_cqn=config.user_directory.use_cqn,
+        miss_ttl=config.user_directory.miss_ttl
+    )
+    user_directory.start()
+    register_metrics_source("user_directory", user_directory.stats)
+    
+    print(
+        f"User directory: {user_directory.stats()['users']} users loaded, "
+        f"refresh every {config.user_directory.refresh_interval}s, CQN={config.user_directory.use_cqn}"
+    )
+    
+    return user_directory
+
+
+def _create_column_index(db_pool: OraclePool) -> Optional[ColumnIndex]:
+    """Create, load and start the bulk USER_TAB_COLUMNS index used by RLS.
+    
+    Args:
+        db_pool: The shared Oracle connection pool.
+        
+    Returns:
+        Started ColumnIndex, or None when RLS is disabled.
+    """
+    if not config.rls.enabled:
+        return None
+    
+    column_index = ColumnIndex(
+        oracle_config=config.oracle,
+        pool=db_pool,
+        refresh_interval=config.rls.catalog_refresh_interval
+    )
+    column_index.start()
+    register_metrics_source("rls_column_index", column_index.stats)
+    
+    print(
+        f"RLS: Column index loaded {column_index.stats()['tables']} tables, "
+        f"DDL check every {config.rls.catalog_refresh_interval}s"
+    )
+    
+    return column_index
+
+
+def _create_result_cache(db_pool: OraclePool) -> Optional[ResultCache]:
+    """Create the run_sql result cache and start its modification polling.
+    
+    Args:
+        db_pool: The shared Oracle connection pool.
+        
+    Returns:
+        Started ResultCache, or None when RESULT_CACHE_ENABLED is false.
+    """
+    if not config.result_cache.enabled:
+        return None
+    
+    result_cache = ResultCache(
+        oracle_config=config.oracle,
+        pool=db_pool,
+        max_bytes=int(config.result_cache.max_mb * 1024 * 1024),
+        max_entry_bytes=int(config.result_cache.max_entry_mb * 1024 * 1024),
+        default_ttl=config.result_cache.ttl,
+        table_ttls=config.result_cache.table_ttls_map,
+        poll_interval=config.result_cache.poll_interval,
+        flush_monitoring=config.result_cache.flush_monitoring
+    )
+    result_cache.start()
+    register_metrics_source("result_cache", result_cache.stats)
+    
+    print(
+        f"Result cache: {config.result_cache.max_mb}MB, TTL={config.result_cache.ttl}s, "
+        f"modification poll every {config.result_cache.poll_interval}s"
+    )
+    
+    return result_cache
+
+
+def _create_plan_gate() -> Optional[PlanGate]:
+    """Create the EXPLAIN PLAN cost gate of run_sql.
+    
+    Returns:
+        PlanGate, or None when PLAN_GATE_ENABLED is false.
+    """
+    gate_config = config.plan_gate
+    if not gate_config.enabled:
+        return None
+    if gate_config.action not in ("reject", "limit"):
+        raise ValueError(f"PLAN_GATE_ACTION must be 'reject' or 'limit', got '{gate_config.action}'")
+    
+    plan_gate = PlanGate(
+        limits={
+            "admin": PlanLimits(
+                max_cost=gate_config.max_cost_admin,
+                max_rows=gate_config.max_rows_admin,
+                max_full_scan_rows=gate_config.max_full_scan_rows
+            ),
+            "superuser": PlanLimits(
+                max_cost=gate_config.max_cost_superuser,
+                max_rows=gate_config.max_rows_superuser,
+                max_full_scan_rows=gate_config.max_full_scan_rows
+            ),
+            "user": PlanLimits(
+                max_cost=gate_config.max_cost_user,
+                max_rows=gate_config.max_rows_user,
+                max_full_scan_rows=gate_config.max_full_scan_rows
+            ),
+        },
+        action=gate_config.action,
+        cache_ttl=gate_config.cache_ttl,
+        cache_size=gate_config.cache_size
+    )
+    register_metrics_source("run_sql_plan_gate", plan_gate.stats)
+    
+    print(
+        f"Plan gate: action={gate_config.action}, max cost admin/superuser/user="
+        f"{gate_config.max_cost_admin}/{gate_config.max_cost_superuser}/{gate_config.max_cost_user}, "
+        f"plan cache TTL={gate_config.cache_ttl}s"
+    )
+    
+    return plan_gate
+
+
+def _create_approximate_answers() -> Optional[ApproximateAnswers]:
+    """Create run_sql's approximate mode.
+    
+    Returns:
+        ApproximateAnswers, or None when APPROX_ENABLED is false.
+    """
+    if not config.approximate.enabled:
+        return None
+    
+    approximate_answers = ApproximateAnswers(
+        limits=ApproxLimits(
+            sample_rows=config.approximate.sample_rows,
+            min_table_rows=config.approximate.min_table_rows,
+            block_sample=config.approximate.sample_block
+        ),
+        stats_ttl=config.approximate.stats_ttl
+    )
+    register_metrics_source("run_sql_approximate", approximate_answers.stats)
+    
+    print(
+        f"Approximate mode: sample ~{config.approximate.sample_rows} rows of tables with at least "
+        f"{config.approximate.min_table_rows} rows"
+    )
+    
+    return approximate_answers
+
+
+def _create_rls_service(
+    db_pool: OraclePool,
+    user_directory: Optional[UserDirectory] = None,
+    column_index: Optional[ColumnIndex] = None
+) -> RowLevelSecurityService:
     """Create and configure the Row-Level Security service.
     
+    Args:
+        db_pool: The shared Oracle connection pool.
+        user_directory: Optional in-memory AI_USERS directory.
+        column_index: Optional bulk USER_TAB_COLUMNS index.
+        
     Returns:
         Configured RowLevelSecurityService instance.
     """
     rls_config = RLSConfig(
         enabled=config.rls.enabled,
         cache_ttl=config.rls.cache_ttl,
-        excluded_tables=config.rls.excluded_tables_list
+        excluded_tables=config.rls.excluded_tables_list,
+        user_cache_max_size=config.rls.user_cache_max_size,
+        rewrite_cache_size=config.rls.rewrite_cache_size,
+        mode=config.rls.mode
     )
     
     rls_service = RowLevelSecurityService(
         oracle_config=config.oracle,
-        rls_config=rls_config
+        rls_config=rls_config,
+        pool=db_pool,
+        user_directory=user_directory,
+        column_index=column_index
     )
+    register_metrics_source("rls_user_filter_cache", rls_service.user_filter_cache.stats)
+    register_metrics_source("rls_rewrite_cache", rls_service.rewrite_cache_stats)
     
-    print(f"RLS: Enabled={config.rls.enabled}, CacheTTL={config.rls.cache_ttl}s")
+    if rls_service.vpd is not None:
+        rls_service.setup_vpd()
+        if rls_service.vpd is not None:
+            register_metrics_source("rls_vpd", rls_service.vpd.stats)
+            if column_index is not None:
+                column_index.add_listener(rls_service.setup_vpd)
+    
+    mode = "vpd" if rls_service.vpd_enabled else "rewrite"
+    print(f"RLS: Enabled={config.rls.enabled}, Mode={mode}, CacheTTL={config.rls.cache_ttl}s")
     if config.rls.excluded_tables_list:
         print(f"RLS: Excluded tables: {config.rls.excluded_tables_list}")
     
@@ -184,7 +518,12 @@ def _create_rls_service() -> RowLevelSecurityService:
 def _register_tools(
     oracle_runner: OracleRunner,
     rls_service: RowLevelSecurityService,
-    schema_trainer: SchemaTrainer
+    schema_trainer: SchemaTrainer,
+    db_pool: OraclePool,
+    executor: BlockingExecutor,
+    async_db_pool: Optional[AsyncOraclePool] = None,
+    result_cache: Optional[ResultCache] = None,
+    result_store: Optional[ResultStore] = None
 ) -> ToolRegistry:
     """Register all tools with the tool registry.
     
@@ -192,18 +531,57 @@ def _register_tools(
         oracle_runner: The Oracle database runner.
         rls_service: The Row-Level Security service.
         schema_trainer: The schema trainer instance.
+        db_pool: The shared Oracle connection pool.
+        executor: The central executor for blocking I/O.
+        async_db_pool: Optional async Oracle pool for non-blocking run_sql.
+        result_cache: Optional run_sql result cache.
+        result_store: Optional server-side store for paged run_sql results.
         
     Returns:
         Configured ToolRegistry with all tools registered.
     """
     tools = ToolRegistry()
     
+    # Result files written by run_sql and read by visualize_data
+    file_system = ResultFileSystem(compression=config.result_files.compression, executor=executor)
+    
     # Database query tool with RLS
     db_tool = SecureRunSqlTool(
         sql_runner=oracle_runner,
-        rls_service=rls_service
+        rls_service=rls_service,
+        pool=db_pool,
+        async_pool=async_db_pool,
+        executor=executor,
+        result_cache=result_cache,
+        fetch_limits=FetchLimits(
+            max_rows=config.fetch.max_rows,
+            max_bytes=int(config.fetch.max_mb * 1024 * 1024),
+            batch_bytes=int(config.fetch.batch_mb * 1024 * 1024),
+            prefetch_rows=config.fetch.prefetch_rows
+        ),
+        result_store=result_store,
+        file_system=file_system,
+        file_format=config.result_files.format,
+        preview_limits=PreviewLimits(
+            rows=config.result_preview.rows,
+            max_tokens=config.result_preview.max_tokens,
+            max_cell_chars=config.result_preview.max_cell_chars
+        ),
+        profile_limits=ProfileLimits(
+            max_tokens=config.result_preview.profile_max_tokens,
+            top_k=config.result_preview.profile_top_k
+        ) if config.result_preview.profile_enabled else None,
+        query_timeouts=QueryTimeouts(
+            admin=config.query_timeout.admin,
+            superuser=config.query_timeout.superuser,
+            user=config.query_timeout.user
+        ),
+        plan_gate=_create_plan_gate(),
+        approximate_answers=_create_approximate_answers()
     )
     tools.register_local_tool(db_tool, access_groups=['admin', 'superuser', 'user'])
+    register_metrics_source("run_sql_single_flight", db_tool.single_flight.stats)
+    register_metrics_source("run_sql_timeouts", db_tool.query_timeouts.stats)
     
     # Memory tools
     tools.register_local_tool(
@@ -221,22 +599,25 @@ def _register_tools(
     
     # Schema tools
     tools.register_local_tool(
-        GatherSchemaTool(schema_trainer), 
+        GatherSchemaTool(schema_trainer, executor=executor), 
         access_groups=['admin', 'superuser']
     )
     tools.register_local_tool(
-        CleanupMemoryTool(config.milvus), 
+        CleanupMemoryTool(config.milvus, executor=executor), 
         access_groups=['admin', 'superuser']
     )
     tools.register_local_tool(
-        ListAllTablesTool(config.oracle), 
+        ListAllTablesTool(config.oracle, pool=db_pool, executor=executor), 
         access_groups=['admin', 'superuser', 'user']
     )
+    tools.register_local_tool(
+        SqlVersionReportTool(config.oracle, pool=db_pool, executor=executor),
+        access_groups=['admin']
+    )
     
     # File system tools
-    file_system = LocalFileSystem()
     tools.register_local_tool(
-        VisualizeDataTool(file_system=file_system), 
+        ArrowVisualizeDataTool(file_system=file_system), 
         access_groups=['admin', 'superuser', 'user']
     )
     tools.register_local_tool(
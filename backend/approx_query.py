@@ -0,0 +1,699 @@
+"""
+Approximate Query Answers for Database Chat Application.
+
+When the LLM calls run_sql with approximate=true (for questions such as
+"roughly how many..." or "distribution of..."), an eligible aggregate query
+is rewritten before it runs:
+
+- If it reads a single table whose NUM_ROWS statistic is at least
+  APPROX_MIN_TABLE_ROWS and it only uses aggregates that can be estimated
+  from a sample (COUNT, SUM, AVG, MEDIAN, PERCENTILE_*, STDDEV, VARIANCE),
+  the table gets a SAMPLE (p) clause. p is chosen so that about
+  APPROX_SAMPLE_ROWS rows are read. COUNT and SUM are scaled by 100/p.
+- Otherwise COUNT(DISTINCT) becomes APPROX_COUNT_DISTINCT, MEDIAN becomes
+  APPROX_MEDIAN and PERCENTILE_CONT/DISC become APPROX_PERCENTILE, on the
+  whole table.
+
+The rewrite runs on the final SQL, after RLS predicates were injected (or
+on the original SQL under VPD, where the policy predicates apply to the
+sampled rows), so row-level security is unchanged. It only inserts the
+SAMPLE clause and replaces aggregate calls; the WHERE clause is not touched.
+
+Error bounds are computed from helper aggregates appended to the select
+list (the raw sample counts, sums of squares and standard deviations) and
+reported at 95% confidence with the result; the helper columns are then
+dropped. Queries that are not eligible run exactly.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .cache import TTLCache
+from .rls_rewriter import tokenize
+
+logger = logging.getLogger(__name__)
+
+# z value of the reported confidence level
+CONFIDENCE = 0.95
+_Z = 1.96
+
+# Oracle's SAMPLE percent must be in [0.000001, 100)
+_MIN_SAMPLE_PERCENT = 0.000001
+# Above this the sample saves too little to be worth the error
+_MAX_SAMPLE_PERCENT = 50.0
+
+_HELPER_PREFIX = "APPROX$"
+
+_NUM_ROWS_QUERY = """
+    SELECT num_rows
+    FROM all_tables
+    WHERE owner = NVL(:owner, SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA'))
+      AND table_name = :table_name
+"""
+
+# Aggregates that can be estimated from a row sample
+_SAMPLED_AGGREGATES = {"COUNT", "SUM", "AVG", "MEDIAN", "PERCENTILE_CONT", "PERCENTILE_DISC"}
+_SAMPLE_SAFE_AGGREGATES = {"STDDEV", "STDDEV_SAMP", "STDDEV_POP", "VARIANCE", "VAR_SAMP", "VAR_POP"}
+# Aggregates a sample cannot estimate (extremes, distinct values, lists)
+_EXACT_AGGREGATES = {
+    "MIN", "MAX", "LISTAGG", "COLLECT", "XMLAGG", "JSON_ARRAYAGG", "JSON_OBJECTAGG",
+    "ANY_VALUE", "RANK", "DENSE_RANK", "CUME_DIST", "PERCENT_RANK", "FIRST", "LAST",
+    "APPROX_COUNT_DISTINCT", "APPROX_MEDIAN", "APPROX_PERCENTILE", "APPROX_SUM", "APPROX_COUNT",
+}
+
+_CLAUSE_WORDS = {"WHERE", "GROUP", "HAVING", "ORDER", "FETCH", "OFFSET", "CONNECT", "START", "MODEL", "WINDOW"}
+_NOT_TABLE_ALIAS = {"ROWNUM", "HAVING", "CONNECT", "MODEL", "PARTITION", "SUBPARTITION", "SAMPLE", "AS", "OF"}
+_NOT_ALIAS = {"END", "NULL", "TRUE", "FALSE"}
+
+
+@dataclass
+class ApproxLimits:
+    """Sampling parameters of approximate mode."""
+    sample_rows: int = 100000  # rows the sample should contain
+    min_table_rows: int = 1000000  # smaller tables are not sampled
+    block_sample: bool = False  # SAMPLE BLOCK reads fewer blocks, but clustered data widens the error
+
+
+@dataclass
+class _Bound:
+    """How the error bound of one select item is computed from its helpers."""
+    column: str
+    kind: str  # "count", "sum", "avg", "rank_sample" or "rank_error"
+    helpers: List[str]
+    quantile: float = 0.5
+
+
+@dataclass
+class ErrorBound:
+    """Error bound of one result column over all its rows."""
+    column: str
+    kind: str  # "relative", "absolute" or "rank"
+    value: Optional[float]  # widest half-width; None when some row cannot be bounded
+    narrowest: Optional[float] = None  # narrowest half-width (differs from value for grouped results)
+
+    def _format(self, value: float) -> str:
+        if self.kind == "relative":
+            return f"±{value * 100:.3g}%"
+        if self.kind == "absolute":
+            return f"±{value:.6g}"
+        return f"±{value:.3g} percentile points"
+
+    def describe(self) -> str:
+        if self.value is None:
+            return f"{self.column}: no bound for some rows (too few sampled rows)"
+        if self.narrowest is not None and self.narrowest < self.value:
+            return f"{self.column}: within {self._format(self.narrowest)} to {self._format(self.value)} depending on the row"
+        return f"{self.column}: within {self._format(self.value)}"
+
+    def metadata(self) -> Dict[str, Any]:
+        return {"column": self.column, "kind": self.kind, "half_width": self.value, "min_half_width": self.narrowest}
+
+
+@dataclass
+class ApproxRewrite:
+    """Outcome of approximating one query."""
+    sql: str
+    applied: bool
+    reason: Optional[str] = None  # why the query runs exactly
+    table: Optional[str] = None
+    table_rows: Optional[int] = None
+    sample_percent: Optional[float] = None
+    functions: List[str] = field(default_factory=list)  # e.g. "COUNT(DISTINCT) -> APPROX_COUNT_DISTINCT"
+    bounds: List[_Bound] = field(default_factory=list)
+
+    def finish(self, table: pa.Table) -> Tuple[pa.Table, List[ErrorBound]]:
+        """
+        Compute the error bounds of a fetched result and drop the helper columns.
+
+        Args:
+            table: The result of the rewritten query
+
+        Returns:
+            Tuple of (result without helper columns, error bounds)
+        """
+        if not self.applied:
+            return table, []
+        fraction = (self.sample_percent or 100.0) / 100.0
+        bounds = []
+        for bound in self.bounds:
+            if table.num_rows == 0 or not all(name in table.column_names for name in bound.helpers):
+                continue
+            try:
+                bounds.append(_error_bound(table, bound, fraction))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                logger.debug(f"Approximate: No bound for {bound.column}: {e}")
+        helpers = [name for name in table.column_names if name.startswith(_HELPER_PREFIX)]
+        return table.drop_columns(helpers), bounds
+
+    def describe(self, bounds: List[ErrorBound]) -> str:
+        """Label of an approximate result for the LLM."""
+        if not self.applied:
+            return f"NOTE: Approximate mode was requested but not used ({self.reason}); the result is exact."
+        parts = []
+        if self.sample_percent is not None:
+            parts.append(
+                f"computed on a {self.sample_percent:g}% random sample of {self.table} "
+                f"(~{self.table_rows} rows by optimizer statistics); COUNT and SUM values are scaled up"
+            )
+        if self.functions:
+            parts.append("computed with " + ", ".join(self.functions))
+        text = "APPROXIMATE RESULT: " + "; ".join(parts) + "."
+        if bounds:
+            text += f"\nError bounds ({CONFIDENCE:.0%} confidence):\n" + "\n".join(
+                f"- {bound.describe()}" for bound in bounds
+            )
+        text += "\nPresent these numbers as estimates. Run the query without approximate mode for exact values."
+        return text
+
+    def metadata(self, bounds: List[ErrorBound]) -> Dict[str, Any]:
+        return {
+            "applied": self.applied,
+            "reason": self.reason,
+            "table": self.table,
+            "table_rows": self.table_rows,
+            "sample_percent": self.sample_percent,
+            "functions": self.functions,
+            "confidence": CONFIDENCE,
+            "error_bounds": [bound.metadata() for bound in bounds],
+        }
+
+
+def _float_column(table: pa.Table, name: str) -> pa.ChunkedArray:
+    return pc.cast(table.column(name), pa.float64())
+
+
+def _bound(column: str, kind: str, values: pa.ChunkedArray) -> ErrorBound:
+    """Summarize per-row half-widths; a row without a finite bound leaves the column unbounded."""
+    if values.null_count or not pc.all(pc.is_finite(values)).as_py():
+        return ErrorBound(column, kind, None)
+    extremes = pc.min_max(values)
+    return ErrorBound(column, kind, extremes["max"].as_py(), extremes["min"].as_py())
+
+
+def _error_bound(table: pa.Table, bound: _Bound, fraction: float) -> ErrorBound:
+    """Compute one column's 95% half-width from its helper columns (vectorized)."""
+    keep = 1.0 - fraction
+    if bound.kind == "count":
+        # Scaled Bernoulli sample count: relative SE = sqrt((1 - f) / c)
+        counts = _float_column(table, bound.helpers[0])
+        values = pc.multiply(pc.sqrt(pc.divide(keep, counts)), _Z)
+        return _bound(bound.column, "relative", values)
+    if bound.kind == "sum":
+        # Horvitz-Thompson: Var = (1 - f) / f^2 * sum of squares in the sample
+        squares = _float_column(table, bound.helpers[0])
+        values = pc.divide(pc.multiply(pc.sqrt(pc.multiply(squares, keep)), _Z), fraction)
+        return _bound(bound.column, "absolute", values)
+    if bound.kind == "avg":
+        deviation = _float_column(table, bound.helpers[0])
+        counts = _float_column(table, bound.helpers[1])
+        values = pc.multiply(pc.multiply(deviation, pc.sqrt(pc.divide(keep, counts))), _Z)
+        return _bound(bound.column, "absolute", values)
+    if bound.kind == "rank_sample":
+        # Rank error of a sample quantile: sqrt(q (1 - q) / n)
+        counts = _float_column(table, bound.helpers[0])
+        spread = bound.quantile * (1 - bound.quantile) * keep
+        values = pc.multiply(pc.sqrt(pc.divide(spread, counts)), _Z * 100)
+        return _bound(bound.column, "rank", values)
+    # rank_error: Oracle's own estimate of APPROX_PERCENTILE's rank error
+    rates = _float_column(table, bound.helpers[0])
+    return _bound(bound.column, "rank", pc.multiply(rates, 100))
+
+
+@dataclass
+class _Call:
+    """One aggregate call in the select list (token indexes, end exclusive)."""
+    name: str
+    start: int
+    end: int
+    args_start: int  # first argument token (after DISTINCT/ALL)
+    args_end: int  # the closing parenthesis
+    distinct: bool = False
+    order_by: Optional[Tuple[int, int]] = None  # WITHIN GROUP (ORDER BY ...) expression
+
+
+@dataclass
+class _Item:
+    """One select list item."""
+    start: int
+    end: int  # expression end (the alias excluded)
+    alias: Optional[str]
+    calls: List[_Call]
+
+
+class _Query:
+    """The parts of a single SELECT block that approximation needs."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.tokens = tokenize(sql)
+        self.items: List[_Item] = []
+        self.from_range: Optional[Tuple[int, int]] = None
+        self.has_having = False
+
+    def text(self, start: int, end: int) -> str:
+        """Original text of tokens [start, end)."""
+        return self.sql[self.tokens[start].start:self.tokens[end - 1].end]
+
+    def word(self, index: int) -> Optional[str]:
+        if index < len(self.tokens) and self.tokens[index].kind == "word":
+            return self.tokens[index].upper
+        return None
+
+    def punct(self, index: int, char: str) -> bool:
+        return index < len(self.tokens) and self.tokens[index].kind == "punct" and self.tokens[index].text == char
+
+    def closing(self, index: int) -> int:
+        """Index of the parenthesis closing the one at index."""
+        depth = 0
+        for i in range(index, len(self.tokens)):
+            if self.punct(i, "("):
+                depth += 1
+            elif self.punct(i, ")"):
+                depth -= 1
+                if depth == 0:
+                    return i
+        raise ValueError("unbalanced parentheses")
+
+    def parse(self) -> Optional[str]:
+        """
+        Split the statement into select items and FROM clause.
+
+        Returns:
+            Why the statement cannot be approximated, or None
+        """
+        tokens = self.tokens
+        if not tokens or self.word(0) != "SELECT":
+            return "not a single SELECT"
+        words = {token.upper for token in tokens if token.kind == "word"}
+        if sum(1 for token in tokens if token.kind == "word" and token.upper == "SELECT") > 1:
+            return "subqueries are not supported"
+        if words & {"UNION", "INTERSECT", "MINUS", "EXCEPT"}:
+            return "set operators are not supported"
+        if "OVER" in words:
+            return "analytic functions are not supported"
+        self.has_having = "HAVING" in words
+
+        position = 1
+        if self.word(position) in ("DISTINCT", "UNIQUE"):
+            return "SELECT DISTINCT is not supported"
+        if self.word(position) == "ALL":
+            position += 1
+
+        # Select list up to FROM at depth 0
+        item_start = position
+        i = position
+        while i < len(tokens):
+            if self.punct(i, "("):
+                i = self.closing(i) + 1
+                continue
+            if self.punct(i, ",") or self.word(i) == "FROM":
+                self.items.append(self._item(item_start, i))
+                if self.word(i) == "FROM":
+                    break
+                item_start = i + 1
+            i += 1
+        else:
+            return "no FROM clause"
+
+        # FROM clause up to the next clause at depth 0
+        from_start = i + 1
+        j = from_start
+        while j < len(tokens) and self.word(j) not in _CLAUSE_WORDS and not self.punct(j, ";"):
+            j = self.closing(j) + 1 if self.punct(j, "(") else j + 1
+        self.from_range = (from_start, j)
+        return None
+
+    def _item(self, start: int, end: int) -> _Item:
+        expression_end = end
+        alias = None
+        last = self.tokens[end - 1]
+        if end - start >= 2 and last.kind in ("word", "qident") and last.upper not in _NOT_ALIAS:
+            previous = self.tokens[end - 2]
+            if previous.kind == "word" and previous.upper == "AS":
+                alias, expression_end = last.text, end - 2
+            elif previous.kind in ("word", "qident", "other") or (previous.kind == "punct" and previous.text == ")"):
+                alias, expression_end = last.text, end - 1
+        return _Item(start, expression_end, alias, self._calls(start, expression_end))
+
+    def _calls(self, start: int, end: int) -> List[_Call]:
+        calls = []
+        i = start
+        while i < end:
+            name = self.word(i)
+            known = name in _SAMPLED_AGGREGATES or name in _SAMPLE_SAFE_AGGREGATES or name in _EXACT_AGGREGATES
+            if known and self.punct(i + 1, "(") and not self.punct(i - 1, "."):
+                close = self.closing(i + 1)
+                args_start = i + 2
+                distinct = self.word(args_start) in ("DISTINCT", "UNIQUE")
+                if distinct or self.word(args_start) == "ALL":
+                    args_start += 1
+                call = _Call(name, i, close + 1, args_start, close, distinct)
+                if self.word(close + 1) == "WITHIN" and self.word(close + 2) == "GROUP" and self.punct(close + 3, "("):
+                    group_close = self.closing(close + 3)
+                    if self.word(close + 4) == "ORDER" and self.word(close + 5) == "BY":
+                        order_end = group_close
+                        while self.word(order_end - 1) in ("ASC", "DESC", "FIRST", "LAST", "NULLS"):
+                            order_end -= 1
+                        call.order_by = (close + 6, order_end)
+                    call.end = group_close + 1
+                calls.append(call)
+                i = call.end
+                continue
+            i += 1
+        return calls
+
+    def single_table(self) -> Optional[Tuple[Optional[str], str, int]]:
+        """
+        The table of a FROM clause naming exactly one table.
+
+        Returns:
+            Tuple of (owner or None, table name, index after the name), or None
+        """
+        start, end = self.from_range
+        i = start
+        names = []
+        while i < end and self.tokens[i].kind in ("word", "qident"):
+            names.append(self.tokens[i])
+            i += 1
+            if self.punct(i, "."):
+                i += 1
+                continue
+            break
+        if not names or len(names) > 2:
+            return None
+        name_end = i
+        # Optional alias, nothing else (no joins, commas, db links or modifiers)
+        if i < end and self.tokens[i].kind in ("word", "qident") and self.word(i) not in _NOT_TABLE_ALIAS:
+            i += 1
+        if i != end:
+            return None
+        parts = [token.text.strip('"') if token.kind == "qident" else token.upper for token in names]
+        owner = parts[0] if len(parts) == 2 else None
+        return owner, parts[-1], name_end
+
+
+def _column_name(query: _Query, item: _Item) -> Optional[str]:
+    """Name Oracle gives an unaliased select item (its text without whitespace, upper-cased)."""
+    name = "".join(
+        token.upper if token.kind == "word" else token.text for token in query.tokens[item.start:item.end]
+    )
+    if '"' in name or len(name) > 128:
+        return None
+    return name
+
+
+def _quantile(query: _Query, call: _Call) -> Optional[float]:
+    """The literal fraction of a MEDIAN or PERCENTILE_* call, if it is one."""
+    if call.name == "MEDIAN":
+        return 0.5
+    try:
+        value = float(query.text(call.args_start, call.args_end))
+    except ValueError:
+        return None
+    return value if 0 <= value <= 1 else None
+
+
+def _number(value: float) -> str:
+    """SQL numeric literal without exponent notation."""
+    return f"{value:.10f}".rstrip("0").rstrip(".")
+
+
+class _Rewriter:
+    """Collects the text edits and helper columns of one rewrite."""
+
+    def __init__(self, query: _Query):
+        self.query = query
+        self.splices: List[Tuple[int, int, str]] = []  # (start char, end char, text)
+        self.helpers: List[str] = []
+        self.bounds: List[_Bound] = []
+
+    def replace(self, call: _Call, text: str):
+        tokens = self.query.tokens
+        self.splices.append((tokens[call.start].start, tokens[call.end - 1].end, text))
+
+    def insert(self, offset: int, text: str):
+        self.splices.append((offset, offset, text))
+
+    def helper(self, expression: str) -> str:
+        """Append a helper aggregate to the select list; returns its column name."""
+        name = f"{_HELPER_PREFIX}{len(self.helpers) + 1}"
+        self.helpers.append(f'{expression} AS "{name}"')
+        return name
+
+    @staticmethod
+    def single_call(item: _Item) -> Optional[_Call]:
+        """The item's aggregate call if the item is nothing else."""
+        if len(item.calls) == 1 and (item.calls[0].start, item.calls[0].end) == (item.start, item.end):
+            return item.calls[0]
+        return None
+
+    def column(self, item: _Item) -> Optional[str]:
+        """Result column name of an item."""
+        if item.alias is None:
+            return _column_name(self.query, item)
+        return item.alias.strip('"') if item.alias.startswith('"') else item.alias.upper()
+
+    def render(self) -> str:
+        """Apply the edits; rewritten unaliased items keep their column names."""
+        query = self.query
+        tokens = query.tokens
+        for item in query.items:
+            item_start, item_end = tokens[item.start].start, tokens[item.end - 1].end
+            rewritten = any(start < item_end and end > item_start for start, end, _ in self.splices)
+            name = _column_name(query, item) if item.alias is None and rewritten else None
+            if name:
+                self.insert(item_end, f' AS "{name}"')
+        if self.helpers:
+            # After the last select item (and its alias), before FROM
+            self.insert(tokens[query.from_range[0] - 2].end, ", " + ", ".join(self.helpers))
+        parts = []
+        previous = 0
+        for start, end, text in sorted(self.splices, key=lambda splice: (splice[0], splice[1])):
+            parts.append(query.sql[previous:start])
+            parts.append(text)
+            previous = end
+        parts.append(query.sql[previous:])
+        return "".join(parts)
+
+
+class ApproximateAnswers:
+    """
+    Rewrites aggregate queries for approximate answers.
+
+    Table statistics come from ALL_TABLES.NUM_ROWS through the caller's
+    loader and are cached, so each table is looked up once per stats_ttl.
+    """
+
+    def __init__(self, limits: Optional[ApproxLimits] = None, stats_ttl: float = 3600.0, stats_size: int = 1000):
+        """
+        Initialize approximate mode.
+
+        Args:
+            limits: Optional sampling parameters (defaults apply when omitted)
+            stats_ttl: Seconds a table's NUM_ROWS stays cached
+            stats_size: Maximum number of cached table statistics
+        """
+        self.limits = limits or ApproxLimits()
+        self.table_stats = TTLCache(max_size=stats_size, ttl=stats_ttl, name="approx_table_stats")
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._sampled = 0
+        self._functions = 0
+        self._exact = 0
+
+    @staticmethod
+    def num_rows(connection, owner: Optional[str], table_name: str) -> Optional[int]:
+        """
+        Read a table's NUM_ROWS statistic (blocking).
+
+        Returns:
+            Row count from the last statistics gathering, or None if the
+            table has no statistics or is not a table visible to the session
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(_NUM_ROWS_QUERY, owner=owner, table_name=table_name)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return int(row[0]) if row and row[0] is not None else None
+
+    def cached_num_rows(self, owner: Optional[str], table_name: str, loader: Callable[[], Optional[int]]) -> Optional[int]:
+        """Get a table's NUM_ROWS from the statistics cache, calling loader() on a miss."""
+        return self.table_stats.get_or_load((owner, table_name), loader)
+
+    def sample_percent(self, table_rows: Optional[int]) -> Optional[float]:
+        """
+        Choose the sample percent for a table.
+
+        Args:
+            table_rows: The table's NUM_ROWS (None if unknown)
+
+        Returns:
+            Percent (2 significant digits) reading about sample_rows rows,
+            or None if the table should not be sampled
+        """
+        if not table_rows or table_rows < self.limits.min_table_rows:
+            return None
+        percent = 100.0 * self.limits.sample_rows / table_rows
+        if percent >= _MAX_SAMPLE_PERCENT:
+            return None
+        return float(f"{max(percent, _MIN_SAMPLE_PERCENT):.2g}")
+
+    def rewrite(self, sql: str, num_rows: Callable[[Optional[str], str], Optional[int]]) -> ApproxRewrite:
+        """
+        Rewrite a query for an approximate answer (blocking: may look up
+        table statistics).
+
+        Args:
+            sql: The final SQL (after RLS rewriting)
+            num_rows: Callable returning NUM_ROWS for (owner, table_name),
+                None if unknown
+
+        Returns:
+            ApproxRewrite; when not applied, its sql is the input unchanged
+        """
+        result = self._rewrite(sql, num_rows)
+        with self._lock:
+            self._requests += 1
+            if not result.applied:
+                self._exact += 1
+            elif result.sample_percent is not None:
+                self._sampled += 1
+            else:
+                self._functions += 1
+        return result
+
+    def _rewrite(self, sql: str, num_rows: Callable[[Optional[str], str], Optional[int]]) -> ApproxRewrite:
+        query = _Query(sql)
+        try:
+            reason = query.parse()
+        except ValueError as e:
+            reason = str(e)
+        if reason is not None:
+            return ApproxRewrite(sql, False, reason)
+        calls = [call for item in query.items for call in item.calls]
+        if not calls:
+            return ApproxRewrite(sql, False, "the query has no aggregates")
+
+        # Sample when every aggregate can be estimated from a sample
+        exact = sorted({call.name for call in calls if call.distinct or call.name in _EXACT_AGGREGATES})
+        table = query.single_table()
+        if query.has_having:
+            not_sampled = "HAVING conditions would compare sampled values"
+        elif "ROWNUM" in {token.upper for token in query.tokens if token.kind == "word"}:
+            not_sampled = "ROWNUM would change meaning"
+        elif exact:
+            not_sampled = f"{', '.join(exact)} cannot be estimated from a sample"
+        elif table is None:
+            not_sampled = "only single-table queries are sampled"
+        else:
+            owner, table_name, name_end = table
+            qualified = f"{owner}.{table_name}" if owner else table_name
+            table_rows = num_rows(owner, table_name)
+            percent = self.sample_percent(table_rows)
+            if percent is not None:
+                return self._sample(query, name_end, percent, qualified, table_rows)
+            if table_rows is None:
+                not_sampled = f"{qualified} has no optimizer statistics"
+            else:
+                not_sampled = f"{qualified} has only about {table_rows} rows"
+        return self._approximate_functions(query, not_sampled)
+
+    def _sample(self, query: _Query, name_end: int, percent: float, table: str, table_rows: int) -> ApproxRewrite:
+        """Sample the table; scale COUNT and SUM, bound every single-aggregate item."""
+        rewriter = _Rewriter(query)
+        scale = _number(100.0 / percent)
+        for item in query.items:
+            for call in item.calls:
+                call_text = query.text(call.start, call.end)
+                if call.name == "COUNT":
+                    rewriter.replace(call, f"ROUND({call_text} * {scale})")
+                elif call.name == "SUM":
+                    rewriter.replace(call, f"({call_text} * {scale})")
+            call = rewriter.single_call(item)
+            column = rewriter.column(item) if call is not None else None
+            if column is None:
+                continue
+            args = query.text(call.args_start, call.args_end) if call.args_end > call.args_start else "*"
+            if call.name == "COUNT":
+                rewriter.bounds.append(_Bound(column, "count", [rewriter.helper(f"COUNT({args})")]))
+            elif call.name == "SUM":
+                rewriter.bounds.append(_Bound(column, "sum", [rewriter.helper(f"SUM(({args}) * ({args}))")]))
+            elif call.name == "AVG":
+                rewriter.bounds.append(_Bound(
+                    column, "avg", [rewriter.helper(f"STDDEV({args})"), rewriter.helper(f"COUNT({args})")]
+                ))
+            elif call.name in ("MEDIAN", "PERCENTILE_CONT", "PERCENTILE_DISC"):
+                quantile = _quantile(query, call)
+                if call.name == "MEDIAN":
+                    expression = args
+                else:
+                    expression = query.text(*call.order_by) if call.order_by else None
+                if quantile is not None and expression:
+                    rewriter.bounds.append(_Bound(
+                        column, "rank_sample", [rewriter.helper(f"COUNT({expression})")], quantile
+                    ))
+        clause = "SAMPLE BLOCK" if self.limits.block_sample else "SAMPLE"
+        rewriter.insert(query.tokens[name_end - 1].end, f" {clause} ({_number(percent)})")
+        return ApproxRewrite(
+            rewriter.render(), True, table=table, table_rows=table_rows,
+            sample_percent=percent, bounds=rewriter.bounds
+        )
+
+    def _approximate_functions(self, query: _Query, not_sampled: str) -> ApproxRewrite:
+        """Replace exact distinct counts and percentiles with their APPROX_* versions."""
+        rewriter = _Rewriter(query)
+        functions = set()
+        for item in query.items:
+            single = rewriter.single_call(item)
+            column = rewriter.column(item) if single is not None else None
+            for call in item.calls:
+                args = query.text(call.args_start, call.args_end) if call.args_end > call.args_start else ""
+                bounded = column if call is single else None
+                if call.name == "COUNT" and call.distinct:
+                    rewriter.replace(call, f"APPROX_COUNT_DISTINCT({args})")
+                    functions.add("COUNT(DISTINCT) -> APPROX_COUNT_DISTINCT")
+                elif call.name == "MEDIAN" and not call.distinct:
+                    rewriter.replace(call, f"APPROX_MEDIAN({args})")
+                    functions.add("MEDIAN -> APPROX_MEDIAN")
+                    if bounded:
+                        rewriter.bounds.append(_Bound(
+                            bounded, "rank_error", [rewriter.helper(f"APPROX_MEDIAN({args}, 'ERROR_RATE')")]
+                        ))
+                elif call.name in ("PERCENTILE_CONT", "PERCENTILE_DISC") and call.order_by:
+                    order_text = query.text(call.order_by[0], call.end - 1)
+                    within = f"WITHIN GROUP (ORDER BY {order_text})"
+                    rewriter.replace(call, f"APPROX_PERCENTILE({args}) {within}")
+                    functions.add(f"{call.name} -> APPROX_PERCENTILE")
+                    if bounded:
+                        rewriter.bounds.append(_Bound(
+                            bounded, "rank_error",
+                            [rewriter.helper(f"APPROX_PERCENTILE({args}, 'ERROR_RATE') {within}")]
+                        ))
+        if not functions:
+            return ApproxRewrite(query.sql, False, f"not sampled: {not_sampled}; no APPROX_* function applies")
+        return ApproxRewrite(rewriter.render(), True, functions=sorted(functions), bounds=rewriter.bounds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get approximate mode statistics for monitoring.
+
+        Returns:
+            Dictionary with request counts by outcome and the table
+            statistics cache
+        """
+        with self._lock:
+            stats = {
+                "requests": self._requests,
+                "sampled": self._sampled,
+                "approx_functions": self._functions,
+                "exact": self._exact,
+            }
+        stats["table_stats"] = self.table_stats.stats()
+        return stats
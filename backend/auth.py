@@ -6,14 +6,24 @@ validation and Oracle database for role/permission resolution.
 """
 
 import base64
-from typing import List, Tuple, Dict, Optional
+import hashlib
+import hmac
+import os
+import threading
+from typing import Any, List, Tuple, Dict, Optional
 
 import oracledb
-from ldap3 import Server, Connection, ALL, SUBTREE
+from ldap3 import Server, ServerPool, Connection, NONE, BASE, SAFE_RESTARTABLE
 from ldap3.core.exceptions import LDAPException
 from vanna.core.user import UserResolver, User
 from vanna.core.user.request_context import RequestContext
 
+from .cache import TTLCache
+from .db_pool import OraclePool
+from .executor import BlockingExecutor, LDAP_LANE, ORACLE_LANE
+from .session_tokens import SessionTokenSigner
+from .user_directory import UserDirectory
+
 
 class HybridUserResolver(UserResolver):
     """Hybrid user resolver combining LDAP authentication with database role resolution.
@@ -22,6 +32,10 @@ class HybridUserResolver(UserResolver):
     - Authenticates users against an LDAP server (validates credentials)
     - Reads user attributes (email, uid) from LDAP
     - Queries AI_USERS table in Oracle database for role/group membership
+    - Caches resolved users (bounded, TTL) so repeated requests with the same
+      credentials skip both LDAP and Oracle
+    - Accepts signed session tokens issued at login; LDAP is only used again
+      once the token has expired
     
     AI_USERS table structure:
         - USERNAME: VARCHAR2(50) - Primary key, matches LDAP username
@@ -29,35 +43,118 @@ class HybridUserResolver(UserResolver):
         - IS_SUPERUSER: NUMBER - 1 = superuser group membership  
         - IS_NORMALUSER: NUMBER - 1 = user group membership (default)
     
-    Requires 'Authorization' header with Basic auth or cookies for session.
+    Requires a session token, an 'Authorization' header with Basic auth,
+    or credential cookies for session.
     """
     
-    def __init__(self, ldap_config, oracle_config):
+    def __init__(
+        self,
+        ldap_config,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        executor: Optional[BlockingExecutor] = None,
+        token_signer: Optional[SessionTokenSigner] = None,
+        session_cookie_name: str = "vanna_session",
+        user_directory: Optional[UserDirectory] = None
+    ):
         """Initialize the hybrid user resolver.
         
         Args:
             ldap_config: LDAP configuration with host, port, base_dn, etc.
             oracle_config: Oracle database configuration with user, password, dsn.
+            pool: Optional shared Oracle connection pool for role lookups.
+            executor: Optional shared executor; LDAP binds and role lookups
+                run on its ldap and oracle lanes instead of the event loop.
+            token_signer: Optional signer for session tokens; a valid token
+                authenticates a request without LDAP.
+            session_cookie_name: Cookie holding the signed session token.
+            user_directory: Optional in-memory AI_USERS directory; roles are
+                served from memory instead of a per-login query.
         """
         self.config = ldap_config
         self.oracle_config = oracle_config
-        self._server: Optional[Server] = None
+        self.pool = pool
+        self.executor = executor or BlockingExecutor()
+        self.token_signer = token_signer
+        self.session_cookie_name = session_cookie_name
+        self.user_directory = user_directory
+        self._server: Optional[ServerPool] = None
+        self._service_conn: Optional[Connection] = None
+        self._service_lock = threading.Lock()
+        
+        # Resolved users keyed by a salted hash of their credentials
+        self._cache_salt = os.urandom(32)
+        self._user_cache = TTLCache(
+            max_size=ldap_config.user_cache_max_size,
+            ttl=ldap_config.user_cache_ttl,
+            name="auth_users"
+        )
     
     @property
-    def server(self) -> Server:
-        """Lazy-initialize LDAP server connection.
+    def server(self) -> ServerPool:
+        """Lazy-initialize the LDAP server pool.
+        
+        Every host in LDAP_HOSTS (or LDAP_HOST) becomes a pool member. The
+        pool is actively health-checked and selects servers round-robin or
+        first-available. get_info=NONE skips the schema/DSE download that
+        get_info=ALL performed on every bind.
         
         Returns:
-            Configured LDAP Server instance.
+            Configured LDAP ServerPool instance.
         """
         if self._server is None:
-            protocol = 'ldaps' if self.config.use_ssl else 'ldap'
-            self._server = Server(
-                f"{protocol}://{self.config.host}:{self.config.port}",
-                get_info=ALL
+            servers = []
+            for host in self.config.hosts_list:
+                name, _, port = host.partition(':')
+                servers.append(Server(
+                    name,
+                    port=int(port) if port else self.config.port,
+                    use_ssl=self.config.use_ssl,
+                    get_info=NONE,
+                    connect_timeout=self.config.connect_timeout
+                ))
+            self._server = ServerPool(
+                servers,
+                pool_strategy=self.config.pool_strategy,
+                active=self.config.pool_active_retries,
+                exhaust=self.config.pool_exhaust_seconds
             )
         return self._server
     
+    @property
+    def service_connection(self) -> Connection:
+        """Lazy-initialize the shared service-account connection.
+        
+        Bound once with LDAP_BIND_DN/LDAP_BIND_PASSWORD and reused for all
+        attribute searches. SAFE_RESTARTABLE makes it thread-safe and
+        transparently reconnects after a server failure.
+        
+        Returns:
+            Bound, thread-safe LDAP Connection.
+        """
+        if self._service_conn is None:
+            with self._service_lock:
+                if self._service_conn is None:
+                    self._service_conn = Connection(
+                        self.server,
+                        user=self.config.bind_dn,
+                        password=self.config.bind_password,
+                        client_strategy=SAFE_RESTARTABLE,
+                        auto_bind=True,
+                        read_only=True
+                    )
+        return self._service_conn
+    
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a database connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+    
     def _get_user_roles_from_db(self, username: str) -> List[str]:
         """Get user roles from AI_USERS database table.
         
@@ -73,14 +170,23 @@ class HybridUserResolver(UserResolver):
         Raises:
             RuntimeError: If user not found or database connection fails.
         """
+        if self.user_directory is not None:
+            try:
+                record = self.user_directory.get(username)
+            except oracledb.Error as e:
+                error_msg = f"Database error querying AI_USERS for '{username}': {e}"
+                print(f"DB: {error_msg}")
+                raise RuntimeError(error_msg)
+            if record is None:
+                raise RuntimeError(
+                    f"User '{username}' not found in AI_USERS table. Access denied."
+                )
+            return list(record.groups)
+        
         groups = []
         
         try:
-            connection = oracledb.connect(
-                user=self.oracle_config.user,
-                password=self.oracle_config.password,
-                dsn=self.oracle_config.dsn
-            )
+            connection = self._get_connection()
             
             cursor = connection.cursor()
             cursor.execute(
@@ -139,39 +245,61 @@ class HybridUserResolver(UserResolver):
         user_dn = self.config.user_dn_template.format(username=username)
         
         try:
+            # The bind itself validates the credentials; attribute lookups go
+            # through the pooled service-account connection
             conn = Connection(
                 self.server, 
                 user=user_dn, 
                 password=password, 
-                auto_bind=True
-            )
-            
-            conn.search(
-                search_base=user_dn,
-                search_filter="(objectClass=*)",
-                search_scope=SUBTREE,
-                attributes=['mail', 'uid', 'cn', 'sn']
+                auto_bind=True,
+                read_only=True
             )
-            
-            user_info = {
-                'dn': user_dn,
-                'username': username,
-                'email': None,
-            }
-            
-            if conn.entries:
-                entry = conn.entries[0]
-                if hasattr(entry, 'mail') and entry.mail:
-                    user_info['email'] = str(entry.mail)
-                else:
-                    user_info['email'] = f"{username}@{self.config.email_domain}"
-            
             conn.unbind()
-            return True, user_info
-            
         except LDAPException as e:
             print(f"LDAP authentication failed for {username}: {e}")
             return False, {}
+        
+        user_info = {
+            'dn': user_dn,
+            'username': username,
+            'email': None,
+        }
+        
+        try:
+            attributes = self._search_user_attributes(user_dn)
+            if attributes is not None:
+                mail = attributes.get('mail')
+                if isinstance(mail, list):
+                    mail = mail[0] if mail else None
+                user_info['email'] = str(mail) if mail else f"{username}@{self.config.email_domain}"
+            return True, user_info
+            
+        except LDAPException as e:
+            # Credentials were valid; only the attribute lookup failed
+            print(f"LDAP: Attribute search failed for {username}: {e}")
+            return True, user_info
+    
+    def _search_user_attributes(self, user_dn: str) -> Optional[Dict[str, Any]]:
+        """Read a user's attributes with the service-account connection.
+        
+        Args:
+            user_dn: The user's distinguished name.
+            
+        Returns:
+            Attribute dictionary, or None if the entry was not found.
+        """
+        status, _result, response, _request = self.service_connection.search(
+            search_base=user_dn,
+            search_filter="(objectClass=*)",
+            search_scope=BASE,
+            attributes=['mail', 'uid', 'cn', 'sn']
+        )
+        if not status:
+            return None
+        for entry in response or []:
+            if entry.get('type') == 'searchResEntry':
+                return dict(entry.get('attributes') or {})
+        return None
     
     async def resolve_user(self, request_context: RequestContext) -> User:
         """Resolve user from request context using LDAP auth + DB roles.
@@ -185,9 +313,14 @@ class HybridUserResolver(UserResolver):
         Raises:
             RuntimeError: If authentication fails or user not authorized.
         """
-        # Try Authorization header first
         auth_header = request_context.get_header('Authorization')
         
+        # Try a signed session token first (no LDAP or database round trip)
+        token_user = self._resolve_from_token(request_context, auth_header)
+        if token_user is not None:
+            return token_user
+        
+        # Fall back to credentials in the Authorization header
         if auth_header and auth_header.startswith('Basic '):
             return await self._resolve_from_auth_header(auth_header)
         
@@ -206,6 +339,130 @@ class HybridUserResolver(UserResolver):
             group_memberships=['user']
         )
     
+    def issue_session_token(self, user: User) -> Optional[str]:
+        """Issue a signed session token for a freshly authenticated user.
+        
+        Args:
+            user: The authenticated user.
+            
+        Returns:
+            Signed token string, or None if session tokens are not configured.
+        """
+        if self.token_signer is None:
+            return None
+        return self.token_signer.issue(user)
+    
+    def _resolve_from_token(self, request_context: RequestContext, auth_header: Optional[str]) -> Optional[User]:
+        """Resolve user from a signed session token without any network call.
+        
+        The token is read from the session cookie or a 'Bearer' Authorization
+        header. If the request also carries a username (Basic credentials or
+        the vanna_user cookie) it must match the token subject.
+        
+        Args:
+            request_context: The request context containing headers and cookies.
+            auth_header: The Authorization header value, if any.
+            
+        Returns:
+            User from the token, or None if there is no valid, unexpired token
+            (the caller then falls back to LDAP re-authentication).
+        """
+        if self.token_signer is None:
+            return None
+        
+        token = None
+        if auth_header and auth_header.startswith('Bearer '):
+            token = auth_header[7:].strip()
+        if not token:
+            token = request_context.get_cookie(self.session_cookie_name)
+        if not token:
+            return None
+        
+        payload = self.token_signer.verify(token)
+        if payload is None:
+            print("Session: Ignoring session token with invalid signature")
+            return None
+        if self.token_signer.is_expired(payload):
+            return None
+        
+        claimed_username = request_context.get_cookie('vanna_user')
+        if auth_header and auth_header.startswith('Basic '):
+            try:
+                credentials = base64.b64decode(auth_header[6:]).decode('utf-8')
+                claimed_username = credentials.split(':', 1)[0]
+            except Exception:
+                return None
+        if claimed_username and claimed_username != payload['sub']:
+            return None
+        
+        return self.token_signer.to_user(payload)
+    
+    def _credentials_cache_key(self, username: str, password: str) -> str:
+        """Build the user cache key as a salted hash of the credentials.
+        
+        The salt is random per process, so keys are useless outside it and
+        plaintext passwords are never kept in memory by the cache.
+        """
+        return hmac.new(
+            self._cache_salt,
+            f"{username}:{password}".encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+    
+    async def _authenticate_and_resolve(self, username: str, password: str) -> Optional[User]:
+        """Authenticate credentials and build the User, using the user cache.
+        
+        A cache hit skips both the LDAP bind and the AI_USERS role lookup.
+        Failed authentications are never cached.
+        
+        Args:
+            username: The username to authenticate.
+            password: The password to validate.
+            
+        Returns:
+            Authenticated User object, or None if LDAP authentication failed.
+        """
+        cache_key = self._credentials_cache_key(username, password)
+        cached_user = self._user_cache.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+        
+        authenticated, user_info = await self.executor.run(
+            LDAP_LANE, self._authenticate_user, username, password
+        )
+        if not authenticated:
+            return None
+        
+        groups = await self.executor.run(ORACLE_LANE, self._get_user_roles_from_db, username)
+        user = User(
+            id=username,
+            email=user_info.get('email', f"{username}@{self.config.email_domain}"),
+            username=username,
+            group_memberships=groups
+        )
+        self._user_cache.set(cache_key, user)
+        return user
+    
+    def invalidate_user(self, username: str = None) -> int:
+        """Invalidate cached users so the next request re-authenticates.
+        
+        Args:
+            username: Optional specific user to invalidate. If None, clears all.
+            
+        Returns:
+            Number of cache entries removed (0 when clearing everything).
+        """
+        if username is None:
+            self._user_cache.clear()
+            return 0
+        return self._user_cache.invalidate_where(
+            lambda _key, user: user.id.upper() == username.upper()
+        )
+    
+    def cache_stats(self) -> Dict:
+        """Get authenticated-user cache statistics (hits, misses, size)."""
+        return self._user_cache.stats()
+    
     async def _resolve_from_auth_header(self, auth_header: str) -> User:
         """Resolve user from Authorization header.
         
@@ -222,16 +479,10 @@ class HybridUserResolver(UserResolver):
             credentials = base64.b64decode(auth_header[6:]).decode('utf-8')
             username, password = credentials.split(':', 1)
             
-            authenticated, user_info = self._authenticate_user(username, password)
+            user = await self._authenticate_and_resolve(username, password)
             
-            if authenticated:
-                groups = self._get_user_roles_from_db(username)
-                return User(
-                    id=username,
-                    email=user_info.get('email', f"{username}@{self.config.email_domain}"),
-                    username=username,
-                    group_memberships=groups
-                )
+            if user is not None:
+                return user
             else:
                 raise RuntimeError(f"LDAP authentication failed for user '{username}'")
         except RuntimeError:
@@ -260,16 +511,10 @@ class HybridUserResolver(UserResolver):
             if username != session_user:
                 raise RuntimeError("Session username mismatch")
             
-            authenticated, user_info = self._authenticate_user(username, password)
+            user = await self._authenticate_and_resolve(username, password)
             
-            if authenticated:
-                groups = self._get_user_roles_from_db(username)
-                return User(
-                    id=username,
-                    email=user_info.get('email', f"{username}@{self.config.email_domain}"),
-                    username=username,
-                    group_memberships=groups
-                )
+            if user is not None:
+                return user
             else:
                 raise RuntimeError(f"Session re-authentication failed for user '{username}'")
         except RuntimeError:
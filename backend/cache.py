@@ -0,0 +1,208 @@
+"""
+Bounded TTL Cache for Database Chat Application.
+
+A small thread-safe cache with a maximum size (least recently used entries
+are evicted first), a per-cache time-to-live, explicit invalidation,
+per-key load locking (concurrent misses for the same key run the loader
+once) and hit/miss/eviction counters for the metrics endpoint.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed TTL.
+
+    A ttl of 0 or less disables caching: every lookup is a miss and
+    nothing is stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float, name: str = "cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+            ttl: Time-to-live in seconds for each entry
+            name: Name used in statistics and log messages
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._loads = 0
+        self._load_failures = 0
+        self._coalesced = 0
+        self._key_locks: Dict[Hashable, list] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled (positive TTL)."""
+        return self.ttl > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def _peek(self, key: Hashable) -> Any:
+        """Look up a live entry without touching the hit/miss counters."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or time.monotonic() - entry[1] > self.ttl:
+                return _MISSING
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, calling loader() to fill it on a miss.
+
+        Concurrent misses for the same key wait on a per-key lock, so the
+        loader runs once and the other callers reuse its result instead of
+        stampeding the backing store. Loader exceptions propagate and
+        nothing is cached.
+
+        Args:
+            key: Cache key
+            loader: Callable producing the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = [threading.Lock(), 0]
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                value = self._peek(key)
+                if value is not _MISSING:
+                    with self._lock:
+                        self._coalesced += 1
+                    return value
+                try:
+                    value = loader()
+                except Exception:
+                    with self._lock:
+                        self._load_failures += 1
+                    raise
+                self.set(key, value)
+                with self._lock:
+                    self._loads += 1
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if key_lock[1] == 0:
+                    self._key_locks.pop(key, None)
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Remove a single entry.
+
+        Returns:
+            True if an entry was removed
+        """
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove every entry for which predicate(key, value) is true.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for monitoring.
+
+        Returns:
+            Dictionary with size, hit/miss counts, hit rate, evictions and
+            loader calls (coalesced = misses served by a concurrent load)
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "loads": self._loads,
+                "load_failures": self._load_failures,
+                "coalesced_loads": self._coalesced,
+            }
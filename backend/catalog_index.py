@@ -0,0 +1,252 @@
+"""
+Bulk Column Index for Database Chat Application.
+
+Row-level security needs to know which tables contain which filter columns.
+Instead of one USER_TAB_COLUMNS query per table, the whole catalog is loaded
+in a single fetch into two in-memory maps:
+
+- table name -> set of its column names
+- column name -> set of tables that contain it (inverted index)
+
+A background thread checks MAX(LAST_DDL_TIME) in USER_OBJECTS and reloads
+the catalog only after DDL. Every reload that changes the catalog bumps a
+version number, which downstream caches use to invalidate derived data.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set
+
+import oracledb
+
+from .db_pool import OraclePool
+
+logger = logging.getLogger(__name__)
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+class ColumnIndex:
+    """
+    In-memory index of USER_TAB_COLUMNS for query-path metadata lookups.
+
+    Lookups never touch the database; before the first successful load the
+    index reports loaded=False and callers fall back to their own queries.
+    """
+
+    def __init__(self, oracle_config, pool: Optional[OraclePool] = None, refresh_interval: float = 300.0):
+        """
+        Initialize the index.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool: Optional shared Oracle connection pool
+            refresh_interval: Seconds between DDL checks; 0 disables the
+                background refresh thread
+        """
+        self.oracle_config = oracle_config
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+
+        self._table_columns: Dict[str, FrozenSet[str]] = {}
+        self._column_tables: Dict[str, FrozenSet[str]] = {}
+        self._last_ddl_time = None
+        self._version = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[], None]] = []
+
+        self._loads = 0
+        self._checks = 0
+        self._last_load_ms = 0.0
+        self._last_load_at: Optional[float] = None
+
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the catalog has been loaded."""
+        return self._loaded
+
+    @property
+    def version(self) -> int:
+        """Catalog version; increases whenever a reload changes the index."""
+        return self._version
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked after a reload changes the catalog."""
+        self._listeners.append(callback)
+
+    def _fetch_last_ddl_time(self, cursor):
+        cursor.execute(
+            "SELECT MAX(LAST_DDL_TIME) FROM USER_OBJECTS WHERE OBJECT_TYPE IN ('TABLE', 'VIEW')"
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def load(self):
+        """
+        Load all of USER_TAB_COLUMNS in one fetch and rebuild the index.
+
+        Raises:
+            oracledb.Error: If the catalog cannot be read
+        """
+        start = time.perf_counter()
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            last_ddl_time = self._fetch_last_ddl_time(cursor)
+            cursor.arraysize = 5000
+            cursor.prefetchrows = 5000
+            cursor.execute("SELECT TABLE_NAME, COLUMN_NAME FROM USER_TAB_COLUMNS")
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        tables: Dict[str, Set[str]] = {}
+        columns: Dict[str, Set[str]] = {}
+        for table_name, column_name in rows:
+            table_name = table_name.upper()
+            column_name = column_name.upper()
+            tables.setdefault(table_name, set()).add(column_name)
+            columns.setdefault(column_name, set()).add(table_name)
+
+        table_columns = {t: frozenset(c) for t, c in tables.items()}
+        column_tables = {c: frozenset(t) for c, t in columns.items()}
+
+        with self._lock:
+            changed = table_columns != self._table_columns
+            notify = changed and self._loaded
+            self._table_columns = table_columns
+            self._column_tables = column_tables
+            self._last_ddl_time = last_ddl_time
+            if changed or not self._loaded:
+                self._version += 1
+            self._loaded = True
+            self._loads += 1
+            self._last_load_ms = round((time.perf_counter() - start) * 1000, 3)
+            self._last_load_at = time.time()
+
+        logger.info(
+            f"ColumnIndex: Loaded {len(rows)} columns across {len(table_columns)} tables "
+            f"in {self._last_load_ms}ms (version {self._version})"
+        )
+
+        if notify:
+            for callback in self._listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"ColumnIndex: Change listener failed: {e}")
+
+    def refresh(self):
+        """Reload the catalog if DDL happened since the last load."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # A refresh is already running
+        try:
+            if not self._loaded:
+                self.load()
+                return
+            connection = self._get_connection()
+            try:
+                cursor = connection.cursor()
+                last_ddl_time = self._fetch_last_ddl_time(cursor)
+                cursor.close()
+            finally:
+                connection.close()
+            self._checks += 1
+            if last_ddl_time != self._last_ddl_time:
+                self.load()
+        finally:
+            self._refresh_lock.release()
+
+    def get_table_columns(self, table_name: str) -> FrozenSet[str]:
+        """
+        Get the column names of a table.
+
+        Args:
+            table_name: Table name (case-insensitive)
+
+        Returns:
+            Set of column names, empty if the table is unknown
+        """
+        return self._table_columns.get(table_name.upper(), _EMPTY)
+
+    def tables_with_column(self, column_name: str) -> FrozenSet[str]:
+        """
+        Get the tables that contain a column.
+
+        Args:
+            column_name: Column name (case-insensitive)
+
+        Returns:
+            Set of table names, empty if no table has the column
+        """
+        return self._column_tables.get(column_name.upper(), _EMPTY)
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except oracledb.Error as e:
+                logger.error(f"ColumnIndex: Refresh failed: {e}")
+
+    def start(self):
+        """
+        Load the index and start background refresh.
+
+        A failed initial load is logged, not raised; the refresh thread
+        retries it.
+        """
+        try:
+            self.load()
+        except oracledb.Error as e:
+            logger.error(f"ColumnIndex: Initial load failed: {e}")
+
+        if self._thread is None and self.refresh_interval > 0:
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name="column-index-refresh",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop background refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics for monitoring.
+
+        Returns:
+            Dictionary with table/column counts, version and load timings
+        """
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "version": self._version,
+                "tables": len(self._table_columns),
+                "distinct_columns": len(self._column_tables),
+                "loads": self._loads,
+                "ddl_checks": self._checks,
+                "last_load_ms": self._last_load_ms,
+                "last_load_at": self._last_load_at,
+            }
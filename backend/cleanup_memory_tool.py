@@ -6,11 +6,13 @@ all stored memories from Milvus via the /cleanup command.
 """
 
 import logging
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
 from vanna.core.tool import Tool, ToolContext, ToolResult
 from pymilvus import connections, utility
 
+from .executor import BlockingExecutor, MILVUS_LANE
+
 logger = logging.getLogger(__name__)
 
 class CleanupMemoryArgs(BaseModel):
@@ -20,10 +22,11 @@ class CleanupMemoryArgs(BaseModel):
 class CleanupMemoryTool(Tool):
     """Tool for clearing Milvus agent memory."""
     
-    def __init__(self, milvus_config):
+    def __init__(self, milvus_config, executor: Optional[BlockingExecutor] = None):
         """Initialize the cleanup tool."""
         super().__init__()
         self.milvus_config = milvus_config
+        self.executor = executor or BlockingExecutor()
 
     @property
     def name(self) -> str:
@@ -36,6 +39,24 @@ class CleanupMemoryTool(Tool):
     def get_args_schema(self) -> Type[CleanupMemoryArgs]:
         return CleanupMemoryArgs
     
+    def _drop_collection(self) -> str:
+        """Connect to Milvus and drop the memory collection (blocking)."""
+        connections.connect(
+            alias="default",
+            host=self.milvus_config.host,
+            port=self.milvus_config.port
+        )
+        
+        # Drop collection if it exists
+        if utility.has_collection(self.milvus_config.collection_name):
+            utility.drop_collection(self.milvus_config.collection_name)
+            msg = f"Successfully cleared all memories by dropping collection '{self.milvus_config.collection_name}'."
+            logger.info(msg)
+        else:
+            msg = f"Collection '{self.milvus_config.collection_name}' does not exist. Nothing to clear."
+            logger.warning(msg)
+        return msg
+    
     async def execute(self, context: ToolContext, args: CleanupMemoryArgs) -> ToolResult:
         """Execute the memory cleanup."""
         user = context.user if context else None
@@ -50,21 +71,7 @@ class CleanupMemoryTool(Tool):
             )
         
         try:
-            # Connect to Milvus
-            connections.connect(
-                alias="default",
-                host=self.milvus_config.host,
-                port=self.milvus_config.port
-            )
-            
-            # Drop collection if it exists
-            if utility.has_collection(self.milvus_config.collection_name):
-                utility.drop_collection(self.milvus_config.collection_name)
-                msg = f"Successfully cleared all memories by dropping collection '{self.milvus_config.collection_name}'."
-                logger.info(msg)
-            else:
-                msg = f"Collection '{self.milvus_config.collection_name}' does not exist. Nothing to clear."
-                logger.warning(msg)
+            msg = await self.executor.run(MILVUS_LANE, self._drop_collection)
             
             return ToolResult(
                 success=True,
@@ -37,6 +37,34 @@ Optional Environment Variables:
     OPENAI_BASE_URL, OPENAI_TEMPERATURE, OPENAI_TIMEOUT have defaults
     VANNA_LOG_LEVEL has default
     LDAP_USE_SSL has default
+    LDAP_HOSTS, LDAP_POOL_STRATEGY, LDAP_POOL_ACTIVE_RETRIES,
+    LDAP_POOL_EXHAUST_SECONDS, LDAP_CONNECT_TIMEOUT have defaults
+    AUTH_CACHE_TTL, AUTH_CACHE_MAX_SIZE have defaults
+    SESSION_SECRET (random per process if unset), SESSION_TOKEN_TTL have defaults
+    USER_DIRECTORY_ENABLED, USER_DIRECTORY_REFRESH_INTERVAL,
+    USER_DIRECTORY_CQN, USER_DIRECTORY_MISS_TTL have defaults
+    RESULT_CACHE_ENABLED, RESULT_CACHE_MAX_MB, RESULT_CACHE_MAX_ENTRY_MB,
+    RESULT_CACHE_TTL, RESULT_CACHE_TABLE_TTLS, RESULT_CACHE_POLL_INTERVAL,
+    RESULT_CACHE_FLUSH_MONITORING have defaults
+    FETCH_MAX_ROWS, FETCH_MAX_MB, FETCH_BATCH_MB, FETCH_PREFETCH_ROWS have defaults
+    RESULT_STORE_ENABLED, RESULT_STORE_TTL, RESULT_STORE_MAX_MB,
+    RESULT_PAGE_SIZE, RESULT_PAGE_MAX, RESULT_EXPORT_BATCH_ROWS,
+    RESULT_EXPORT_MAX_CONCURRENT have defaults
+    RESULT_FILE_FORMAT, RESULT_FILE_COMPRESSION have defaults
+    RESULT_PREVIEW_ROWS, RESULT_PREVIEW_MAX_TOKENS,
+    RESULT_PREVIEW_MAX_CELL_CHARS, RESULT_PROFILE_ENABLED,
+    RESULT_PROFILE_MAX_TOKENS, RESULT_PROFILE_TOP_K have defaults
+    QUERY_TIMEOUT_ADMIN, QUERY_TIMEOUT_SUPERUSER, QUERY_TIMEOUT_USER have defaults
+    PLAN_GATE_ENABLED, PLAN_GATE_ACTION, PLAN_GATE_MAX_COST_*,
+    PLAN_GATE_MAX_ROWS_*, PLAN_GATE_MAX_FULL_SCAN_ROWS, PLAN_CACHE_TTL,
+    PLAN_CACHE_SIZE have defaults
+    APPROX_ENABLED, APPROX_SAMPLE_ROWS, APPROX_MIN_TABLE_ROWS,
+    APPROX_SAMPLE_BLOCK, APPROX_STATS_TTL have defaults
+    ORACLE_POOL_MIN, ORACLE_POOL_MAX, ORACLE_POOL_INCREMENT,
+    ORACLE_POOL_WAIT_TIMEOUT, ORACLE_POOL_PING_INTERVAL have defaults
+    ORACLE_EXECUTION_MODE has default (sync)
+    EXECUTOR_ORACLE_WORKERS, EXECUTOR_LDAP_WORKERS, EXECUTOR_MILVUS_WORKERS,
+    EXECUTOR_LLM_WORKERS, EXECUTOR_FILE_WORKERS have defaults
 
 Usage:
     from backend.config import config
@@ -47,6 +75,7 @@ Usage:
 """
 
 import os
+import secrets
 from dataclasses import dataclass
 from typing import Optional
 
@@ -83,6 +112,34 @@ class OracleConfig:
         )
 
 
+@dataclass
+class OraclePoolConfig:
+    """Shared Oracle connection pool configuration."""
+    min: int = 1
+    max: int = 10
+    increment: int = 1
+    wait_timeout: int = 5000  # milliseconds to wait for a free connection
+    ping_interval: int = 60  # seconds idle before a connection is pinged
+    execution_mode: str = "sync"  # "sync" or "async" (python-oracledb async API for run_sql)
+    
+    @classmethod
+    def from_env(cls) -> "OraclePoolConfig":
+        """Load Oracle connection pool configuration from environment variables."""
+        return cls(
+            min=int(_get_env("ORACLE_POOL_MIN", "1")),
+            max=int(_get_env("ORACLE_POOL_MAX", "10")),
+            increment=int(_get_env("ORACLE_POOL_INCREMENT", "1")),
+            wait_timeout=int(_get_env("ORACLE_POOL_WAIT_TIMEOUT", "5000")),
+            ping_interval=int(_get_env("ORACLE_POOL_PING_INTERVAL", "60")),
+            execution_mode=_get_env("ORACLE_EXECUTION_MODE", "sync").lower(),
+        )
+    
+    @property
+    def use_async(self) -> bool:
+        """Check if run_sql should use the async Oracle execution path."""
+        return self.execution_mode == "async"
+
+
 @dataclass
 class OllamaConfig:
     """Ollama LLM service configuration."""
@@ -187,6 +244,13 @@ class LdapConfig:
     email_domain: str = "vanna.ai"
     guest_username: str = "guest"
     guest_email: str = "guest@vanna.ai"
+    user_cache_ttl: float = 300.0  # seconds a resolved user is reused; 0 disables
+    user_cache_max_size: int = 1000
+    hosts: str = ""  # Comma-separated host[:port] list for the server pool; defaults to host
+    pool_strategy: str = "ROUND_ROBIN"  # ROUND_ROBIN, FIRST or RANDOM
+    pool_active_retries: int = 3  # health-check rounds before giving up on the pool
+    pool_exhaust_seconds: int = 60  # seconds an unreachable server is skipped
+    connect_timeout: int = 5
     
     @classmethod
     def from_env(cls) -> "LdapConfig":
@@ -206,6 +270,42 @@ class LdapConfig:
             email_domain=email_domain,
             guest_username=guest_username,
             guest_email=_get_env("GUEST_EMAIL", f"{guest_username}@{email_domain}"),
+            user_cache_ttl=float(_get_env("AUTH_CACHE_TTL", "300.0")),
+            user_cache_max_size=int(_get_env("AUTH_CACHE_MAX_SIZE", "1000")),
+            hosts=_get_env("LDAP_HOSTS", ""),
+            pool_strategy=_get_env("LDAP_POOL_STRATEGY", "ROUND_ROBIN").upper(),
+            pool_active_retries=int(_get_env("LDAP_POOL_ACTIVE_RETRIES", "3")),
+            pool_exhaust_seconds=int(_get_env("LDAP_POOL_EXHAUST_SECONDS", "60")),
+            connect_timeout=int(_get_env("LDAP_CONNECT_TIMEOUT", "5")),
+        )
+    
+    @property
+    def hosts_list(self) -> list:
+        """Get LDAP server pool hosts as a list (falls back to LDAP_HOST)."""
+        hosts = [h.strip() for h in self.hosts.split(",") if h.strip()]
+        return hosts or [self.host]
+
+
+@dataclass
+class SessionConfig:
+    """Signed session token configuration."""
+    secret: str
+    token_ttl: float = 3600.0  # seconds
+    cookie_name: str = "vanna_session"
+    
+    @classmethod
+    def from_env(cls) -> "SessionConfig":
+        """Load session token configuration from environment variables."""
+        secret = _get_env("SESSION_SECRET")
+        if not secret:
+            # Tokens signed with a per-process secret stop validating after a
+            # restart; users then fall back to LDAP re-authentication.
+            print("Session: SESSION_SECRET not set, using a random per-process secret")
+            secret = secrets.token_hex(32)
+        return cls(
+            secret=secret,
+            token_ttl=float(_get_env("SESSION_TOKEN_TTL", "3600.0")),
+            cookie_name=_get_env("SESSION_COOKIE_NAME", "vanna_session"),
         )
 
 
@@ -319,12 +419,48 @@ class AgentConfig:
         )
 
 
+@dataclass
+class ExecutorConfig:
+    """Blocking I/O executor lane sizes (worker threads per dependency)."""
+    oracle_workers: int = 8
+    ldap_workers: int = 4
+    milvus_workers: int = 2
+    llm_workers: int = 4
+    file_workers: int = 4
+    
+    @classmethod
+    def from_env(cls) -> "ExecutorConfig":
+        """Load executor configuration from environment variables."""
+        return cls(
+            oracle_workers=int(_get_env("EXECUTOR_ORACLE_WORKERS", "8")),
+            ldap_workers=int(_get_env("EXECUTOR_LDAP_WORKERS", "4")),
+            milvus_workers=int(_get_env("EXECUTOR_MILVUS_WORKERS", "2")),
+            llm_workers=int(_get_env("EXECUTOR_LLM_WORKERS", "4")),
+            file_workers=int(_get_env("EXECUTOR_FILE_WORKERS", "4")),
+        )
+    
+    @property
+    def lane_sizes(self) -> dict:
+        """Get worker counts keyed by executor lane name."""
+        return {
+            "oracle": self.oracle_workers,
+            "ldap": self.ldap_workers,
+            "milvus": self.milvus_workers,
+            "llm": self.llm_workers,
+            "files": self.file_workers,
+        }
+
+
 @dataclass
 class RLSConfig:
     """Row-Level Security configuration."""
     enabled: bool = True
     cache_ttl: float = 300.0  # 5 minutes
     excluded_tables: str = ""  # Comma-separated list of excluded tables
+    user_cache_max_size: int = 1000
+    catalog_refresh_interval: float = 300.0  # seconds between USER_TAB_COLUMNS DDL checks
+    rewrite_cache_size: int = 500
+    mode: str = "rewrite"  # "rewrite" or "vpd"
     
     @classmethod
     def from_env(cls) -> "RLSConfig":
@@ -333,6 +469,10 @@ class RLSConfig:
             enabled=_get_env("RLS_ENABLED", "true").lower() == "true",
             cache_ttl=float(_get_env("RLS_CACHE_TTL", "300.0")),
             excluded_tables=_get_env("RLS_EXCLUDED_TABLES", ""),
+            user_cache_max_size=int(_get_env("RLS_USER_CACHE_MAX_SIZE", "1000")),
+            catalog_refresh_interval=float(_get_env("RLS_CATALOG_REFRESH_INTERVAL", "300.0")),
+            rewrite_cache_size=int(_get_env("RLS_REWRITE_CACHE_SIZE", "500")),
+            mode=_get_env("RLS_MODE", "rewrite").lower(),
         )
     
     @property
@@ -343,32 +483,263 @@ class RLSConfig:
         return [t.strip().upper() for t in self.excluded_tables.split(",") if t.strip()]
 
 
+@dataclass
+class UserDirectoryConfig:
+    """In-memory AI_USERS directory configuration."""
+    enabled: bool = True
+    refresh_interval: float = 60.0  # seconds between incremental refreshes; 0 disables
+    use_cqn: bool = False  # Oracle Continuous Query Notification (thick mode only)
+    miss_ttl: float = 10.0  # seconds an unknown username is remembered; 0 disables
+    
+    @classmethod
+    def from_env(cls) -> "UserDirectoryConfig":
+        """Load user directory configuration from environment variables."""
+        return cls(
+            enabled=_get_env("USER_DIRECTORY_ENABLED", "true").lower() == "true",
+            refresh_interval=float(_get_env("USER_DIRECTORY_REFRESH_INTERVAL", "60.0")),
+            use_cqn=_get_env("USER_DIRECTORY_CQN", "false").lower() == "true",
+            miss_ttl=float(_get_env("USER_DIRECTORY_MISS_TTL", "10.0")),
+        )
+
+
+@dataclass
+class ResultCacheConfig:
+    """Query result cache configuration."""
+    enabled: bool = True
+    max_mb: float = 256.0  # total byte budget for cached results
+    max_entry_mb: float = 32.0  # larger results are not cached
+    ttl: float = 300.0  # default seconds a result stays cached
+    table_ttls: str = ""  # Comma-separated TABLE=seconds overrides (0 = never cache)
+    poll_interval: float = 30.0  # seconds between table modification polls; 0 disables
+    flush_monitoring: bool = True  # flush DML monitoring info before each poll
+    
+    @classmethod
+    def from_env(cls) -> "ResultCacheConfig":
+        """Load result cache configuration from environment variables."""
+        return cls(
+            enabled=_get_env("RESULT_CACHE_ENABLED", "true").lower() == "true",
+            max_mb=float(_get_env("RESULT_CACHE_MAX_MB", "256")),
+            max_entry_mb=float(_get_env("RESULT_CACHE_MAX_ENTRY_MB", "32")),
+            ttl=float(_get_env("RESULT_CACHE_TTL", "300.0")),
+            table_ttls=_get_env("RESULT_CACHE_TABLE_TTLS", ""),
+            poll_interval=float(_get_env("RESULT_CACHE_POLL_INTERVAL", "30.0")),
+            flush_monitoring=_get_env("RESULT_CACHE_FLUSH_MONITORING", "true").lower() == "true",
+        )
+    
+    @property
+    def table_ttls_map(self) -> dict:
+        """Get per-table TTL overrides keyed by upper-cased table name."""
+        ttls = {}
+        for item in self.table_ttls.split(","):
+            if "=" in item:
+                table, seconds = item.split("=", 1)
+                ttls[table.strip().upper()] = float(seconds)
+        return ttls
+
+
+@dataclass
+class FetchConfig:
+    """run_sql result fetch budgets."""
+    max_rows: int = 100000  # rows kept before the result is truncated
+    max_mb: float = 100.0  # Arrow buffer size before truncation
+    batch_mb: float = 2.0  # target size of one fetch_df_batches() batch
+    prefetch_rows: int = 200  # smallest batch (rows returned with execute)
+    
+    @classmethod
+    def from_env(cls) -> "FetchConfig":
+        """Load fetch configuration from environment variables."""
+        return cls(
+            max_rows=int(_get_env("FETCH_MAX_ROWS", "100000")),
+            max_mb=float(_get_env("FETCH_MAX_MB", "100")),
+            batch_mb=float(_get_env("FETCH_BATCH_MB", "2")),
+            prefetch_rows=int(_get_env("FETCH_PREFETCH_ROWS", "200")),
+        )
+
+
+@dataclass
+class ResultStoreConfig:
+    """Server-side result store for paginated result access."""
+    enabled: bool = True
+    ttl: float = 1800.0  # seconds a result stays available to /api/results
+    max_mb: float = 512.0  # total byte budget; least recently used results are evicted
+    page_size: int = 100  # rows sent to the UI with the tool result
+    max_page_size: int = 1000  # largest limit accepted by /api/results
+    export_batch_rows: int = 50000  # rows per fetch round trip when exporting
+    export_max_concurrent: int = 2  # exports streaming at once (each holds a connection)
+    
+    @classmethod
+    def from_env(cls) -> "ResultStoreConfig":
+        """Load result store configuration from environment variables."""
+        return cls(
+            enabled=_get_env("RESULT_STORE_ENABLED", "true").lower() == "true",
+            ttl=float(_get_env("RESULT_STORE_TTL", "1800")),
+            max_mb=float(_get_env("RESULT_STORE_MAX_MB", "512")),
+            page_size=int(_get_env("RESULT_PAGE_SIZE", "100")),
+            max_page_size=int(_get_env("RESULT_PAGE_MAX", "1000")),
+            export_batch_rows=int(_get_env("RESULT_EXPORT_BATCH_ROWS", "50000")),
+            export_max_concurrent=int(_get_env("RESULT_EXPORT_MAX_CONCURRENT", "2")),
+        )
+
+
+@dataclass
+class ResultFileConfig:
+    """Format of the result files saved by run_sql."""
+    format: str = "arrow"  # arrow (memory-mapped Arrow IPC) or csv
+    compression: str = ""  # lz4 or zstd; empty keeps files zero-copy readable
+    
+    @classmethod
+    def from_env(cls) -> "ResultFileConfig":
+        """Load result file configuration from environment variables."""
+        return cls(
+            format=_get_env("RESULT_FILE_FORMAT", "arrow").lower(),
+            compression=_get_env("RESULT_FILE_COMPRESSION", "").lower(),
+        )
+
+
+@dataclass
+class ResultPreviewConfig:
+    """Size of the run_sql result preview and column profile sent to the LLM."""
+    rows: int = 10  # rows shown at most
+    max_tokens: int = 1000  # estimated token budget of the preview table
+    max_cell_chars: int = 60  # longer values are cut
+    profile_enabled: bool = True  # add a column profile when rows are not all shown
+    profile_max_tokens: int = 600  # estimated token budget of the profile
+    profile_top_k: int = 5  # most frequent values listed per text column
+    
+    @classmethod
+    def from_env(cls) -> "ResultPreviewConfig":
+        """Load result preview configuration from environment variables."""
+        return cls(
+            rows=int(_get_env("RESULT_PREVIEW_ROWS", "10")),
+            max_tokens=int(_get_env("RESULT_PREVIEW_MAX_TOKENS", "1000")),
+            max_cell_chars=int(_get_env("RESULT_PREVIEW_MAX_CELL_CHARS", "60")),
+            profile_enabled=_get_env("RESULT_PROFILE_ENABLED", "true").lower() == "true",
+            profile_max_tokens=int(_get_env("RESULT_PROFILE_MAX_TOKENS", "600")),
+            profile_top_k=int(_get_env("RESULT_PROFILE_TOP_K", "5")),
+        )
+
+
+@dataclass
+class QueryTimeoutConfig:
+    """Per-role run_sql time limits in seconds (0 disables the limit)."""
+    admin: float = 300.0
+    superuser: float = 180.0
+    user: float = 60.0
+    
+    @classmethod
+    def from_env(cls) -> "QueryTimeoutConfig":
+        """Load query timeout configuration from environment variables."""
+        return cls(
+            admin=float(_get_env("QUERY_TIMEOUT_ADMIN", "300")),
+            superuser=float(_get_env("QUERY_TIMEOUT_SUPERUSER", "180")),
+            user=float(_get_env("QUERY_TIMEOUT_USER", "60")),
+        )
+
+
+@dataclass
+class PlanGateConfig:
+    """EXPLAIN PLAN limits checked before run_sql executes a query (0 disables a limit)."""
+    enabled: bool = False
+    action: str = "reject"  # reject, or limit (FETCH FIRST when only the row estimate is over)
+    max_cost_admin: int = 0
+    max_cost_superuser: int = 10000000
+    max_cost_user: int = 1000000
+    max_rows_admin: int = 0
+    max_rows_superuser: int = 0
+    max_rows_user: int = 10000000
+    max_full_scan_rows: int = 0  # applies to every role
+    cache_ttl: float = 600.0
+    cache_size: int = 1000
+    
+    @classmethod
+    def from_env(cls) -> "PlanGateConfig":
+        """Load plan gate configuration from environment variables."""
+        return cls(
+            enabled=_get_env("PLAN_GATE_ENABLED", "false").lower() == "true",
+            action=_get_env("PLAN_GATE_ACTION", "reject").lower(),
+            max_cost_admin=int(_get_env("PLAN_GATE_MAX_COST_ADMIN", "0")),
+            max_cost_superuser=int(_get_env("PLAN_GATE_MAX_COST_SUPERUSER", "10000000")),
+            max_cost_user=int(_get_env("PLAN_GATE_MAX_COST_USER", "1000000")),
+            max_rows_admin=int(_get_env("PLAN_GATE_MAX_ROWS_ADMIN", "0")),
+            max_rows_superuser=int(_get_env("PLAN_GATE_MAX_ROWS_SUPERUSER", "0")),
+            max_rows_user=int(_get_env("PLAN_GATE_MAX_ROWS_USER", "10000000")),
+            max_full_scan_rows=int(_get_env("PLAN_GATE_MAX_FULL_SCAN_ROWS", "0")),
+            cache_ttl=float(_get_env("PLAN_CACHE_TTL", "600")),
+            cache_size=int(_get_env("PLAN_CACHE_SIZE", "1000")),
+        )
+
+
+@dataclass
+class ApproximateConfig:
+    """Approximate answers for run_sql calls with approximate=true."""
+    enabled: bool = False
+    sample_rows: int = 100000  # rows a SAMPLE clause should read
+    min_table_rows: int = 1000000  # smaller tables are not sampled
+    sample_block: bool = False  # SAMPLE BLOCK instead of row sampling
+    stats_ttl: float = 3600.0  # seconds a table's NUM_ROWS stays cached
+    
+    @classmethod
+    def from_env(cls) -> "ApproximateConfig":
+        """Load approximate mode configuration from environment variables."""
+        return cls(
+            enabled=_get_env("APPROX_ENABLED", "false").lower() == "true",
+            sample_rows=int(_get_env("APPROX_SAMPLE_ROWS", "100000")),
+            min_table_rows=int(_get_env("APPROX_MIN_TABLE_ROWS", "1000000")),
+            sample_block=_get_env("APPROX_SAMPLE_BLOCK", "false").lower() == "true",
+            stats_ttl=float(_get_env("APPROX_STATS_TTL", "3600")),
+        )
+
+
 @dataclass
 class AppConfig:
     """Complete application configuration."""
     oracle: OracleConfig
+    oracle_pool: OraclePoolConfig
     ollama: OllamaConfig
     openai: OpenAIConfig
     milvus: MilvusConfig
     server: ServerConfig
     ldap: LdapConfig
+    session: SessionConfig
     ui: UIConfig
     agent: AgentConfig
+    executor: ExecutorConfig
     rls: RLSConfig
+    user_directory: UserDirectoryConfig
+    result_cache: ResultCacheConfig
+    fetch: FetchConfig
+    result_store: ResultStoreConfig
+    result_files: ResultFileConfig
+    result_preview: ResultPreviewConfig
+    query_timeout: QueryTimeoutConfig
+    plan_gate: PlanGateConfig
+    approximate: ApproximateConfig
     
     @classmethod
     def from_env(cls) -> "AppConfig":
         """Load complete configuration from environment variables."""
         return cls(
             oracle=OracleConfig.from_env(),
+            oracle_pool=OraclePoolConfig.from_env(),
             ollama=OllamaConfig.from_env(),
             openai=OpenAIConfig.from_env(),
             milvus=MilvusConfig.from_env(),
             server=ServerConfig.from_env(),
             ldap=LdapConfig.from_env(),
+            session=SessionConfig.from_env(),
             ui=UIConfig.from_env(),
             agent=AgentConfig.from_env(),
+            executor=ExecutorConfig.from_env(),
             rls=RLSConfig.from_env(),
+            user_directory=UserDirectoryConfig.from_env(),
+            result_cache=ResultCacheConfig.from_env(),
+            fetch=FetchConfig.from_env(),
+            result_store=ResultStoreConfig.from_env(),
+            result_files=ResultFileConfig.from_env(),
+            result_preview=ResultPreviewConfig.from_env(),
+            query_timeout=QueryTimeoutConfig.from_env(),
+            plan_gate=PlanGateConfig.from_env(),
+            approximate=ApproximateConfig.from_env(),
         )
     
     @property
@@ -0,0 +1,340 @@
+"""
+Shared Oracle Connection Pools for Database Chat Application.
+
+This module provides the process-wide python-oracledb connection pools that
+are created once in the agent factory and injected into every component
+that talks to Oracle (user resolver, RLS service, SQL tool, schema tools).
+
+- OraclePool: synchronous pool. Pooled connections are returned to the
+  pool by calling close(), so callers keep the usual connection/cursor code.
+- AsyncOraclePool: python-oracledb async pool (create_pool_async) used by
+  run_sql when ORACLE_EXECUTION_MODE=async, so queries are awaitable
+  without blocking the event loop and can be cancelled per query. Results
+  are fetched straight into Arrow (fetch_arrow).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import oracledb
+import pyarrow as pa
+
+from .query_timeout import is_call_timeout
+from .result_fetch import BoundedFetch, FetchLimits
+
+logger = logging.getLogger(__name__)
+
+
+class _AcquireStats:
+    """Thread-safe counters for pool acquire calls and wait times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquires = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float):
+        with self._lock:
+            self.acquires += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            acquires = self.acquires
+            return {
+                "acquires": acquires,
+                "acquire_failures": self.failures,
+                "avg_wait_ms": round(self.total_wait / acquires * 1000, 3) if acquires else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+            }
+
+
+class OraclePool:
+    """
+    Lazily created, process-wide Oracle connection pool.
+
+    The pool is created on first acquire so the application can start
+    while the database is still coming up. Acquire wait times are tracked
+    so pool pressure can be monitored through the metrics endpoint.
+    """
+
+    def __init__(self, oracle_config, pool_config):
+        """
+        Initialize the pool wrapper.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool_config: Pool sizing configuration (min, max, increment,
+                wait_timeout in milliseconds, ping_interval in seconds)
+        """
+        self.oracle_config = oracle_config
+        self.pool_config = pool_config
+        self._pool: Optional[oracledb.ConnectionPool] = None
+        self._lock = threading.Lock()
+        self._stats = _AcquireStats()
+
+    @property
+    def pool(self) -> oracledb.ConnectionPool:
+        """Lazy-initialize the underlying oracledb pool."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = oracledb.create_pool(
+                        user=self.oracle_config.user,
+                        password=self.oracle_config.password,
+                        dsn=self.oracle_config.dsn,
+                        min=self.pool_config.min,
+                        max=self.pool_config.max,
+                        increment=self.pool_config.increment,
+                        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                        wait_timeout=self.pool_config.wait_timeout,
+                        ping_interval=self.pool_config.ping_interval,
+                    )
+                    logger.info(
+                        f"OraclePool: Created pool min={self.pool_config.min} "
+                        f"max={self.pool_config.max} increment={self.pool_config.increment}"
+                    )
+        return self._pool
+
+    def acquire(self) -> oracledb.Connection:
+        """
+        Acquire a connection from the pool.
+
+        The connection is released back to the pool when close() is called.
+
+        Returns:
+            A pooled oracledb Connection
+
+        Raises:
+            oracledb.Error: If no connection becomes available within wait_timeout
+        """
+        pool = self.pool
+        start = time.perf_counter()
+        try:
+            connection = pool.acquire()
+        except oracledb.Error:
+            self._stats.record_failure()
+            raise
+        self._stats.record(time.perf_counter() - start)
+        return connection
+
+    def drop(self, connection: oracledb.Connection):
+        """
+        Close a pooled connection instead of returning it to the pool.
+
+        Used when a session may carry state (e.g. an interrupted call or a
+        user context that could not be cleared) that must not be reused.
+        """
+        self.pool.drop(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics for monitoring.
+
+        Returns:
+            Dictionary with open/busy connection counts and acquire wait times
+        """
+        pool = self._pool
+        stats = {
+            "created": pool is not None,
+            "min": self.pool_config.min,
+            "max": self.pool_config.max,
+            "open": pool.opened if pool is not None else 0,
+            "busy": pool.busy if pool is not None else 0,
+        }
+        stats.update(self._stats.snapshot())
+        return stats
+
+    def close(self):
+        """Close the pool and all of its connections."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close(force=True)
+                self._pool = None
+                logger.info("OraclePool: Pool closed")
+
+
+class AsyncOraclePool:
+    """
+    Async Oracle connection pool running on a dedicated event loop.
+
+    python-oracledb async pools are bound to the event loop that created
+    them, while the Flask server runs each chat request on its own short
+    lived loop. The pool therefore lives on a background loop thread and
+    callers await its coroutines from any loop through wrap_future.
+
+    Cancelling the awaiting task cancels the query: the in-flight call is
+    interrupted with connection.cancel() and the session is dropped from
+    the pool instead of being reused.
+    """
+
+    def __init__(self, oracle_config, pool_config):
+        """
+        Initialize the async pool wrapper.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool_config: Pool sizing configuration (same settings as OraclePool)
+        """
+        self.oracle_config = oracle_config
+        self.pool_config = pool_config
+        self._pool: Optional[oracledb.AsyncConnectionPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = _AcquireStats()
+        self._cancelled = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop and create the pool on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="oracle-async-pool",
+                        daemon=True
+                    )
+                    thread.start()
+                    asyncio.run_coroutine_threadsafe(self._create_pool(), loop).result()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+    async def _create_pool(self):
+        self._pool = oracledb.create_pool_async(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn,
+            min=self.pool_config.min,
+            max=self.pool_config.max,
+            increment=self.pool_config.increment,
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=self.pool_config.wait_timeout,
+            ping_interval=self.pool_config.ping_interval,
+        )
+        logger.info(
+            f"AsyncOraclePool: Created pool min={self.pool_config.min} "
+            f"max={self.pool_config.max} increment={self.pool_config.increment}"
+        )
+
+    async def _acquire(self) -> oracledb.AsyncConnection:
+        start = time.perf_counter()
+        try:
+            connection = await self._pool.acquire()
+        except oracledb.Error:
+            self._stats.record_failure()
+            raise
+        self._stats.record(time.perf_counter() - start)
+        return connection
+
+    async def _run_on_pool_loop(self, coro):
+        """Run a coroutine on the pool's loop and await it from the caller's loop."""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return await asyncio.wrap_future(future)
+
+    async def fetch_arrow(
+        self,
+        sql: str,
+        bind_params: Optional[Dict[str, Any]] = None,
+        limits: Optional[FetchLimits] = None,
+        call_timeout: Optional[float] = None
+    ) -> pa.Table:
+        """
+        Execute a query and fetch it into Arrow, stopping at a row/byte budget.
+
+        Args:
+            sql: The SQL query to execute
+            bind_params: Optional bind parameters
+            limits: Row/byte budgets and batch sizing
+            call_timeout: Optional limit in seconds for each round trip
+
+        Returns:
+            The result as a pyarrow.Table (see result_fetch.is_truncated)
+
+        Raises:
+            oracledb.Error: If the query fails
+            asyncio.CancelledError: If the awaiting task is cancelled
+        """
+        fetch = BoundedFetch(limits)
+        return await self._run_on_pool_loop(
+            self._with_connection(lambda connection: fetch.fetch_async(connection, sql, bind_params), call_timeout)
+        )
+
+    async def _with_connection(
+        self,
+        work: Callable[[Any], Awaitable[Any]],
+        call_timeout: Optional[float] = None
+    ) -> Any:
+        connection = await self._acquire()
+        if call_timeout:
+            connection.call_timeout = int(call_timeout * 1000)
+        try:
+            return await work(connection)
+        except oracledb.Error as e:
+            if is_call_timeout(e):
+                # A timed-out session may still be mid-call; never reuse it
+                await self._pool.drop(connection)
+                connection = None
+            raise
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            logger.info("AsyncOraclePool: Query cancelled, interrupting database call")
+            try:
+                connection.cancel()
+            finally:
+                # The session may still be mid-call; never hand it to another query
+                await self._pool.drop(connection)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                connection.call_timeout = 0
+                await self._pool.release(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get async pool statistics for monitoring.
+
+        Returns:
+            Dictionary with open/busy connection counts, acquire wait times
+            and the number of cancelled queries
+        """
+        pool = self._pool
+        stats = {
+            "created": pool is not None,
+            "min": self.pool_config.min,
+            "max": self.pool_config.max,
+            "open": pool.opened if pool is not None else 0,
+            "busy": pool.busy if pool is not None else 0,
+            "cancelled_queries": self._cancelled,
+        }
+        stats.update(self._stats.snapshot())
+        return stats
+
+    def close(self):
+        """Close the pool and stop the background loop."""
+        with self._lock:
+            if self._loop is None:
+                return
+            if self._pool is not None:
+                asyncio.run_coroutine_threadsafe(self._pool.close(force=True), self._loop).result()
+                self._pool = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            logger.info("AsyncOraclePool: Pool closed")
@@ -15,6 +15,9 @@ from vanna.core.tool import Tool, ToolContext, ToolResult
 
 import oracledb
 
+from .db_pool import OraclePool
+from .executor import BlockingExecutor, ORACLE_LANE
+
 logger = logging.getLogger(__name__)
 
 # Tables to exclude from schema listing (system/internal tables)
@@ -52,14 +55,23 @@ class ListAllTablesTool(Tool[ListTablesArgs]):
     especially to find related tables for comprehensive queries.
     """
     
-    def __init__(self, oracle_config):
+    def __init__(
+        self,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        executor: Optional[BlockingExecutor] = None
+    ):
         """
         Initialize the schema listing tool.
         
         Args:
             oracle_config: Oracle database configuration
+            pool: Optional shared Oracle connection pool
+            executor: Optional shared executor for blocking database calls
         """
         self.oracle_config = oracle_config
+        self.pool = pool
+        self.executor = executor or BlockingExecutor()
     
     @property
     def name(self) -> str:
@@ -78,7 +90,9 @@ class ListAllTablesTool(Tool[ListTablesArgs]):
         return ListTablesArgs
     
     def _get_connection(self) -> oracledb.Connection:
-        """Create a database connection."""
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
         return oracledb.connect(
             user=self.oracle_config.user,
             password=self.oracle_config.password,
@@ -228,8 +242,10 @@ class ListAllTablesTool(Tool[ListTablesArgs]):
         logger.info(f"ListAllTablesTool: Executing for user '{user.id}'")
         
         try:
-            # List all tables
-            tables_info = self._list_tables(
+            # List all tables (blocking metadata queries run on the oracle lane)
+            tables_info = await self.executor.run(
+                ORACLE_LANE,
+                self._list_tables,
                 include_columns=args.include_columns,
                 table_filter=args.table_filter
             )
@@ -0,0 +1,176 @@
+"""
+Bounded Blocking-I/O Executor for Database Chat Application.
+
+Tools and the user resolver are async, but their dependencies (oracledb in
+thin sync mode, ldap3, pymilvus, the OpenAI client used for schema
+documentation, result file I/O) block. This module provides one central executor with a
+separately sized thread pool ("lane") per dependency, so blocking work never
+runs on the event loop and one slow dependency cannot starve the others.
+
+Each lane tracks queue depth (submitted but not yet started), in-flight work
+and queue wait time for the metrics endpoint.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lane names used by the backend components
+ORACLE_LANE = "oracle"
+LDAP_LANE = "ldap"
+MILVUS_LANE = "milvus"
+LLM_LANE = "llm"
+FILE_LANE = "files"
+
+DEFAULT_LANE_SIZES = {
+    ORACLE_LANE: 8,
+    LDAP_LANE: 4,
+    MILVUS_LANE: 2,
+    LLM_LANE: 4,
+    FILE_LANE: 4,
+}
+
+
+class _Lane:
+    """A sized thread pool plus its queue statistics."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-io")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def submit(self, func: Callable[[], Any]) -> Future:
+        """Submit a callable, recording queue wait and run time."""
+        submitted = time.perf_counter()
+        dequeued = False
+        with self._lock:
+            self.queued += 1
+
+        def dequeue() -> bool:
+            # Called with the lock held, by the worker or when a future that
+            # never started is cancelled; only the first call counts
+            nonlocal dequeued
+            if dequeued:
+                return False
+            dequeued = True
+            self.queued -= 1
+            return True
+
+        def run():
+            started = time.perf_counter()
+            waited = started - submitted
+            with self._lock:
+                dequeue()
+                self.running += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+            ok = False
+            try:
+                result = func()
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.total_run += time.perf_counter() - started
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        def on_done(future: Future):
+            if future.cancelled():
+                with self._lock:
+                    dequeue()
+
+        future = self.pool.submit(run)
+        future.add_done_callback(on_done)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait / finished * 1000, 3) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "avg_run_ms": round(self.total_run / finished * 1000, 3) if finished else 0.0,
+            }
+
+
+class BlockingExecutor:
+    """
+    Central executor that routes blocking calls to per-dependency lanes.
+
+    Usage:
+        rows = await executor.run(ORACLE_LANE, self._list_tables, include_columns=True)
+    """
+
+    def __init__(self, lane_sizes: Optional[Dict[str, int]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            lane_sizes: Optional mapping of lane name to worker count.
+                Missing lanes use DEFAULT_LANE_SIZES.
+        """
+        sizes = dict(DEFAULT_LANE_SIZES)
+        if lane_sizes:
+            sizes.update(lane_sizes)
+        self._lanes = {name: _Lane(name, max(1, size)) for name, size in sizes.items()}
+
+    async def run(self, lane: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the given lane and await its result.
+
+        Args:
+            lane: Lane name (oracle, ldap, milvus, llm)
+            func: Blocking callable
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ValueError: If the lane does not exist
+            Exception: Whatever func raises
+        """
+        lane_obj = self._lanes.get(lane)
+        if lane_obj is None:
+            raise ValueError(f"Unknown executor lane: {lane}")
+
+        call = functools.partial(func, *args, **kwargs)
+        # Cancelling the awaiting task cancels the future if it has not started
+        return await asyncio.wrap_future(lane_obj.submit(call))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-lane statistics for monitoring.
+
+        Returns:
+            Dictionary mapping lane names to queue depth and wait-time stats
+        """
+        return {name: lane.stats() for name, lane in self._lanes.items()}
+
+    def shutdown(self, wait: bool = True):
+        """Shut down all lanes."""
+        for lane in self._lanes.values():
+            lane.pool.shutdown(wait=wait)
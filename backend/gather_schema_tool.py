@@ -6,10 +6,12 @@ trigger schema training via the /gather command.
 """
 
 import logging
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
 from vanna.core.tool import Tool, ToolContext, ToolResult
 
+from .executor import BlockingExecutor, LLM_LANE
+
 logger = logging.getLogger(__name__)
 
 class GatherSchemaArgs(BaseModel):
@@ -19,10 +21,11 @@ class GatherSchemaArgs(BaseModel):
 class GatherSchemaTool(Tool):
     """Tool for triggering manual schema training."""
     
-    def __init__(self, schema_trainer):
+    def __init__(self, schema_trainer, executor: Optional[BlockingExecutor] = None):
         """Initialize the gather schema tool."""
         super().__init__()
         self.schema_trainer = schema_trainer
+        self.executor = executor or BlockingExecutor()
 
     @property
     def name(self) -> str:
@@ -56,7 +59,9 @@ class GatherSchemaTool(Tool):
         logger.info(f"Schema training triggered by user: {user.id}")
         
         try:
-            items_trained = self.schema_trainer.train_schema()
+            # Training is dominated by per-table LLM documentation calls,
+            # so it runs on the llm lane rather than holding an oracle worker
+            items_trained = await self.executor.run(LLM_LANE, self.schema_trainer.train_schema)
             
             return ToolResult(
                 success=True,
@@ -16,16 +16,21 @@ Environment Variables:
 
 from .config import config
 from .server import VannaFlaskServer
-from .agent_factory import create_agent
+from .agent_factory import create_agent, create_result_exporter, create_result_store
 
 
 def main():
     """Main entry point for the application."""
     _print_startup_banner()
     
-    agent = create_agent()
+    result_store = create_result_store()
+    agent = create_agent(result_store)
     
-    server = VannaFlaskServer(agent)
+    server = VannaFlaskServer(
+        agent,
+        result_store=result_store,
+        result_exporter=create_result_exporter()
+    )
     server.run(
         host=config.server.host,
         port=config.server.port,
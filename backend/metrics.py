@@ -0,0 +1,55 @@
+"""
+Runtime Metrics Registry for Database Chat Application.
+
+Backend components (connection pools, caches, executors) register a
+callable that returns a snapshot of their statistics. The server exposes
+the combined snapshot to admins at /api/metrics for monitoring.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def register_metrics_source(name: str, source: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Register a statistics provider under a unique name.
+
+    Args:
+        name: Key under which the statistics are reported (e.g. "oracle_pool")
+        source: Callable returning a JSON-serializable dictionary
+    """
+    with _lock:
+        _sources[name] = source
+
+
+def unregister_metrics_source(name: str) -> None:
+    """Remove a previously registered statistics provider."""
+    with _lock:
+        _sources.pop(name, None)
+
+
+def collect_metrics() -> Dict[str, Any]:
+    """
+    Collect a snapshot from every registered statistics provider.
+
+    Returns:
+        Dictionary mapping source names to their statistics. A failing
+        provider reports its error instead of breaking the whole snapshot.
+    """
+    with _lock:
+        sources = dict(_sources)
+
+    snapshot = {}
+    for name, source in sources.items():
+        try:
+            snapshot[name] = source()
+        except Exception as e:
+            logger.warning(f"Metrics: Source '{name}' failed: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
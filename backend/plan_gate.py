@@ -0,0 +1,325 @@
+"""
+EXPLAIN PLAN Cost Gate for Database Chat Application.
+
+With PLAN_GATE_ENABLED, run_sql explains the final (RLS-rewritten) query
+before executing it and reads the optimizer's estimates from PLAN_TABLE:
+total cost, cardinality and the full table scans. A query over its role's
+limits is not executed. Depending on PLAN_GATE_ACTION it is either
+rejected, or, if only the row estimate is too high, run with a
+FETCH FIRST limit. Either way the LLM receives a short plan summary so it
+can rewrite the query.
+
+Plans are cached by SQL shape (normalized SQL with literals masked), so
+repeated and per-user RLS variants of a query are explained once per
+PLAN_CACHE_TTL.
+"""
+
+import logging
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import TTLCache
+from .rls_rewriter import tokenize
+from .rls_service import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+# String and numeric literals; quoted identifiers are kept
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|\b\d+(?:\.\d+)?\b")
+
+# Plan lines shown to the LLM
+_SUMMARY_STEPS = 12
+
+_PLAN_QUERY = """
+    SELECT id, depth, operation, options, object_name, cost, cardinality
+    FROM plan_table
+    WHERE statement_id = :statement_id
+    ORDER BY id
+"""
+
+
+def sql_shape(sql: str) -> str:
+    """
+    Reduce SQL to its shape: normalized whitespace, literals masked.
+
+    Args:
+        sql: The SQL text
+
+    Returns:
+        The shape used as plan cache key
+    """
+    def mask(match):
+        text = match.group(0)
+        if text.startswith('"'):
+            return text
+        return "'?'" if text.startswith("'") else "?"
+
+    return _LITERAL.sub(mask, normalize_sql(sql))
+
+
+@dataclass
+class PlanStep:
+    """One operation of an execution plan."""
+    id: int
+    depth: int
+    operation: str
+    options: Optional[str]
+    object_name: Optional[str]
+    cost: Optional[int]
+    cardinality: Optional[int]
+
+    @property
+    def is_full_scan(self) -> bool:
+        return self.operation.endswith("ACCESS") and (self.options or "").startswith("FULL")
+
+    def describe(self) -> str:
+        name = " ".join(part for part in (self.operation, self.options, self.object_name) if part)
+        return f"{'  ' * self.depth}{name} (cost {self.cost}, rows {self.cardinality})"
+
+
+@dataclass
+class PlanSummary:
+    """Optimizer estimates of one statement."""
+    cost: int
+    cardinality: int
+    steps: List[PlanStep] = field(default_factory=list)
+
+    @property
+    def full_scans(self) -> List[PlanStep]:
+        return [step for step in self.steps if step.is_full_scan]
+
+    def describe(self) -> str:
+        """Render the plan for the LLM (at most _SUMMARY_STEPS operations)."""
+        lines = [f"Estimated cost {self.cost}, estimated rows {self.cardinality}."]
+        scans = self.full_scans
+        if scans:
+            lines.append("Full table scans: " + ", ".join(
+                f"{step.object_name} (~{step.cardinality} rows)" for step in scans
+            ))
+        lines.append("Plan:")
+        lines.extend(step.describe() for step in self.steps[:_SUMMARY_STEPS])
+        if len(self.steps) > _SUMMARY_STEPS:
+            lines.append(f"... ({len(self.steps) - _SUMMARY_STEPS} more operations)")
+        return "\n".join(lines)
+
+
+@dataclass
+class PlanLimits:
+    """Optimizer estimate limits of one role (0 disables a limit)."""
+    max_cost: int = 0
+    max_rows: int = 0
+    max_full_scan_rows: int = 0  # full table scans returning more rows are refused
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_cost or self.max_rows or self.max_full_scan_rows)
+
+
+@dataclass
+class PlanVerdict:
+    """Outcome of the plan check of one query."""
+    action: str  # "passed", "limited" or "rejected"
+    summary: PlanSummary
+    violations: List[str]
+    sql: str  # the SQL to execute (with FETCH FIRST when limited)
+    row_limit: Optional[int] = None
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "cost": self.summary.cost,
+            "rows": self.summary.cardinality,
+            "violations": self.violations,
+            "row_limit": self.row_limit,
+        }
+
+
+class PlanGate:
+    """
+    Checks optimizer estimates of queries against per-role limits.
+
+    The gate does not own connections: explain() runs on a connection the
+    caller prepared (pooled, with the user's VPD context when needed).
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, PlanLimits],
+        action: str = "reject",
+        cache_ttl: float = 600.0,
+        cache_size: int = 1000
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            limits: PlanLimits by role ("admin", "superuser", "user")
+            action: "reject" refuses queries over a limit; "limit" runs
+                queries whose only problem is the row estimate with
+                FETCH FIRST
+            cache_ttl: Seconds a plan stays cached (0 disables the cache)
+            cache_size: Maximum number of cached plans
+        """
+        self.limits = limits
+        self.action = action
+        self.plan_cache = TTLCache(max_size=cache_size, ttl=cache_ttl, name="plan_cache")
+        self._lock = threading.Lock()
+        self._checks = 0
+        self._passed = 0
+        self._limited = 0
+        self._rejected = 0
+        self._errors = 0
+
+    def limits_for(self, groups: Optional[Iterable[str]]) -> Optional[PlanLimits]:
+        """
+        Get the limits for a user's groups (the highest role wins).
+
+        Returns:
+            PlanLimits, or None if the user's queries are not checked
+        """
+        names = {g.lower() for g in groups or []}
+        role = next((r for r in ("admin", "superuser") if r in names), "user")
+        limits = self.limits.get(role)
+        return limits if limits is not None and limits.enabled else None
+
+    def explain(self, connection, sql: str, bind_params: Optional[Dict[str, Any]] = None) -> PlanSummary:
+        """
+        Explain a statement and read its plan from PLAN_TABLE (blocking).
+
+        The plan rows are rolled back afterwards, so nothing persists in
+        the session.
+
+        Args:
+            connection: The connection to explain on
+            sql: The statement
+            bind_params: Its bind values (needed to parse; not peeked)
+
+        Returns:
+            PlanSummary of the statement
+        """
+        statement_id = uuid.uuid4().hex[:30]
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}", bind_params or {})
+            cursor.execute(_PLAN_QUERY, statement_id=statement_id)
+            steps = [PlanStep(*row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            connection.rollback()
+        if not steps:
+            raise ValueError("PLAN_TABLE returned no plan")
+        root = steps[0]
+        return PlanSummary(cost=root.cost or 0, cardinality=root.cardinality or 0, steps=steps)
+
+    def cached_plan(self, sql: str, vpd: bool, loader) -> PlanSummary:
+        """
+        Get the plan of a query by its shape, calling loader() on a miss.
+
+        Args:
+            sql: The final SQL
+            vpd: Whether the query runs under a VPD context (its plan
+                includes the policy predicates)
+            loader: Callable explaining the query
+
+        Returns:
+            PlanSummary of the query
+        """
+        return self.plan_cache.get_or_load((sql_shape(sql), vpd), loader)
+
+    def violations(self, summary: PlanSummary, limits: PlanLimits) -> Tuple[List[str], bool]:
+        """
+        Compare a plan with a role's limits.
+
+        Returns:
+            Tuple of (violation messages, whether only the row estimate is
+            over its limit)
+        """
+        messages = []
+        rows_only = True
+        if limits.max_cost and summary.cost > limits.max_cost:
+            messages.append(f"estimated cost {summary.cost} exceeds the limit of {limits.max_cost}")
+            rows_only = False
+        if limits.max_rows and summary.cardinality > limits.max_rows:
+            messages.append(f"estimated {summary.cardinality} rows exceed the limit of {limits.max_rows}")
+        if limits.max_full_scan_rows:
+            for step in summary.full_scans:
+                if (step.cardinality or 0) > limits.max_full_scan_rows:
+                    messages.append(
+                        f"full table scan of {step.object_name} (~{step.cardinality} rows) exceeds "
+                        f"the limit of {limits.max_full_scan_rows} rows"
+                    )
+                    rows_only = False
+        return messages, rows_only and bool(messages)
+
+    def record(self, action: str):
+        """Count a check outcome ("passed", "limited", "rejected" or "error")."""
+        with self._lock:
+            self._checks += 1
+            if action == "passed":
+                self._passed += 1
+            elif action == "limited":
+                self._limited += 1
+            elif action == "rejected":
+                self._rejected += 1
+            else:
+                self._errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get plan gate statistics for monitoring.
+
+        Returns:
+            Dictionary with check outcome counts and plan cache statistics
+        """
+        with self._lock:
+            stats = {
+                "action": self.action,
+                "checks": self._checks,
+                "passed": self._passed,
+                "limited": self._limited,
+                "rejected": self._rejected,
+                "errors": self._errors,
+            }
+        stats["plan_cache"] = self.plan_cache.stats()
+        return stats
+
+
+def _has_row_limit(sql: str) -> bool:
+    """Check whether a query has its own FETCH or OFFSET clause (outside parentheses)."""
+    depth = 0
+    tokens = tokenize(sql)
+    for i, token in enumerate(tokens):
+        if token.kind == "punct" and token.text == "(":
+            depth += 1
+        elif token.kind == "punct" and token.text == ")":
+            depth -= 1
+        elif depth == 0 and token.kind == "word" and token.upper in ("FETCH", "OFFSET"):
+            following = tokens[i + 1].upper if i + 1 < len(tokens) else ""
+            if token.upper == "OFFSET" or following in ("FIRST", "NEXT"):
+                return True
+    return False
+
+
+def limit_rows(sql: str, rows: int) -> str:
+    """
+    Limit a query to at most rows rows.
+
+    FETCH FIRST is appended to the statement itself, so select lists with
+    repeated column names (joins) stay valid. Only a query that has its own
+    FETCH/OFFSET clause is wrapped in an inline view.
+
+    Args:
+        sql: The query
+        rows: Row limit
+
+    Returns:
+        <sql> FETCH FIRST <rows> ROWS ONLY, or
+        SELECT * FROM (<sql>) FETCH FIRST <rows> ROWS ONLY
+    """
+    sql = normalize_sql(sql).rstrip().rstrip(";").rstrip()
+    if _has_row_limit(sql):
+        return f"SELECT * FROM ({sql}) FETCH FIRST {int(rows)} ROWS ONLY"
+    return f"{sql} FETCH FIRST {int(rows)} ROWS ONLY"
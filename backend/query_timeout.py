@@ -0,0 +1,162 @@
+"""
+Query Timeouts and Cancellation for Database Chat Application.
+
+run_sql limits how long a query may run per role (QUERY_TIMEOUT_ADMIN,
+QUERY_TIMEOUT_SUPERUSER, QUERY_TIMEOUT_USER). The limit is enforced twice:
+- as python-oracledb's connection.call_timeout, so every round trip to the
+  database is interrupted by the driver;
+- as an overall deadline on the awaiting task, which also covers results
+  fetched in many round trips.
+
+When the task awaiting a query is cancelled (deadline, client disconnect
+or an aborted agent run), the in-flight call is interrupted with
+connection.cancel() through the query's QueryHandle, and the session is
+dropped from the pool instead of being reused.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Error codes of an exceeded call timeout (python-oracledb maps the thick
+# mode DPI-1067 to DPY-4024) and of a call interrupted by cancel()
+CALL_TIMEOUT_CODES = {"DPY-4024", "ORA-03156"}
+CANCELLED_CODES = {"ORA-01013", "DPY-4011"}
+
+
+class QueryTimeout(Exception):
+    """A query exceeded the time limit of the user's role."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Query exceeded the time limit of {seconds:g} seconds")
+        self.seconds = seconds
+
+
+class QueryCancelledBeforeStart(Exception):
+    """The query was cancelled before it reached the database."""
+
+
+def error_code(error: Exception) -> Optional[str]:
+    """Get the full error code (e.g. "ORA-01013") of an oracledb error."""
+    if error.args and hasattr(error.args[0], "full_code"):
+        return error.args[0].full_code
+    return None
+
+
+def is_call_timeout(error: Exception) -> bool:
+    """Check whether an oracledb error is an exceeded call_timeout."""
+    return error_code(error) in CALL_TIMEOUT_CODES
+
+
+class QueryHandle:
+    """
+    Cancellation handle of one query running on an executor thread.
+
+    The worker thread attaches the connection it runs the query on; the
+    awaiting task calls cancel() when it is cancelled, interrupting the
+    database call from the event loop thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self.cancelled = False
+
+    def attach(self, connection):
+        """
+        Register the connection running the query (worker thread).
+
+        Raises:
+            QueryCancelledBeforeStart: If the query was cancelled while it
+                was waiting for a connection
+        """
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledBeforeStart()
+            self._connection = connection
+
+    def detach(self):
+        """Unregister the connection before it is released (worker thread)."""
+        with self._lock:
+            self._connection = None
+
+    def cancel(self):
+        """Interrupt the running database call, if any (any thread)."""
+        with self._lock:
+            self.cancelled = True
+            connection = self._connection
+        if connection is not None:
+            try:
+                connection.cancel()
+            except Exception as e:
+                logger.warning(f"QueryHandle: Could not cancel database call: {e}")
+
+
+class QueryTimeouts:
+    """Per-role query time limits, with timeout and cancellation counts."""
+
+    def __init__(self, admin: float = 300.0, superuser: float = 180.0, user: float = 60.0):
+        """
+        Initialize the limits.
+
+        Args:
+            admin: Seconds a query of an admin may run (0 disables the limit)
+            superuser: Seconds a query of a superuser may run
+            user: Seconds a query of any other user may run
+        """
+        self.admin = admin
+        self.superuser = superuser
+        self.user = user
+        self._lock = threading.Lock()
+        self._timeouts = 0
+        self._cancellations = 0
+
+    def for_groups(self, groups: Optional[Iterable[str]]) -> Optional[float]:
+        """
+        Get the time limit for a user's groups.
+
+        A user in several role groups gets the most generous limit among
+        them; any other user gets the user limit.
+
+        Args:
+            groups: The user's group memberships
+
+        Returns:
+            Seconds, or None if the query may run without a limit
+        """
+        names = {g.lower() for g in groups or []}
+        limits = [getattr(self, role) for role in ("admin", "superuser") if role in names]
+        if not limits:
+            limits = [self.user]
+        if any(limit <= 0 for limit in limits):
+            return None
+        return max(limits)
+
+    def record_timeout(self):
+        """Count a query that exceeded its time limit."""
+        with self._lock:
+            self._timeouts += 1
+
+    def record_cancellation(self):
+        """Count a query cancelled by its caller."""
+        with self._lock:
+            self._cancellations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get timeout statistics for monitoring.
+
+        Returns:
+            Dictionary with the per-role limits and the timeout and
+            cancellation counts
+        """
+        with self._lock:
+            return {
+                "admin_seconds": self.admin,
+                "superuser_seconds": self.superuser,
+                "user_seconds": self.user,
+                "timeouts": self._timeouts,
+                "cancellations": self._cancellations,
+            }
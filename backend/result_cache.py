@@ -0,0 +1,461 @@
+"""
+Query Result Cache for Database Chat Application.
+
+Caches run_sql results so repeated questions do not re-execute against
+Oracle. Entries are keyed by:
+
+- the normalized final SQL (after RLS rewriting)
+- the bind values
+- the user's RLS fingerprint (a hash of their filter values, or
+  "privileged" for unfiltered access)
+
+so a cached result can never be served across filter scopes.
+
+Results are stored as the pyarrow.Table run_sql fetched (repetitive string
+columns dictionary-encoded), so a hit shares the immutable Arrow buffers
+instead of copying them. The cache evicts
+least recently used entries to stay within a byte budget. Each entry
+expires after the shortest TTL of the tables it reads.
+
+Invalidation: a background thread polls USER_TAB_MODIFICATIONS (after
+flushing DML monitoring info, when permitted) and USER_OBJECTS.LAST_DDL_TIME,
+and drops every entry that reads a changed table or a view depending on it.
+Statements run through the tool that are not queries invalidate the tables
+they touch immediately (or the whole cache when the tables are unknown).
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+import oracledb
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .db_pool import OraclePool
+from .rls_rewriter import statement_tables
+from .rls_service import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+PRIVILEGED_FINGERPRINT = "privileged"
+
+# Results depending on these are not reproducible and are never cached
+_VOLATILE = re.compile(
+    r"\b(SYSDATE|SYSTIMESTAMP|CURRENT_DATE|CURRENT_TIMESTAMP|LOCALTIMESTAMP|"
+    r"DBMS_RANDOM|SYS_GUID|USERENV|SYS_CONTEXT|NEXTVAL|CURRVAL)\b",
+    re.IGNORECASE,
+)
+
+
+def rls_fingerprint(filter_values: Optional[Dict[str, Any]]) -> str:
+    """
+    Fingerprint a user's RLS filter scope.
+
+    Args:
+        filter_values: The user's filter column values, or None for
+            privileged (unfiltered) access
+
+    Returns:
+        "privileged" for None, otherwise a hash of the sorted values; users
+        with identical filter values share cached results
+    """
+    if filter_values is None:
+        return PRIVILEGED_FINGERPRINT
+    canonical = repr(sorted((column.upper(), repr(value)) for column, value in filter_values.items()))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class CompactTable:
+    """
+    Memory-compact copy of a pyarrow.Table.
+
+    String columns where most values repeat are dictionary-encoded;
+    to_table() restores the original schema (names, types and metadata).
+    Arrow buffers are immutable, so restored tables can be shared safely.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.schema = table.schema
+        self.encoded: List[int] = []
+        columns = []
+        for i, column in enumerate(table.columns):
+            if (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)) and len(column) > 1:
+                if pc.count_distinct(column, mode="all").as_py() <= len(column) // 2:
+                    column = pc.dictionary_encode(column)
+                    self.encoded.append(i)
+            columns.append(column)
+        self.table = pa.Table.from_arrays(columns, names=table.column_names)
+        self.nbytes = self.table.nbytes
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    def to_table(self) -> pa.Table:
+        """Rebuild a table equal to the one that was cached."""
+        if not self.encoded:
+            return self.table.replace_schema_metadata(self.schema.metadata)
+        columns = list(self.table.columns)
+        for i in self.encoded:
+            columns[i] = columns[i].cast(self.schema.field(i).type)
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+
+@dataclass
+class QueryIdentity:
+    """Identity of a query: equal identities return equal results."""
+    key: Hashable
+    tables: FrozenSet[str]
+    volatile: bool
+
+
+def query_identity(sql: str, bind_params: Optional[Dict[str, Any]], fingerprint: str) -> Optional[QueryIdentity]:
+    """
+    Identify a query by its normalized SQL, bind values and RLS scope.
+
+    Args:
+        sql: The final SQL that will be executed
+        bind_params: Bind values for the SQL
+        fingerprint: The user's RLS fingerprint (see rls_fingerprint)
+
+    Returns:
+        QueryIdentity, or None if the statement is not a query
+    """
+    sql = normalize_sql(sql)
+    kind, tables = statement_tables(sql)
+    if kind != "query":
+        return None
+    binds = tuple(sorted((name, repr(value)) for name, value in (bind_params or {}).items()))
+    return QueryIdentity(
+        key=(sql, binds, fingerprint),
+        tables=frozenset(tables),
+        volatile=_VOLATILE.search(sql) is not None
+    )
+
+
+@dataclass
+class CachePlan:
+    """How one statement is looked up and stored in the result cache."""
+    key: Hashable
+    tables: FrozenSet[str]
+    ttl: float
+    sequence: int  # invalidation sequence number when the lookup started
+
+
+class ResultCache:
+    """
+    Byte-budgeted LRU cache of query results with per-table TTLs and
+    modification-based invalidation.
+    """
+
+    def __init__(
+        self,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_entry_bytes: int = 32 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        table_ttls: Optional[Dict[str, float]] = None,
+        poll_interval: float = 30.0,
+        flush_monitoring: bool = True
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool: Optional shared Oracle connection pool
+            max_bytes: Total byte budget for cached results
+            max_entry_bytes: Results larger than this are not cached
+            default_ttl: Seconds an entry stays cached unless a table overrides it
+            table_ttls: Per-table TTL overrides (upper-case names); 0 disables
+                caching for queries reading that table
+            poll_interval: Seconds between modification polls; 0 disables
+                the background invalidation thread
+            flush_monitoring: Call DBMS_STATS.FLUSH_DATABASE_MONITORING_INFO
+                before each poll so USER_TAB_MODIFICATIONS is current
+        """
+        self.oracle_config = oracle_config
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = {t.upper(): ttl for t, ttl in (table_ttls or {}).items()}
+        self.poll_interval = poll_interval
+        self.flush_monitoring = flush_monitoring
+
+        # key -> (CompactTable, tables, stored_at, expires_at)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+        self._signatures: Optional[Dict[str, tuple]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidated = 0
+        self._too_large = 0
+        self._stale_stores = 0
+        self._polls = 0
+
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+
+    # -- lookups --------------------------------------------------------
+
+    def plan(self, identity: Optional[QueryIdentity]) -> Optional[CachePlan]:
+        """
+        Decide whether a query's result can be cached.
+
+        Args:
+            identity: Identity from query_identity(), None for non-queries
+
+        Returns:
+            A CachePlan, or None if the result must not be cached (not a
+            query, volatile functions, or a table with a TTL of 0)
+        """
+        if identity is None or identity.volatile:
+            return None
+        ttl = min([self.table_ttls.get(t, self.default_ttl) for t in identity.tables] or [self.default_ttl])
+        if ttl <= 0:
+            return None
+        with self._lock:
+            sequence = self._sequence
+        return CachePlan(key=identity.key, tables=identity.tables, ttl=ttl, sequence=sequence)
+
+    def get(self, plan: CachePlan) -> Optional[Tuple[pa.Table, float]]:
+        """
+        Look up a cached result.
+
+        Args:
+            plan: Plan returned by plan()
+
+        Returns:
+            Tuple of (table, age_seconds), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(plan.key)
+            if entry is None:
+                self._misses += 1
+                return None
+            frame, _, stored_at, expires_at = entry
+            now = time.monotonic()
+            if now > expires_at:
+                self._remove(plan.key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(plan.key)
+            self._hits += 1
+        return frame.to_table(), round(now - stored_at, 3)
+
+    def put(self, plan: CachePlan, table: pa.Table):
+        """
+        Store a result, evicting least recently used entries to fit the budget.
+
+        The result is dropped if any table was invalidated after the plan was
+        made, since it may predate the change.
+
+        Args:
+            plan: Plan returned by plan() before the query ran
+            table: The query result
+        """
+        frame = CompactTable(table)
+        with self._lock:
+            if plan.sequence != self._sequence:
+                self._stale_stores += 1
+                return
+            if frame.nbytes > self.max_entry_bytes:
+                self._too_large += 1
+                return
+            if plan.key in self._entries:
+                self._remove(plan.key)
+            now = time.monotonic()
+            self._entries[plan.key] = (frame, plan.tables, now, now + plan.ttl)
+            self._bytes += frame.nbytes
+            self._stores += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, key: Hashable):
+        """Remove an entry (caller holds the lock)."""
+        frame = self._entries.pop(key)[0]
+        self._bytes -= frame.nbytes
+
+    # -- invalidation ---------------------------------------------------
+
+    def invalidate_tables(self, tables: Set[str]) -> int:
+        """
+        Drop every entry that reads any of the given tables.
+
+        Returns:
+            Number of entries removed
+        """
+        tables = {t.upper() for t in tables}
+        with self._lock:
+            self._sequence += 1
+            keys = [k for k, entry in self._entries.items() if entry[1] & tables]
+            for key in keys:
+                self._remove(key)
+            self._invalidated += len(keys)
+        if keys:
+            logger.info(f"ResultCache: Invalidated {len(keys)} entries for {sorted(tables)}")
+        return len(keys)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._sequence += 1
+            self._invalidated += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def statement_executed(self, sql: str):
+        """
+        Invalidate what a statement that is not a query may have changed.
+
+        Args:
+            sql: A statement that was just executed through the tool
+        """
+        kind, tables = statement_tables(normalize_sql(sql))
+        if kind == "query":
+            return
+        if tables:
+            self.invalidate_tables(tables)
+        else:
+            self.clear()
+
+    def _fetch_signatures(self) -> Tuple[Dict[str, tuple], Dict[str, Set[str]]]:
+        """Read per-table change signatures and view dependencies."""
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            if self.flush_monitoring:
+                try:
+                    cursor.callproc("DBMS_STATS.FLUSH_DATABASE_MONITORING_INFO")
+                except oracledb.Error as e:
+                    logger.warning(f"ResultCache: Cannot flush DML monitoring info, relying on TTLs: {e}")
+                    self.flush_monitoring = False
+            cursor.arraysize = 1000
+            cursor.execute(
+                "SELECT TABLE_NAME, INSERTS + UPDATES + DELETES, TRUNCATED, TIMESTAMP "
+                "FROM USER_TAB_MODIFICATIONS WHERE PARTITION_NAME IS NULL"
+            )
+            signatures: Dict[str, tuple] = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+            cursor.execute(
+                "SELECT OBJECT_NAME, LAST_DDL_TIME FROM USER_OBJECTS "
+                "WHERE OBJECT_TYPE IN ('TABLE', 'VIEW', 'MATERIALIZED VIEW')"
+            )
+            for name, last_ddl_time in cursor.fetchall():
+                signatures[name] = signatures.get(name, ()) + (last_ddl_time,)
+            cursor.execute(
+                "SELECT NAME, REFERENCED_NAME FROM USER_DEPENDENCIES "
+                "WHERE TYPE IN ('VIEW', 'MATERIALIZED VIEW') AND REFERENCED_OWNER = USER"
+            )
+            dependents: Dict[str, Set[str]] = {}
+            for name, referenced_name in cursor.fetchall():
+                dependents.setdefault(referenced_name, set()).add(name)
+            cursor.close()
+        finally:
+            connection.close()
+        return signatures, dependents
+
+    def poll(self):
+        """Invalidate entries reading tables modified since the previous poll."""
+        signatures, dependents = self._fetch_signatures()
+        self._polls += 1
+        previous = self._signatures
+        self._signatures = signatures
+        if previous is None:
+            return
+
+        changed = {t for t in set(previous) | set(signatures) if previous.get(t) != signatures.get(t)}
+        pending = list(changed)
+        while pending:
+            for view in dependents.get(pending.pop(), ()):
+                if view not in changed:
+                    changed.add(view)
+                    pending.append(view)
+        if changed:
+            self.invalidate_tables(changed)
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except oracledb.Error as e:
+                logger.error(f"ResultCache: Modification poll failed: {e}")
+
+    def start(self):
+        """
+        Take the initial modification snapshot and start background polling.
+
+        A failed snapshot is logged, not raised; the poll thread retries it.
+        """
+        if self.poll_interval <= 0:
+            return
+        try:
+            self.poll()
+        except oracledb.Error as e:
+            logger.error(f"ResultCache: Initial modification poll failed: {e}")
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._poll_loop,
+                name="result-cache-poll",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop background polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for monitoring.
+
+        Returns:
+            Dictionary with entry/byte counts, hit rate, evictions and
+            invalidations
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidated": self._invalidated,
+                "rejected_too_large": self._too_large,
+                "rejected_stale": self._stale_stores,
+                "modification_polls": self._polls,
+                "flush_monitoring": self.flush_monitoring,
+            }
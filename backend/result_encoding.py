@@ -0,0 +1,175 @@
+"""
+Single-Pass Result Encoding for Database Chat Application.
+
+A run_sql result is encoded for its consumers in one pass over the head of
+the Arrow table:
+- display_table() formats temporal, decimal and binary columns as text with
+  vectorized Arrow kernels (no per-value Python formatting);
+- the formatted rows are converted to Python objects once and shared by the
+  markdown preview for the LLM and the first UI page;
+- dumps() serializes pages with orjson when it is installed.
+
+The markdown preview is budgeted in tokens (estimated at 4 characters per
+token) so that wide or text-heavy results do not flood the LLM context.
+The result file is written separately, straight from the Arrow buffers
+(see result_files.py).
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rough characters per LLM token, used to budget the preview
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class PreviewLimits:
+    """Size limits of the markdown preview sent to the LLM."""
+    rows: int = 10  # rows shown at most
+    max_tokens: int = 1000  # estimated token budget of the preview table
+    max_cell_chars: int = 60  # longer values are cut with an ellipsis
+
+
+@dataclass
+class EncodedResult:
+    """The LLM preview and UI rows encoded from the head of a result."""
+    preview: str  # markdown table, empty for an empty result
+    preview_rows: int  # rows in the preview (fewer than requested if over budget)
+    rows: List[Dict[str, Any]]  # JSON-ready rows of the first UI page
+
+
+def _display_column(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Format one column with JSON-native values."""
+    data_type = column.type
+    if pa.types.is_dictionary(data_type):
+        column = column.cast(data_type.value_type)
+        data_type = data_type.value_type
+    if pa.types.is_timestamp(data_type) or pa.types.is_time(data_type):
+        text = pc.cast(column, pa.string())
+        # Drop all-zero fractions ("10:00:00.000000" -> "10:00:00")
+        return pc.replace_substring_regex(text, r"\.0+$", "")
+    if pa.types.is_date(data_type) or pa.types.is_decimal(data_type):
+        # Decimals stay exact as text (NUMBER(38) does not fit a float)
+        return pc.cast(column, pa.string())
+    if pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type) or pa.types.is_fixed_size_binary(data_type):
+        length = pc.cast(pc.binary_length(column), pa.string())
+        return pc.binary_join_element_wise("<", length, " bytes>", "")
+    return column
+
+
+def display_table(table: pa.Table) -> pa.Table:
+    """
+    Format a table for JSON and text output.
+
+    Dates and timestamps become ISO-style text, decimals exact decimal text,
+    binary values "<N bytes>", and dictionary columns their values. Other
+    columns are returned unchanged.
+
+    Args:
+        table: The (sliced) result
+
+    Returns:
+        Table whose to_pylist() rows contain only JSON-native values
+    """
+    columns = [_display_column(column) for column in table.columns]
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def json_rows(table: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Convert a (sliced) table to JSON-ready row dictionaries.
+
+    Args:
+        table: The rows to convert
+
+    Returns:
+        List of row dictionaries
+    """
+    return display_table(table).to_pylist()
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to JSON, with orjson when it is available.
+
+    Args:
+        obj: JSON-ready object (values that are not are rendered with str)
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode("utf-8")
+
+
+def _cell(value: Any, max_chars: int) -> str:
+    if value is None:
+        return ""
+    text = str(value).replace("\r", " ").replace("\n", " ").replace("|", "\\|")
+    if len(text) > max_chars:
+        text = text[:max_chars - 1] + "…"
+    return text
+
+
+def markdown_table(columns: List[str], rows: List[Dict[str, Any]], limits: PreviewLimits) -> Tuple[str, int]:
+    """
+    Render rows as a markdown table within the preview token budget.
+
+    The header is always rendered; rows are added until the next one would
+    exceed the budget.
+
+    Args:
+        columns: Column names in display order
+        rows: Row dictionaries (from json_rows)
+        limits: Preview size limits
+
+    Returns:
+        Tuple of (markdown text, rows rendered)
+    """
+    budget = limits.max_tokens * CHARS_PER_TOKEN
+    lines = [
+        "| " + " | ".join(_cell(c, limits.max_cell_chars) for c in columns) + " |",
+        "|" + "---|" * len(columns),
+    ]
+    size = sum(len(line) + 1 for line in lines)
+    rendered = 0
+    for row in rows[:limits.rows]:
+        line = "| " + " | ".join(_cell(row.get(c), limits.max_cell_chars) for c in columns) + " |"
+        if size + len(line) + 1 > budget:
+            break
+        lines.append(line)
+        size += len(line) + 1
+        rendered += 1
+    return "\n".join(lines), rendered
+
+
+def encode_result(table: pa.Table, page_rows: int, limits: PreviewLimits) -> EncodedResult:
+    """
+    Encode the head of a result for the LLM and the UI in one pass.
+
+    Only max(page_rows, limits.rows) rows are formatted and converted to
+    Python objects; the preview and the UI page share them.
+
+    Args:
+        table: The query result
+        page_rows: Rows of the first UI page
+        limits: Preview size limits
+
+    Returns:
+        EncodedResult with the markdown preview and the UI rows
+    """
+    rows = json_rows(table.slice(0, max(page_rows, limits.rows)))
+    if not rows:
+        return EncodedResult(preview="", preview_rows=0, rows=[])
+    preview, preview_rows = markdown_table(table.column_names, rows, limits)
+    return EncodedResult(preview=preview, preview_rows=preview_rows, rows=rows[:page_rows])
@@ -0,0 +1,270 @@
+"""
+Streaming Result Export for Database Chat Application.
+
+Large extracts bypass the chat: /api/results/<id>/export re-runs the stored,
+RLS-filtered query of a run_sql result on a server-side cursor and streams
+it to the client as CSV, Parquet or NDJSON. Only one Arrow record batch is
+held in memory at a time, whatever the size of the result, and the output
+can be gzip-compressed on the fly.
+
+When the client disconnects, the WSGI server closes the response iterator;
+closing it closes the cursor and releases the connection instead of
+fetching the rest of the result.
+"""
+
+import io
+import logging
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterator
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from .result_encoding import dumps, json_rows
+
+logger = logging.getLogger(__name__)
+
+# format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+class ExportBusy(Exception):
+    """All export slots are in use."""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each batch."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _encode_csv(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pa_csv.CSVWriter(sink, batch.schema, write_options=pa_csv.WriteOptions(quoting_style="needed"))
+        writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def _encode_ndjson(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    for batch in batches:
+        # Dates, timestamps and decimals are formatted per column, not per value
+        rows = json_rows(pa.Table.from_batches([batch]))
+        if rows:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _encode_parquet(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema)
+        # One row group per fetch batch
+        writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+_ENCODERS: Dict[str, Callable[[Iterator[pa.RecordBatch]], Iterator[bytes]]] = {
+    "csv": _encode_csv,
+    "ndjson": _encode_ndjson,
+    "parquet": _encode_parquet,
+}
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class ExportStream:
+    """
+    Iterator over the chunks of one export.
+
+    WSGI servers call close() when the response ends or the client goes
+    away; closing before the end cancels the export.
+    """
+
+    def __init__(self, exporter: "ResultExporter", chunks: Iterator[bytes]):
+        self._exporter = exporter
+        self._chunks = chunks
+        self._outcome = None
+
+    def __iter__(self) -> "ExportStream":
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self._end("completed")
+            raise
+        except Exception as e:
+            logger.error(f"ResultExporter: Export failed: {e}")
+            self._end("failed")
+            raise
+
+    def close(self):
+        """Stop the export, closing the cursor if it is still fetching."""
+        if self._outcome is None:
+            logger.info("ResultExporter: Export closed early (client disconnected), cancelling")
+        self._end("cancelled")
+
+    def _end(self, outcome: str):
+        if self._outcome is None:
+            self._outcome = outcome
+            self._chunks.close()
+            self._exporter._finish(outcome)
+
+
+class ResultExporter:
+    """
+    Streams query results in export formats with a limit on concurrent exports.
+
+    An export holds a database connection for its whole duration, so only
+    max_concurrent exports may run at once.
+    """
+
+    def __init__(self, batch_rows: int = 50000, max_concurrent: int = 2):
+        """
+        Initialize the exporter.
+
+        Args:
+            batch_rows: Rows per fetch round trip (and per Parquet row group)
+            max_concurrent: Maximum number of exports streaming at once
+        """
+        self.batch_rows = batch_rows
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._failed = 0
+        self._rejected = 0
+        self._rows = 0
+        self._bytes = 0
+
+    def stream(
+        self,
+        export: Callable[..., Iterator[pa.RecordBatch]],
+        fmt: str,
+        gzip: bool = False
+    ) -> "ExportStream":
+        """
+        Start an export.
+
+        Args:
+            export: Callable re-running the query; called with batch_rows and
+                yielding record batches
+            fmt: One of EXPORT_FORMATS
+            gzip: Compress the output with gzip
+
+        Returns:
+            ExportStream of encoded chunks; close it to cancel the export
+
+        Raises:
+            ValueError: If the format is unknown
+            ExportBusy: If max_concurrent exports are already running
+        """
+        if fmt not in _ENCODERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExportBusy()
+        with self._lock:
+            self._active += 1
+        return ExportStream(self, self._chunks(export, fmt, gzip))
+
+    def _chunks(self, export, fmt: str, gzip: bool) -> Iterator[bytes]:
+        batches = export(batch_rows=self.batch_rows)
+        chunks = _ENCODERS[fmt](self._count_rows(batches))
+        if gzip:
+            chunks = _gzip(chunks)
+        try:
+            for chunk in chunks:
+                if chunk:
+                    with self._lock:
+                        self._bytes += len(chunk)
+                    yield chunk
+        finally:
+            # Closes the chain down to the cursor (a no-op after completion)
+            chunks.close()
+            batches.close()
+
+    def _finish(self, outcome: str):
+        """Release the export slot and count the outcome."""
+        self._slots.release()
+        with self._lock:
+            self._active -= 1
+            if outcome == "completed":
+                self._completed += 1
+            elif outcome == "cancelled":
+                self._cancelled += 1
+            else:
+                self._failed += 1
+
+    def _count_rows(self, batches: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        for batch in batches:
+            with self._lock:
+                self._rows += batch.num_rows
+            yield batch
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get export statistics for monitoring.
+
+        Returns:
+            Dictionary with active, completed, cancelled, failed and rejected
+            export counts plus rows and bytes streamed
+        """
+        with self._lock:
+            return {
+                "active": self._active,
+                "max_concurrent": self.max_concurrent,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "rows": self._rows,
+                "bytes": self._bytes,
+            }
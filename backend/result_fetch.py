@@ -0,0 +1,218 @@
+"""
+Bounded Arrow Fetch for Database Chat Application.
+
+Query results are fetched straight into Apache Arrow with python-oracledb's
+fetch_df_batches() (OracleDataFrame, exported through the Arrow PyCapsule
+interface), so no per-row Python tuples are built. Every downstream format
+(LLM preview, CSV file, UI rows, cache entry) is produced from the one
+pyarrow.Table.
+
+Fetching stops as soon as a row or byte budget is reached, so a careless
+SELECT * on a large table cannot exhaust memory:
+
+- the statement is described first (cursor.parse); statements without a
+  result set (DML) are executed normally and return an empty table
+- the batch size (which python-oracledb also uses for arraysize and
+  prefetchrows) is derived from the column widths in the description so
+  each round trip carries roughly a fixed number of bytes
+- the exact Arrow buffer size of every batch counts against the byte budget
+
+One row beyond the row budget is requested, so truncation is detected
+exactly. The table's schema metadata records it; see is_truncated().
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import oracledb
+import pyarrow as pa
+
+# Approximate Arrow bytes for fixed-width Oracle types
+_FIXED_WIDTHS = {
+    oracledb.DB_TYPE_NUMBER: 8,
+    oracledb.DB_TYPE_BINARY_DOUBLE: 8,
+    oracledb.DB_TYPE_BINARY_FLOAT: 4,
+    oracledb.DB_TYPE_BINARY_INTEGER: 8,
+    oracledb.DB_TYPE_DATE: 8,
+    oracledb.DB_TYPE_TIMESTAMP: 8,
+    oracledb.DB_TYPE_TIMESTAMP_TZ: 8,
+    oracledb.DB_TYPE_TIMESTAMP_LTZ: 8,
+    oracledb.DB_TYPE_BOOLEAN: 1,
+    oracledb.DB_TYPE_ROWID: 18,
+}
+_LOB_TYPES = {
+    oracledb.DB_TYPE_CLOB,
+    oracledb.DB_TYPE_NCLOB,
+    oracledb.DB_TYPE_BLOB,
+    oracledb.DB_TYPE_BFILE,
+    oracledb.DB_TYPE_JSON,
+    oracledb.DB_TYPE_LONG,
+    oracledb.DB_TYPE_LONG_RAW,
+}
+_LOB_WIDTH = 4000
+_DEFAULT_WIDTH = 32
+_OFFSET_BYTES = 4  # Arrow variable-width columns keep a 32-bit offset per value
+
+_TRUNCATED_KEY = b"truncated"
+
+
+@dataclass
+class FetchLimits:
+    """Row/byte budgets and batch sizing for a bounded fetch."""
+    max_rows: int = 100000
+    max_bytes: int = 100 * 1024 * 1024
+    batch_bytes: int = 2 * 1024 * 1024  # target size of one fetch round trip
+    prefetch_rows: int = 200  # smallest batch (rows returned with execute)
+    max_batch_rows: int = 10000
+
+
+def column_width(description_entry) -> int:
+    """
+    Estimate the bytes one value of a column occupies in Arrow.
+
+    Args:
+        description_entry: An entry of cursor.description
+
+    Returns:
+        Estimated bytes per value
+    """
+    type_code = description_entry[1]
+    if type_code in _FIXED_WIDTHS:
+        return _FIXED_WIDTHS[type_code]
+    if type_code in _LOB_TYPES:
+        return _LOB_WIDTH
+    internal_size = description_entry[3]
+    width = internal_size if internal_size and internal_size > 0 else _DEFAULT_WIDTH
+    return width + _OFFSET_BYTES
+
+
+def is_truncated(table: pa.Table) -> bool:
+    """Check whether a fetched table was cut off at the row or byte budget."""
+    metadata = table.schema.metadata or {}
+    return metadata.get(_TRUNCATED_KEY) == b"true"
+
+
+def mark_truncated(table: pa.Table, truncated: bool) -> pa.Table:
+    """Record the truncated flag in the table's schema metadata."""
+    metadata = dict(table.schema.metadata or {})
+    metadata[_TRUNCATED_KEY] = b"true" if truncated else b"false"
+    return table.replace_schema_metadata(metadata)
+
+
+class BoundedFetch:
+    """
+    Fetches one query result into a pyarrow.Table within a row/byte budget.
+
+    Use fetch() with a python-oracledb Connection or fetch_async() with an
+    AsyncConnection; afterwards batches and bytes_fetched describe the
+    fetch for logging.
+    """
+
+    def __init__(self, limits: Optional[FetchLimits] = None):
+        """
+        Initialize the fetch.
+
+        Args:
+            limits: Budgets and batch sizing; defaults apply when None
+        """
+        self.limits = limits or FetchLimits()
+        self.batches = 0
+        self.bytes_fetched = 0
+        self.truncated = False
+        self._tables: List[pa.Table] = []
+        self._rows = 0
+
+    def batch_size(self, description) -> int:
+        """Rows per batch: the byte target for this row width, within the budgets."""
+        row_bytes = max(1, sum(column_width(desc) for desc in description))
+        rows = self.limits.batch_bytes // row_bytes
+        rows = max(self.limits.prefetch_rows, min(self.limits.max_batch_rows, rows))
+        # One extra row beyond the budget tells us whether the result was cut off
+        return max(1, min(rows, self.limits.max_rows + 1))
+
+    def _add(self, batch: Any, size: int) -> bool:
+        """Account for a batch; returns True if fetching should continue."""
+        table = pa.table(batch)
+        self.batches += 1
+        if table.num_rows or not self._tables:
+            # An empty first batch still carries the result's schema
+            self._tables.append(table)
+            self._rows += table.num_rows
+            self.bytes_fetched += table.nbytes
+
+        if self._rows > self.limits.max_rows:
+            self.truncated = True
+            return False
+        if table.num_rows < size:
+            return False
+        if self.bytes_fetched >= self.limits.max_bytes:
+            self.truncated = True
+            return False
+        return True
+
+    def _result(self) -> pa.Table:
+        if not self._tables:
+            return mark_truncated(pa.table({}), False)
+        table = pa.concat_tables(self._tables) if len(self._tables) > 1 else self._tables[0]
+        if table.num_rows > self.limits.max_rows:
+            table = table.slice(0, self.limits.max_rows)
+        return mark_truncated(table, self.truncated)
+
+    def fetch(
+        self,
+        connection: oracledb.Connection,
+        sql: str,
+        bind_params: Optional[Dict[str, Any]] = None
+    ) -> pa.Table:
+        """
+        Run a statement and fetch its result within the budgets.
+
+        Args:
+            connection: The connection to run on
+            sql: The SQL statement
+            bind_params: Optional bind parameters
+
+        Returns:
+            The result as a pyarrow.Table (empty for statements without a
+            result set)
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.parse(sql)
+            if not cursor.description:
+                cursor.execute(sql, bind_params or {})
+                return self._result()
+            size = self.batch_size(cursor.description)
+        finally:
+            cursor.close()
+
+        batches = connection.fetch_df_batches(sql, bind_params or {}, size=size)
+        try:
+            for batch in batches:
+                if not self._add(batch, size):
+                    break
+        finally:
+            # Stops a truncated fetch early instead of draining the cursor
+            batches.close()
+        return self._result()
+
+    async def fetch_async(self, connection, sql: str, bind_params: Optional[Dict[str, Any]] = None) -> pa.Table:
+        """Async variant of fetch() for python-oracledb AsyncConnections."""
+        cursor = connection.cursor()
+        try:
+            await cursor.parse(sql)
+            if not cursor.description:
+                await cursor.execute(sql, bind_params or {})
+                return self._result()
+            size = self.batch_size(cursor.description)
+        finally:
+            cursor.close()
+
+        batches = connection.fetch_df_batches(sql, bind_params or {}, size=size)
+        try:
+            async for batch in batches:
+                if not self._add(batch, size):
+                    break
+        finally:
+            await batches.aclose()
+        return self._result()
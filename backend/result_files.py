@@ -0,0 +1,187 @@
+"""
+Columnar Result Files for Database Chat Application.
+
+run_sql saves each result as an Arrow IPC file (Feather v2,
+query_result_<id>.arrow) instead of CSV. Writing it is a straight dump of
+the Arrow buffers, and readers memory-map it: visualization and paging
+load columns zero-copy from the page cache instead of re-parsing text.
+Files are written uncompressed by default because compressed buffers must
+be decompressed into memory on every read; RESULT_FILE_COMPRESSION trades
+that for disk space.
+
+CSV is produced only when a user downloads it (/api/files/<name>.csv
+streams it from the Arrow file; see iter_csv). Result files are served
+only to the user whose directory holds them (see user_directory).
+"""
+
+import hashlib
+import io
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from vanna.core.tool import ToolContext
+from vanna.integrations.local import LocalFileSystem
+
+from .executor import BlockingExecutor, FILE_LANE
+
+logger = logging.getLogger(__name__)
+
+ARROW_EXTENSION = ".arrow"
+CSV_EXTENSION = ".csv"
+RESULT_FILE_PREFIX = "query_result_"
+
+# Rows per record batch in the file; also the unit of streamed CSV output
+_BATCH_ROWS = 64 * 1024
+
+
+def user_directory(working_directory: Path, user_id: str) -> Path:
+    """
+    Per-user folder of a user, as LocalFileSystem names it.
+
+    Args:
+        working_directory: Base directory of the file system
+        user_id: The user's id
+
+    Returns:
+        Path of the user's folder (it may not exist yet)
+    """
+    return Path(working_directory) / hashlib.sha256(user_id.encode()).hexdigest()[:16]
+
+
+def read_arrow_file(path: Path) -> pa.Table:
+    """
+    Open an Arrow IPC file as a memory-mapped table.
+
+    Args:
+        path: Path of the .arrow file
+
+    Returns:
+        pyarrow.Table whose buffers reference the mapped file (zero-copy
+        for uncompressed files)
+    """
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def iter_csv(path: Path) -> Iterator[bytes]:
+    """
+    Stream an Arrow IPC file as CSV, one record batch at a time.
+
+    Args:
+        path: Path of the .arrow file
+
+    Yields:
+        CSV-encoded chunks (the first one starts with the header)
+    """
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        buffer = io.BytesIO()
+        options = pa_csv.WriteOptions(quoting_style="needed")
+        with pa_csv.CSVWriter(buffer, reader.schema, write_options=options) as writer:
+            for i in range(reader.num_record_batches):
+                writer.write_batch(reader.get_batch(i))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.getvalue():
+            yield buffer.getvalue()
+
+
+class ResultFileSystem(LocalFileSystem):
+    """
+    LocalFileSystem with Arrow IPC result files.
+
+    Keeps LocalFileSystem's per-user directories and path checks, so the
+    existing file tools (write_file, visualize_data) work unchanged. Result
+    files can be hundreds of MB, so they are written and mapped on the
+    executor's file lane, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        working_directory: str = ".",
+        compression: Optional[str] = None,
+        executor: Optional[BlockingExecutor] = None
+    ):
+        """
+        Initialize the file system.
+
+        Args:
+            working_directory: Base directory for the per-user folders
+            compression: Optional IPC buffer compression ("lz4" or "zstd");
+                compressed files are smaller but cannot be read zero-copy
+            executor: Optional shared executor for the blocking file I/O
+        """
+        super().__init__(working_directory)
+        self.compression = compression or None
+        self.executor = executor or BlockingExecutor()
+
+    def _write_table(self, path: Path, table: pa.Table) -> pa.Table:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table, max_chunksize=_BATCH_ROWS)
+        return read_arrow_file(path)
+
+    @staticmethod
+    def _write_csv(path: Path, table: pa.Table) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(path), "wb") as sink:
+            pa_csv.write_csv(table, sink, pa_csv.WriteOptions(quoting_style="needed"))
+
+    @staticmethod
+    def _read_table(path: Path, filename: str) -> pa.Table:
+        if not path.is_file():
+            raise FileNotFoundError(f"File '{filename}' does not exist")
+        return read_arrow_file(path)
+
+    async def write_table(self, filename: str, table: pa.Table, context: ToolContext) -> pa.Table:
+        """
+        Write a table as an Arrow IPC file in the user's directory.
+
+        Args:
+            filename: File name (relative to the user's directory)
+            table: The table to write
+            context: Tool context identifying the user
+
+        Returns:
+            The written table, memory-mapped from the file
+        """
+        path = self._resolve_path(filename, context)
+        return await self.executor.run(FILE_LANE, self._write_table, path, table)
+
+    async def write_csv(self, filename: str, table: pa.Table, context: ToolContext) -> None:
+        """
+        Write a table as a CSV file in the user's directory.
+
+        The CSV is encoded batch by batch straight into the file, without
+        building the text in memory.
+
+        Args:
+            filename: File name (relative to the user's directory)
+            table: The table to write
+            context: Tool context identifying the user
+        """
+        path = self._resolve_path(filename, context)
+        await self.executor.run(FILE_LANE, self._write_csv, path, table)
+
+    async def read_table(self, filename: str, context: ToolContext) -> pa.Table:
+        """
+        Memory-map an Arrow IPC file from the user's directory.
+
+        Args:
+            filename: File name (relative to the user's directory)
+            context: Tool context identifying the user
+
+        Returns:
+            The table
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = self._resolve_path(filename, context)
+        return await self.executor.run(FILE_LANE, self._read_table, path, filename)
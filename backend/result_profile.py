@@ -0,0 +1,154 @@
+"""
+Result Profiling for Database Chat Application.
+
+When a result has more rows than the LLM preview shows, run_sql adds a
+compact per-column profile to result_for_llm: null count, distinct count,
+the most frequent values of text and boolean columns, min/max, and the
+quartiles and mean of numeric columns. With these the LLM can answer most
+"how many / which / what range" follow-up questions without another
+run_sql call (and another LLM and Oracle round trip).
+
+Every statistic is computed with Arrow compute kernels over whole columns
+of the fetched table; no rows are converted to Python objects. The profile
+is cut to a token budget (estimated at 4 characters per token), column by
+column.
+"""
+
+import datetime
+import decimal
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .result_encoding import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+@dataclass
+class ProfileLimits:
+    """Size limits of the result profile sent to the LLM."""
+    max_tokens: int = 600  # estimated token budget of the whole profile
+    top_k: int = 5  # most frequent values listed per text column
+    max_value_chars: int = 40  # longer values are cut with an ellipsis
+
+
+def _format_value(value: Any, max_chars: int) -> str:
+    """Format a scalar statistic for the profile."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, float):
+        text = f"{value:.6g}"
+    elif isinstance(value, (datetime.date, datetime.datetime)):
+        text = value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    elif isinstance(value, decimal.Decimal):
+        text = format(value, "f")
+    else:
+        text = str(value).replace("\r", " ").replace("\n", " ")
+    if len(text) > max_chars:
+        text = text[:max_chars - 1] + "…"
+    return text
+
+
+def _kind(data_type: pa.DataType) -> str:
+    """Classify a column type for profiling."""
+    if pa.types.is_boolean(data_type):
+        return "boolean"
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+        return "number"
+    if pa.types.is_temporal(data_type):
+        return "date"
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        return "string"
+    return "other"
+
+
+def profile_column(name: str, column: pa.ChunkedArray, limits: ProfileLimits) -> str:
+    """
+    Profile one column.
+
+    Args:
+        name: Column name
+        column: The column of the fetched result
+        limits: Profile size limits
+
+    Returns:
+        One summary line, e.g. "- REGION (string): 0 nulls, 5 distinct; top: ..."
+    """
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    kind = _kind(column.type)
+
+    def fmt(value: Any) -> str:
+        return _format_value(value, limits.max_value_chars)
+
+    nulls = column.null_count
+    non_null = len(column) - nulls
+    counts_text = f"{nulls} null{'' if nulls == 1 else 's'}"
+    if kind == "other" or non_null == 0:
+        return f"- {name} ({kind}): {counts_text}"
+
+    # One hash pass gives both the distinct count and the top values
+    counts = pc.value_counts(column)
+    counts = counts.filter(pc.is_valid(counts.field("values")))
+    distinct = len(counts)
+    counts_text += ", all distinct" if distinct == non_null else f", {distinct} distinct"
+    stats = [counts_text]
+
+    # Text columns with repeated values are better described by their top values
+    if kind in ("number", "date") or (kind == "string" and distinct == non_null):
+        min_max = pc.min_max(column)
+        stats.append(f"min {fmt(min_max['min'].as_py())}, max {fmt(min_max['max'].as_py())}")
+    if kind == "number":
+        values = pc.cast(column, pa.float64()) if pa.types.is_decimal(column.type) else column
+        quartiles = pc.quantile(values, q=QUANTILES).to_pylist()
+        stats.append(
+            f"p25 {fmt(quartiles[0])}, median {fmt(quartiles[1])}, p75 {fmt(quartiles[2])}, "
+            f"mean {fmt(pc.mean(values).as_py())}"
+        )
+    if kind in ("string", "boolean") and distinct < non_null:
+        order = pc.array_sort_indices(counts.field("counts"), order="descending")
+        top = counts.take(order[:limits.top_k]).to_pylist()
+        stats.append("top: " + ", ".join(f"{fmt(item['values'])} ({item['counts']})" for item in top))
+    return f"- {name} ({kind}): " + "; ".join(stats)
+
+
+def profile_table(table: pa.Table, limits: ProfileLimits, truncated: bool = False) -> Optional[str]:
+    """
+    Build the compact per-column profile of a result.
+
+    Columns are added in order until the token budget is used up; the
+    remaining ones are only counted.
+
+    Args:
+        table: The fetched result
+        limits: Profile size limits
+        truncated: Whether the result was truncated by the fetch limits
+
+    Returns:
+        The profile text, or None for an empty result
+    """
+    if table.num_rows == 0 or table.num_columns == 0:
+        return None
+
+    scope = "fetched rows" if truncated else "rows"
+    lines = [f"Column profile ({table.num_rows} {scope}):"]
+    budget = limits.max_tokens * CHARS_PER_TOKEN
+    size = len(lines[0]) + 1
+    for i, name in enumerate(table.column_names):
+        try:
+            line = profile_column(name, table.column(i), limits)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            logger.debug(f"Profile: Skipping column {name}: {e}")
+            continue
+        if size + len(line) + 1 > budget:
+            lines.append(f"- ({table.num_columns - i} more columns not profiled)")
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
@@ -0,0 +1,364 @@
+"""
+Server-Side Result Store for Database Chat Application.
+
+run_sql keeps every result (a pyarrow.Table) here under an unguessable
+result id instead of pushing all rows through the chat stream. The tool
+result carries only the first page and the schema; the UI pages through
+the rest with /api/results/<id>, which sorts, filters and slices in the
+server.
+
+A result is only served to the user who ran the query. A result fetched
+without RLS filtering (admin or superuser) is only served while that user
+still holds a privileged role. Results expire after a TTL, and least
+recently used results are evicted to stay within a byte budget.
+"""
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .result_encoding import json_rows
+from .result_fetch import is_truncated
+
+logger = logging.getLogger(__name__)
+
+
+class ResultNotFound(KeyError):
+    """The result id is unknown, expired, or belongs to another user."""
+
+
+class ResultQueryError(ValueError):
+    """A sort or filter specification cannot be applied to the result."""
+
+
+def column_types(schema: pa.Schema) -> Dict[str, str]:
+    """
+    Map Arrow column types to DataFrameComponent column types.
+
+    Args:
+        schema: The result schema
+
+    Returns:
+        Dictionary of column name -> "number", "date", "boolean" or "string"
+    """
+    types = {}
+    for field in schema:
+        data_type = field.type
+        if pa.types.is_dictionary(data_type):
+            data_type = data_type.value_type
+        if pa.types.is_boolean(data_type):
+            types[field.name] = "boolean"
+        elif pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+            types[field.name] = "number"
+        elif pa.types.is_temporal(data_type):
+            types[field.name] = "date"
+        else:
+            types[field.name] = "string"
+    return types
+
+
+def _resolve_column(table: pa.Table, name: str) -> str:
+    """Find a column by exact or case-insensitive name."""
+    if name in table.column_names:
+        return name
+    matches = [c for c in table.column_names if c.upper() == name.upper()]
+    if len(matches) != 1:
+        raise ResultQueryError(f"Unknown column: {name}")
+    return matches[0]
+
+
+def parse_sort(table: pa.Table, sort: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    Parse a sort specification.
+
+    Args:
+        table: The result being sorted
+        sort: Comma-separated columns; "-COL" or "COL:desc" sorts descending
+
+    Returns:
+        List of (column, "ascending"|"descending") sort keys
+    """
+    keys = []
+    for item in (sort or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        order = "ascending"
+        if item.startswith("-"):
+            item, order = item[1:], "descending"
+        elif ":" in item:
+            item, direction = item.rsplit(":", 1)
+            if direction.lower() not in ("asc", "desc"):
+                raise ResultQueryError(f"Invalid sort direction: {direction}")
+            order = "descending" if direction.lower() == "desc" else "ascending"
+        keys.append((_resolve_column(table, item.strip()), order))
+    return keys
+
+
+def filter_mask(table: pa.Table, text: str) -> pa.ChunkedArray:
+    """
+    Build a case-insensitive substring match mask.
+
+    "COL:text" searches one column; any other text searches every column
+    (columns that cannot be rendered as text, such as BLOBs, are skipped).
+
+    Args:
+        table: The result being filtered
+        text: The filter specification
+
+    Returns:
+        Boolean mask with one entry per row
+    """
+    columns = table.column_names
+    if ":" in text:
+        name, value = text.split(":", 1)
+        try:
+            columns = [_resolve_column(table, name.strip())]
+            text = value
+        except ResultQueryError:
+            pass
+
+    mask = None
+    for name in columns:
+        try:
+            values = pc.cast(table[name], pa.string())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        matched = pc.match_substring(values, text, ignore_case=True)
+        mask = matched if mask is None else pc.or_kleene(mask, matched)
+    if mask is None:
+        return pa.chunked_array([pa.array([False] * table.num_rows, pa.bool_())])
+    return pc.fill_null(mask, False)
+
+
+@dataclass
+class StoredResult:
+    """A stored run_sql result and its access scope."""
+    result_id: str
+    owner: str
+    privileged: bool
+    table: pa.Table
+    created_at: float
+    expires_at: float
+    # Re-runs the stored (RLS-filtered) query batch by batch, for export
+    export: Optional[Callable[..., Iterator[pa.RecordBatch]]] = None
+    # Last ((sort, filter), view), reused while the user pages through it
+    last_view: Optional[Tuple[Tuple[str, str], pa.Table]] = None
+
+
+class ResultStore:
+    """
+    In-memory store of run_sql results addressed by result id.
+
+    Arrow tables are immutable, so a stored result shares its buffers with
+    the result cache and with the pages sliced from it.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 1800.0,
+        max_bytes: int = 512 * 1024 * 1024,
+        page_size: int = 100,
+        max_page_size: int = 1000
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl: Seconds a result stays available after it was stored
+            max_bytes: Total byte budget across all results
+            page_size: Rows in the first page sent with the tool result, and
+                the default page size of page()
+            max_page_size: Largest page page() returns
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self._results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._pages = 0
+        self._denied = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    def put(
+        self,
+        table: pa.Table,
+        owner: str,
+        privileged: bool,
+        export: Optional[Callable[..., Iterator[pa.RecordBatch]]] = None
+    ) -> str:
+        """
+        Store a result.
+
+        Args:
+            table: The query result
+            owner: ID of the user who ran the query
+            privileged: Whether the result was fetched without RLS filtering
+            export: Optional callable re-running the query for export; called
+                with batch_rows and yielding record batches
+
+        Returns:
+            The new result id
+        """
+        result_id = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._results[result_id] = StoredResult(
+                result_id=result_id,
+                owner=owner,
+                privileged=privileged,
+                table=table,
+                created_at=now,
+                expires_at=now + self.ttl,
+                export=export
+            )
+            self._bytes += table.nbytes
+            self._stores += 1
+            # The newest result is always kept, even if it exceeds the budget
+            while self._bytes > self.max_bytes and len(self._results) > 1:
+                self._remove(next(iter(self._results)))
+                self._evictions += 1
+        return result_id
+
+    def get(self, result_id: str, user_id: str, privileged: bool) -> StoredResult:
+        """
+        Look up a result on behalf of a user.
+
+        Args:
+            result_id: The result id
+            user_id: ID of the requesting user
+            privileged: Whether the requesting user currently has unfiltered access
+
+        Returns:
+            The stored result
+
+        Raises:
+            ResultNotFound: If the result is unknown or expired, or the user
+                may not read it (not distinguished, so ids cannot be probed)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            stored = self._results.get(result_id)
+            if stored is None:
+                raise ResultNotFound(result_id)
+            if stored.owner != user_id or (stored.privileged and not privileged):
+                self._denied += 1
+                logger.warning(f"ResultStore: User '{user_id}' denied access to result {result_id}")
+                raise ResultNotFound(result_id)
+            self._results.move_to_end(result_id)
+            return stored
+
+    def page(
+        self,
+        result_id: str,
+        user_id: str,
+        privileged: bool,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort: Optional[str] = None,
+        filter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a result, sorted and filtered in the server.
+
+        Args:
+            result_id: The result id
+            user_id: ID of the requesting user
+            privileged: Whether the requesting user currently has unfiltered access
+            offset: Index of the first row of the page
+            limit: Rows per page (default page_size, at most max_page_size)
+            sort: Optional sort specification (see parse_sort)
+            filter: Optional filter text (see filter_mask)
+
+        Returns:
+            JSON-ready dictionary with the page rows, schema and row counts
+
+        Raises:
+            ResultNotFound: If the result is not available to the user
+            ResultQueryError: If the sort or filter cannot be applied
+        """
+        stored = self.get(result_id, user_id, privileged)
+        offset = max(0, offset)
+        limit = max(1, min(limit or self.page_size, self.max_page_size))
+        view = self._view(stored, sort or "", filter or "")
+        with self._lock:
+            self._pages += 1
+
+        return {
+            "result_id": result_id,
+            "columns": stored.table.column_names,
+            "column_types": column_types(stored.table.schema),
+            "row_count": stored.table.num_rows,
+            "total_rows": view.num_rows,
+            "truncated": is_truncated(stored.table),
+            "offset": offset,
+            "limit": limit,
+            "sort": sort or None,
+            "filter": filter or None,
+            "rows": json_rows(view.slice(offset, limit)),
+            "expires_in": max(0, int(stored.expires_at - time.monotonic())),
+        }
+
+    def _view(self, stored: StoredResult, sort: str, filter: str) -> pa.Table:
+        """Sort and filter a result, reusing the last view when unchanged."""
+        key = (sort, filter)
+        last_view = stored.last_view
+        if last_view is not None and last_view[0] == key:
+            return last_view[1]
+
+        view = stored.table
+        try:
+            if filter:
+                view = view.filter(filter_mask(view, filter))
+            sort_keys = parse_sort(view, sort)
+            if sort_keys:
+                view = view.take(pc.sort_indices(view, sort_keys=sort_keys))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ResultQueryError(str(e))
+
+        stored.last_view = (key, view)
+        return view
+
+    def _expire(self, now: float):
+        """Drop expired results (caller holds the lock)."""
+        expired = [rid for rid, stored in self._results.items() if stored.expires_at < now]
+        for rid in expired:
+            self._remove(rid)
+        self._expirations += len(expired)
+
+    def _remove(self, result_id: str):
+        """Remove a result (caller holds the lock)."""
+        self._bytes -= self._results.pop(result_id).table.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get result store statistics for monitoring.
+
+        Returns:
+            Dictionary with result count, bytes used and access counters
+        """
+        with self._lock:
+            return {
+                "results": len(self._results),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "stores": self._stores,
+                "pages": self._pages,
+                "denied": self._denied,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,599 @@
+"""
+Single-Pass RLS Query Rewriter for Database Chat Application.
+
+The statement is tokenized once and walked once by a small recursive-descent
+parser that understands query blocks. Every SELECT block gets its own filter
+predicates at its own scope, including:
+
+- WITH clause (CTE) bodies; references to a CTE name are not filtered again
+- each branch of UNION / UNION ALL / INTERSECT / MINUS / EXCEPT
+- inline views in FROM and parenthesized joins
+- scalar, IN/EXISTS and correlated subqueries anywhere in a block
+- UPDATE and DELETE targets
+
+Predicates are injected by recording character offsets during the walk and
+splicing the text in afterwards, so the cost is linear in the SQL length.
+An existing WHERE condition is wrapped in parentheses before AND-ing the
+filter, so OR conditions cannot bypass it.
+
+The generated text is canonical so Oracle can share one cursor per query
+shape across users: binds are named after their filter column
+(:rls_employee_id, reused wherever that column is filtered), unquoted table
+names and aliases are upper-cased, and a block's predicates are sorted.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Significant token kinds
+_WORD = "word"
+_QIDENT = "qident"
+_PUNCT = "punct"
+_OTHER = "other"
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    |(?P<qstring>[nN]?[qQ]'(?:\[.*?\]|\{.*?\}|\(.*?\)|<.*?>|(?P<qd>\S).*?(?P=qd))')
+    |(?P<string>[nN]?'(?:[^']|'')*(?:'|\Z))
+    |(?P<qident>"[^"]*(?:"|\Z))
+    |(?P<bind>:\w+)
+    |(?P<word>[A-Za-z_][\w$#]*)
+    |(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    |(?P<punct>.)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+_SET_OPERATORS = {"UNION", "INTERSECT", "MINUS", "EXCEPT"}
+_JOIN_WORDS = {"JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL", "OUTER"}
+_TABLE_FUNCTIONS = {"TABLE", "XMLTABLE", "JSON_TABLE", "THE"}
+
+# Words that can never be a table alias
+_NOT_ALIAS = _SET_OPERATORS | _JOIN_WORDS | {
+    "WHERE", "ON", "USING", "GROUP", "ORDER", "HAVING", "CONNECT", "START",
+    "FETCH", "OFFSET", "FOR", "MODEL", "WINDOW", "PIVOT", "UNPIVOT", "LATERAL",
+    "APPLY", "SET", "RETURNING", "LIMIT", "WITH", "PARTITION", "SUBPARTITION",
+    "SAMPLE", "AS", "SELECT", "FROM", "LOG", "VERSIONS",
+}
+
+
+_BIND_NAME = re.compile(r"^[a-z][a-z0-9_]{0,29}$")
+
+
+def bind_name(column: str) -> str:
+    """
+    Deterministic bind variable name for a filter column.
+
+    Args:
+        column: Filter column name
+
+    Returns:
+        rls_<column> in lower case, or rls_<crc32> when that would not be a
+        plain identifier of at most 30 characters
+    """
+    name = f"rls_{column.lower()}"
+    if _BIND_NAME.match(name):
+        return name
+    return f"rls_{zlib.crc32(column.encode('utf-8')):08x}"
+
+
+@dataclass
+class _Token:
+    kind: str
+    text: str
+    upper: str
+    start: int
+    end: int
+
+
+@dataclass
+class _Block:
+    """One query block (SELECT, or the target of UPDATE/DELETE)."""
+    tables: List[Tuple[str, str]] = field(default_factory=list)  # (lookup name, prefix)
+    where_body_start: Optional[int] = None
+    where_end: Optional[int] = None
+    from_end: Optional[int] = None
+
+
+def tokenize(sql: str) -> List[_Token]:
+    """Split SQL into significant tokens (whitespace and comments dropped)."""
+    tokens = []
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("ws", "comment"):
+            continue
+        text = match.group(0)
+        if kind not in (_WORD, _QIDENT, _PUNCT):
+            kind = _OTHER
+        tokens.append(_Token(kind, text, text.upper() if kind == _WORD else text, match.start(), match.end()))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent walk over the token list; each token is visited once."""
+
+    def __init__(self, sql: str, tokens: List[_Token], matching_columns: Callable[[str], List[str]]):
+        self.sql = sql
+        self.tokens = tokens
+        self.matching_columns = matching_columns
+        self.pos = 0
+        self.last_end = 0
+        self.insertions: List[Tuple[int, int, str]] = []
+        self.bind_columns: Dict[str, str] = {}
+        self.cte_scopes: List[Set[str]] = []
+
+    # -- token helpers -------------------------------------------------
+
+    def peek(self, offset: int = 0) -> Optional[_Token]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def is_word(self, *words: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.kind == _WORD and token.upper in words
+
+    def is_punct(self, char: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.kind == _PUNCT and token.text == char
+
+    def advance(self) -> _Token:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        self.last_end = token.end
+        return token
+
+    def starts_query(self) -> bool:
+        """Check if the tokens at pos open a query (possibly inside extra parentheses)."""
+        offset = 0
+        while self.is_punct("(", offset):
+            offset += 1
+        return self.is_word("SELECT", "WITH", offset=offset)
+
+    def at_clause(self) -> bool:
+        """Check if the current token starts a clause that ends WHERE/FROM."""
+        token = self.peek()
+        if token is None or token.kind != _WORD:
+            return False
+        word = token.upper
+        if word in _SET_OPERATORS or word in ("WHERE", "HAVING", "RETURNING"):
+            return True
+        if word in ("GROUP", "CONNECT"):
+            return self.is_word("BY", offset=1)
+        if word == "ORDER":
+            return self.is_word("BY", "SIBLINGS", offset=1)
+        if word == "START":
+            return self.is_word("WITH", offset=1)
+        if word == "FETCH":
+            return self.is_word("FIRST", "NEXT", offset=1)
+        if word == "FOR":
+            return self.is_word("UPDATE", offset=1)
+        if word == "OFFSET":
+            return self.is_word("ROW", "ROWS", offset=2)
+        return False
+
+    def at_join(self) -> bool:
+        return self.is_word(*_JOIN_WORDS) or (
+            self.is_word("CROSS", "OUTER") and self.is_word("APPLY", offset=1)
+        )
+
+    # -- expressions ----------------------------------------------------
+
+    def paren(self):
+        """Consume a parenthesized group, walking any subquery inside it."""
+        self.advance()  # (
+        if self.starts_query():
+            self.query()
+        else:
+            self.expression(lambda: False)
+        if self.is_punct(")"):
+            self.advance()
+
+    def expression(self, stop: Callable[[], bool], stop_at_comma: bool = False):
+        """Skip an expression, descending into parentheses, until stop() or a closer."""
+        while True:
+            token = self.peek()
+            if token is None:
+                return
+            if token.kind == _PUNCT:
+                if token.text in ");":
+                    return
+                if token.text == "," and stop_at_comma:
+                    return
+                if token.text == "(":
+                    self.paren()
+                    continue
+            elif token.kind == _WORD and stop():
+                return
+            self.advance()
+
+    # -- queries --------------------------------------------------------
+
+    def query(self):
+        """query := [WITH ctes] term {set_operator term} [trailing clauses]"""
+        pushed = False
+        if self.is_word("WITH"):
+            self.cte_scopes.append(set())
+            pushed = True
+            self.with_clause()
+        while True:
+            if self.is_punct("("):
+                self.advance()
+                self.query()
+                if self.is_punct(")"):
+                    self.advance()
+            elif self.is_word("SELECT"):
+                self.select_block()
+            else:
+                break
+            if self.is_word(*_SET_OPERATORS):
+                self.advance()
+                if self.is_word("ALL", "DISTINCT"):
+                    self.advance()
+                continue
+            break
+        # ORDER BY / FETCH after a parenthesized compound query
+        self.expression(lambda: False)
+        if pushed:
+            self.cte_scopes.pop()
+
+    def with_clause(self):
+        self.advance()  # WITH
+        while True:
+            token = self.peek()
+            if token is None or token.kind not in (_WORD, _QIDENT):
+                return
+            self.advance()
+            self.cte_scopes[-1].add(self._lookup_name(token))
+            if self.is_punct("("):
+                self.paren()  # column alias list
+            if self.is_word("AS"):
+                self.advance()
+            if self.is_word("MATERIALIZED"):
+                self.advance()
+            if self.is_punct("("):
+                self.paren()
+            # SEARCH / CYCLE clauses
+            self.expression(lambda: self.is_word("SELECT", "WITH"), stop_at_comma=True)
+            if self.is_punct(","):
+                self.advance()
+                continue
+            return
+
+    def select_block(self):
+        block = _Block()
+        self.advance()  # SELECT
+        self.expression(lambda: self.is_word("FROM") or self.at_clause())
+        if self.is_word("FROM"):
+            self.advance()
+            self.from_items(block)
+            block.from_end = self.last_end
+        if self.is_word("WHERE"):
+            self.advance()
+            block.where_body_start = self.peek().start if self.peek() else self.last_end
+            self.expression(self.at_clause)
+            block.where_end = self.last_end
+        # GROUP BY, HAVING, CONNECT BY, ORDER BY, ... up to a set operator
+        self.expression(lambda: self.is_word(*_SET_OPERATORS))
+        self.finish_block(block)
+
+    def from_items(self, block: _Block):
+        while True:
+            self.from_item(block)
+            while self.is_word("ON", "USING"):
+                if self.advance().upper == "USING" and self.is_punct("("):
+                    self.paren()
+                else:
+                    self.expression(lambda: self.at_join() or self.at_clause(), stop_at_comma=True)
+            if self.is_punct(","):
+                self.advance()
+                continue
+            if self.at_join():
+                while self.at_join():
+                    self.advance()
+                if self.is_word("JOIN", "APPLY"):
+                    self.advance()
+                continue
+            return
+
+    def from_item(self, block: _Block):
+        if self.is_word("LATERAL"):
+            self.advance()
+        token = self.peek()
+        if token is None:
+            return
+        if token.kind == _PUNCT and token.text == "(":
+            if self.starts_query():
+                self.paren()  # inline view: its own block
+            else:
+                self.advance()
+                self.from_items(block)  # parenthesized join
+                if self.is_punct(")"):
+                    self.advance()
+        elif token.kind == _WORD and token.upper in _TABLE_FUNCTIONS and self.is_punct("(", offset=1):
+            self.advance()
+            self.paren()
+        elif token.kind in (_WORD, _QIDENT):
+            self.table_reference(block)
+            return
+        else:
+            return
+        self.modifiers()
+        self.alias()
+
+    def table_reference(self, block: _Block):
+        last = self.advance()
+        parts = [self._canonical(last)]
+        while self.is_punct(".") and self.peek(1) is not None and self.peek(1).kind in (_WORD, _QIDENT):
+            self.advance()
+            last = self.advance()
+            parts.append(self._canonical(last))
+        name = ".".join(parts)
+        remote = self.is_punct("@")
+        if remote:
+            # Remote table: columns are qualified by the name without the link
+            self.advance()
+            if self.peek() is not None and self.peek().kind == _WORD:
+                self.advance()
+                while self.is_punct(".") and self.peek(1) is not None and self.peek(1).kind == _WORD:
+                    self.advance()
+                    self.advance()
+        self.modifiers()
+        alias = self.alias()
+        lookup = self._lookup_name(last)
+        # Only an unqualified, local name can refer to a CTE
+        is_cte = len(parts) == 1 and not remote and any(lookup in scope for scope in self.cte_scopes)
+        if not is_cte:
+            block.tables.append((lookup, alias or name))
+
+    def modifiers(self):
+        """
+        Skip PARTITION (...), SAMPLE [BLOCK] (...) [SEED (...)], PIVOT (...)
+        and flashback clauses (AS OF ..., VERSIONS BETWEEN ... AND ...).
+        """
+        while True:
+            if self.is_word("PARTITION", "SUBPARTITION", "PIVOT", "UNPIVOT"):
+                self.advance()
+                if self.is_word("XML", "INCLUDE", "EXCLUDE"):
+                    self.advance()
+                if self.is_word("NULLS"):
+                    self.advance()
+                    self.advance()
+                if self.is_punct("("):
+                    self.paren()
+            elif self.is_word("SAMPLE"):
+                self.advance()
+                if self.is_word("BLOCK"):
+                    self.advance()
+                if self.is_punct("("):
+                    self.paren()
+                if self.is_word("SEED"):
+                    self.advance()
+                    if self.is_punct("("):
+                        self.paren()
+            elif self.is_word("AS") and self.is_word("OF", offset=1):
+                self.advance()
+                self.advance()
+                self.flashback_bound()
+                self.flashback_value()
+            elif self.is_word("VERSIONS"):
+                self.advance()
+                if self.is_word("PERIOD"):
+                    self.flashback_bound()
+                if self.is_word("BETWEEN"):
+                    self.advance()
+                    self.flashback_bound()
+                    self.flashback_value()
+                    if self.is_word("AND"):
+                        self.advance()
+                        self.flashback_value()
+            else:
+                return
+
+    def flashback_bound(self):
+        """Skip SCN | TIMESTAMP | PERIOD FOR <column>."""
+        if self.is_word("PERIOD") and self.is_word("FOR", offset=1):
+            self.advance()
+            self.advance()
+            self.advance()
+        elif self.is_word("SCN", "TIMESTAMP"):
+            self.advance()
+
+    def flashback_value(self):
+        """
+        Skip a flashback expression. Unlike other expressions it can be
+        followed directly by the table alias, so it is read as operands
+        joined by arithmetic or || operators.
+        """
+        while True:
+            while self.is_punct("+") or self.is_punct("-"):
+                self.advance()
+            self.operand()
+            if self.is_punct("|") and self.is_punct("|", offset=1):
+                self.advance()
+                self.advance()
+            elif any(self.is_punct(op) for op in "+-*/"):
+                self.advance()
+            else:
+                return
+
+    def operand(self):
+        """Skip one operand: literal, bind, (...), name[.name][(...)], or INTERVAL/TIMESTAMP/DATE literal."""
+        token = self.peek()
+        if token is None:
+            return
+        if token.kind == _PUNCT:
+            if token.text == "(":
+                self.paren()
+            return
+        self.advance()
+        if token.kind != _WORD:
+            return
+        if token.upper in ("TIMESTAMP", "DATE") and self.peek() is not None and self.peek().kind == _OTHER:
+            self.advance()  # TIMESTAMP '...'
+        elif token.upper == "INTERVAL" and self.peek() is not None and self.peek().kind == _OTHER:
+            self.advance()  # '...'
+            for _ in range(2):  # leading unit [TO trailing unit]
+                if self.is_word("YEAR", "MONTH", "DAY", "HOUR", "MINUTE", "SECOND"):
+                    self.advance()
+                    if self.is_punct("("):
+                        self.paren()
+                if not self.is_word("TO"):
+                    break
+                self.advance()
+        else:
+            while self.is_punct(".") and self.peek(1) is not None and self.peek(1).kind in (_WORD, _QIDENT):
+                self.advance()
+                self.advance()
+            if self.is_punct("("):
+                self.paren()
+
+    def alias(self) -> Optional[str]:
+        if self.is_word("AS"):
+            self.advance()
+        token = self.peek()
+        if token is None:
+            return None
+        if token.kind == _QIDENT or (token.kind == _WORD and token.upper not in _NOT_ALIAS):
+            self.advance()
+            return self._canonical(token)
+        return None
+
+    def update_statement(self):
+        block = _Block()
+        self.advance()  # UPDATE
+        if self.is_punct("("):
+            self.from_item(block)
+        else:
+            self.table_reference(block)
+        self.expression(lambda: self.is_word("WHERE", "RETURNING", "LOG"))
+        block.from_end = self.last_end
+        self.dml_where(block)
+
+    def delete_statement(self):
+        block = _Block()
+        self.advance()  # DELETE
+        if self.is_word("FROM"):
+            self.advance()
+        if self.is_punct("("):
+            self.from_item(block)
+        else:
+            self.table_reference(block)
+        block.from_end = self.last_end
+        self.dml_where(block)
+
+    def dml_where(self, block: _Block):
+        if self.is_word("WHERE"):
+            self.advance()
+            block.where_body_start = self.peek().start if self.peek() else self.last_end
+            self.expression(lambda: self.is_word("RETURNING", "LOG"))
+            block.where_end = self.last_end
+        self.expression(lambda: False)
+        self.finish_block(block)
+
+    # -- output ---------------------------------------------------------
+
+    @staticmethod
+    def _lookup_name(token: _Token) -> str:
+        if token.kind == _QIDENT:
+            return token.text.strip('"')
+        return token.upper
+
+    @staticmethod
+    def _canonical(token: _Token) -> str:
+        """Spell an identifier the same way regardless of the input's case."""
+        if token.kind == _QIDENT:
+            return token.text
+        return token.upper
+
+    def finish_block(self, block: _Block):
+        conditions = set()
+        for table_name, prefix in block.tables:
+            for column in self.matching_columns(table_name):
+                name = bind_name(column)
+                self.bind_columns[name] = column
+                conditions.add(f"{prefix}.{column} = :{name}")
+        if not conditions:
+            return
+        condition = " AND ".join(sorted(conditions))
+        if block.where_end is not None:
+            self._insert(block.where_body_start, "(")
+            self._insert(block.where_end, f") AND ({condition})")
+        elif block.from_end is not None:
+            self._insert(block.from_end, f" WHERE ({condition})")
+
+    def _insert(self, position: int, text: str):
+        self.insertions.append((position, len(self.insertions), text))
+
+    def render(self) -> str:
+        parts = []
+        previous = 0
+        for position, _, text in sorted(self.insertions):
+            parts.append(self.sql[previous:position])
+            parts.append(text)
+            previous = position
+        parts.append(self.sql[previous:])
+        return "".join(parts)
+
+
+def _parse(sql: str, matching_columns: Callable[[str], List[str]]) -> Tuple[str, Optional[_Parser]]:
+    """Walk a statement once; returns its kind and the parser (None if not walked)."""
+    tokens = tokenize(sql)
+    parser = _Parser(sql, tokens, matching_columns)
+    if parser.starts_query() or parser.is_punct("("):
+        parser.query()
+        return "query", parser
+    if parser.is_word("UPDATE"):
+        parser.update_statement()
+        return "update", parser
+    if parser.is_word("DELETE"):
+        parser.delete_statement()
+        return "delete", parser
+    return "other", None
+
+
+def rewrite(sql: str, matching_columns: Callable[[str], List[str]]) -> Tuple[str, Dict[str, str]]:
+    """
+    Inject row-level security predicates into every query block of a statement.
+
+    Args:
+        sql: The SQL statement (without trailing semicolon)
+        matching_columns: Callable returning the filter columns to enforce
+            for a table name (upper-cased unless quoted); empty for none
+
+    Returns:
+        Tuple of (rewritten_sql, bind_columns) where bind_columns maps each
+        bind name used in the rewritten SQL to its filter column (one bind
+        per column, however many tables it filters). INSERT,
+        MERGE and other statements are returned unchanged with no binds.
+    """
+    _, parser = _parse(sql, matching_columns)
+    if parser is None or not parser.bind_columns:
+        return sql, {}
+    return parser.render(), parser.bind_columns
+
+
+def statement_tables(sql: str) -> Tuple[str, Set[str]]:
+    """
+    Classify a statement and collect the tables it references.
+
+    Args:
+        sql: The SQL statement (without trailing semicolon)
+
+    Returns:
+        Tuple of (kind, tables): kind is "query", "update", "delete" or
+        "other"; tables holds the table and view names (upper-cased unless
+        quoted, CTE names excluded). For "other" statements (INSERT, MERGE,
+        DDL, PL/SQL) tables is empty.
+    """
+    tables: Set[str] = set()
+
+    def collect(table_name: str) -> List[str]:
+        tables.add(table_name)
+        return []
+
+    kind, _ = _parse(sql, collect)
+    return kind, tables
@@ -5,6 +5,12 @@ This service manages row-level security (RLS) by:
 1. Dynamically discovering filter columns from the AI_USERS table
 2. Caching table schema metadata
 3. Modifying SQL queries to inject WHERE clause filters for NORMALUSER
+4. Caching rewrites per (normalized SQL, filter columns, catalog version),
+   so replayed statements skip parsing and only need bind values filled in
+
+Query rewriting itself is done in a single pass by rls_rewriter. In VPD
+mode (RLS_MODE=vpd) SQL is not rewritten at all: Oracle DBMS_RLS policies
+filter rows using the user's values from the session context (see rls_vpd).
 
 Filter columns are any columns in AI_USERS beyond the standard columns:
 - USERNAME, IS_ADMIN, IS_SUPERUSER, IS_NORMALUSER
@@ -18,14 +24,36 @@ import logging
 from typing import Optional, Dict, List, Any, Tuple, Set
 from dataclasses import dataclass
 import oracledb
-import sqlparse
-from sqlparse.sql import IdentifierList, Identifier, Where, Parenthesis, Token
-from sqlparse import tokens as T
+
+from . import rls_rewriter
+from .cache import TTLCache
+from .catalog_index import ColumnIndex
+from .db_pool import OraclePool
+from .rls_vpd import VpdPolicyManager
+from .user_directory import UserDirectory, STANDARD_COLUMNS
 
 logger = logging.getLogger(__name__)
 
-# Standard columns in AI_USERS that are NOT filter columns
-STANDARD_COLUMNS = {'USERNAME', 'IS_ADMIN', 'IS_SUPERUSER', 'IS_NORMALUSER'}
+# String literals, quoted identifiers and comments are kept verbatim when
+# normalizing SQL; only whitespace runs outside them are collapsed
+_SQL_LEXEME = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|--[^\n]*|/\*.*?\*/|\s+", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip a trailing semicolon and collapse whitespace outside literals."""
+    sql = sql.strip()
+    if sql.endswith(';'):
+        sql = sql[:-1].strip()
+    
+    def collapse(match):
+        text = match.group(0)
+        if text[0].isspace():
+            return " "
+        if text.startswith("--"):
+            return text + "\n"
+        return text
+    
+    return _SQL_LEXEME.sub(collapse, sql).strip()
 
 
 @dataclass
@@ -44,6 +72,9 @@ class RLSConfig:
     enabled: bool = True
     cache_ttl: float = 300.0  # 5 minutes
     excluded_tables: List[str] = None  # Tables exempt from RLS
+    user_cache_max_size: int = 1000  # Users whose filter values are cached
+    rewrite_cache_size: int = 500  # Distinct rewritten statements cached
+    mode: str = "rewrite"  # "rewrite" (inject predicates) or "vpd" (Oracle DBMS_RLS)
     
     def __post_init__(self):
         if self.excluded_tables is None:
@@ -67,30 +98,129 @@ class RowLevelSecurityService:
     is considered a filter column.
     """
     
-    def __init__(self, oracle_config, rls_config: RLSConfig = None):
+    def __init__(
+        self,
+        oracle_config,
+        rls_config: RLSConfig = None,
+        pool: Optional[OraclePool] = None,
+        user_directory: Optional[UserDirectory] = None,
+        column_index: Optional[ColumnIndex] = None
+    ):
         """
         Initialize the RLS service.
         
         Args:
             oracle_config: Oracle database configuration with user, password, dsn
             rls_config: Optional RLS configuration settings
+            pool: Optional shared Oracle connection pool
+            user_directory: Optional in-memory AI_USERS directory; filter
+                columns and values are then served from memory
+            column_index: Optional bulk USER_TAB_COLUMNS index; table
+                metadata lookups are then served from memory
         """
         self.oracle_config = oracle_config
         self.config = rls_config or RLSConfig()
+        self.pool = pool
+        self.user_directory = user_directory
+        self.column_index = column_index
         
         # Caches
         self._filter_columns_cache: Optional[CacheEntry] = None
         self._table_columns_cache: Dict[str, CacheEntry] = {}
-        self._user_filter_values_cache: Dict[str, CacheEntry] = {}
+        # The single user filter-value cache; the SQL tool and the system
+        # prompt builder read through get_user_filter_values()
+        self.user_filter_cache = TTLCache(
+            max_size=self.config.user_cache_max_size,
+            ttl=self.config.cache_ttl,
+            name="rls_user_filters"
+        )
+        # Rewritten SQL templates and their bind-name -> filter-column maps
+        self.rewrite_cache = TTLCache(
+            max_size=self.config.rewrite_cache_size,
+            ttl=self.config.cache_ttl,
+            name="rls_rewrites"
+        )
+        self._rewrite_parse_seconds = 0.0
+        self._rewrite_seconds_saved = 0.0
+        
+        self.vpd: Optional[VpdPolicyManager] = None
+        if self.config.enabled and self.config.mode == "vpd":
+            self.vpd = VpdPolicyManager(oracle_config, pool=pool)
     
     def _get_connection(self) -> oracledb.Connection:
-        """Create a new database connection."""
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
         return oracledb.connect(
             user=self.oracle_config.user,
             password=self.oracle_config.password,
             dsn=self.oracle_config.dsn
         )
     
+    @property
+    def vpd_enabled(self) -> bool:
+        """
+        Check if rows are filtered by VPD policies instead of rewriting.
+
+        Only true once the last policy sync succeeded; until then queries
+        are rewritten (the policy predicate is empty without a session
+        context, so the two never filter twice).
+        """
+        return self.vpd is not None and self.vpd.installed and self.vpd.synced
+    
+    def setup_vpd(self):
+        """
+        Install the VPD context and package and sync DBMS_RLS policies.
+        
+        Policies cover every non-excluded table that has a filter column.
+        Called at startup and again whenever the column index changes. If
+        the setup fails (e.g. missing privileges) the service falls back to
+        SQL rewriting: for good if nothing was installed, otherwise until a
+        later sync succeeds.
+        """
+        if self.vpd is None:
+            return
+        try:
+            filter_columns = self.get_filter_columns()
+            self.vpd.install(filter_columns)
+            self.vpd.sync_policies(self._vpd_tables(filter_columns))
+        except (oracledb.Error, ValueError) as e:
+            if self.vpd.installed:
+                logger.error(f"RLS: VPD policy sync failed, using SQL rewriting until the next sync: {e}")
+            else:
+                logger.error(f"RLS: VPD setup failed, falling back to SQL rewriting: {e}")
+                self.vpd = None
+    
+    def _vpd_tables(self, filter_columns: List[str]) -> Set[str]:
+        """Tables that need a VPD policy: any non-excluded table with a filter column."""
+        tables = set()
+        if self.column_index is not None and self.column_index.loaded:
+            for column in filter_columns:
+                tables |= self.column_index.tables_with_column(column)
+        elif filter_columns:
+            connection = self._get_connection()
+            try:
+                cursor = connection.cursor()
+                binds = {f"c{i}": column for i, column in enumerate(filter_columns)}
+                cursor.execute(
+                    "SELECT DISTINCT TABLE_NAME FROM USER_TAB_COLUMNS "
+                    f"WHERE COLUMN_NAME IN ({', '.join(':' + name for name in binds)})",
+                    binds
+                )
+                tables = {row[0].upper() for row in cursor.fetchall()}
+                cursor.close()
+            finally:
+                connection.close()
+        return tables - set(self.config.excluded_tables)
+    
+    def apply_session(self, connection: oracledb.Connection, username: str, filter_values: Dict[str, Any]):
+        """Set a user's filter values on a connection's VPD context (VPD mode only)."""
+        self.vpd.set_session(connection, username, filter_values)
+    
+    def clear_session(self, connection: oracledb.Connection):
+        """Clear the VPD context before the connection is released (VPD mode only)."""
+        self.vpd.clear_session(connection)
+    
     def get_filter_columns(self) -> List[str]:
         """
         Get the list of filter columns from AI_USERS table.
@@ -101,6 +231,9 @@ class RowLevelSecurityService:
         Returns:
             List of filter column names (uppercase)
         """
+        if self.user_directory is not None and self.user_directory.loaded:
+            return self.user_directory.filter_columns
+        
         # Check cache
         if self._filter_columns_cache and not self._filter_columns_cache.is_expired(self.config.cache_ttl):
             return self._filter_columns_cache.data
@@ -146,28 +279,48 @@ class RowLevelSecurityService:
         """
         Get the filter column values for a specific user.
         
+        Values are served from the in-memory user directory when available,
+        otherwise from the bounded user filter cache (concurrent misses for
+        the same user share one database query).
+        
         Args:
             username: The username to look up in AI_USERS
             
         Returns:
             Dictionary mapping filter column names to their values for this user
         """
-        cache_key = username.upper()
+        if self.user_directory is not None and self.user_directory.loaded:
+            try:
+                record = self.user_directory.get(username)
+            except oracledb.Error as e:
+                logger.error(f"RLS: Error getting filter values for '{username}': {e}")
+                return {}
+            return dict(record.filter_values) if record is not None else {}
         
-        # Check cache
-        if cache_key in self._user_filter_values_cache:
-            cache_entry = self._user_filter_values_cache[cache_key]
-            if not cache_entry.is_expired(self.config.cache_ttl):
-                return cache_entry.data
+        try:
+            return self.user_filter_cache.get_or_load(
+                username.upper(),
+                lambda: self._load_user_filter_values(username)
+            )
+        except oracledb.Error as e:
+            logger.error(f"RLS: Error getting filter values for '{username}': {e}")
+            return {}
+    
+    def _load_user_filter_values(self, username: str) -> Dict[str, Any]:
+        """
+        Query AI_USERS for a user's filter values.
         
+        Raises:
+            oracledb.Error: If the query fails (the result is then not cached)
+        """
         filter_columns = self.get_filter_columns()
         if not filter_columns:
             return {}
         
         filter_values = {}
         
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
             # Build query for filter columns
@@ -185,20 +338,10 @@ class RowLevelSecurityService:
                         filter_values[column_name] = value
             
             cursor.close()
+        finally:
             connection.close()
-            
-            # Cache the result
-            self._user_filter_values_cache[cache_key] = CacheEntry(
-                data=filter_values,
-                timestamp=time.time()
-            )
-            
-            logger.info(f"RLS: User '{username}' filter values: {filter_values}")
-            
-        except oracledb.Error as e:
-            logger.error(f"RLS: Error getting filter values for '{username}': {e}")
-            return {}
         
+        logger.info(f"RLS: User '{username}' filter values: {filter_values}")
         return filter_values
     
     def get_table_columns(self, table_name: str) -> Set[str]:
@@ -211,6 +354,9 @@ class RowLevelSecurityService:
         Returns:
             Set of column names (uppercase)
         """
+        if self.column_index is not None and self.column_index.loaded:
+            return set(self.column_index.get_table_columns(table_name))
+        
         table_key = table_name.upper()
         
         # Check cache
@@ -250,80 +396,6 @@ class RowLevelSecurityService:
         
         return columns
     
-    def _extract_table_names(self, parsed_sql) -> List[Tuple[str, Optional[str]]]:
-        """
-        Extract table names and their aliases from a parsed SQL statement.
-        
-        Returns:
-            List of tuples (table_name, alias) where alias may be None
-        """
-        tables = []
-        
-        def extract_table_identifier(token) -> Optional[Tuple[str, Optional[str]]]:
-            """Extract table name and alias from an identifier token."""
-            if isinstance(token, Identifier):
-                # Get the real name (might be schema.table)
-                real_name = token.get_real_name()
-                alias = token.get_alias()
-                if real_name:
-                    # Handle schema.table format
-                    if '.' in real_name:
-                        real_name = real_name.split('.')[-1]
-                    return (real_name.upper(), alias.upper() if alias else None)
-            return None
-        
-        def process_token(token):
-            """Recursively process tokens to find table references."""
-            if token.ttype is T.Keyword and token.value.upper() in ('FROM', 'JOIN', 'INNER JOIN', 'LEFT JOIN', 'RIGHT JOIN', 'FULL JOIN', 'CROSS JOIN', 'LEFT OUTER JOIN', 'RIGHT OUTER JOIN', 'FULL OUTER JOIN'):
-                return True
-            return False
-        
-        # Find FROM and JOIN clauses
-        from_seen = False
-        for token in parsed_sql.tokens:
-            # Skip whitespace and comments
-            if token.is_whitespace or token.ttype in T.Comment:
-                continue
-            
-            # Check for FROM/JOIN keywords
-            if token.ttype is T.Keyword:
-                keyword = token.value.upper()
-                if keyword in ('FROM', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS', 'OUTER', 'NATURAL'):
-                    from_seen = True
-                    continue
-                elif keyword in ('WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'UNION', 'INTERSECT', 'EXCEPT', 'MINUS'):
-                    from_seen = False
-                    continue
-            
-            if from_seen:
-                if isinstance(token, IdentifierList):
-                    # Multiple tables: FROM t1, t2, t3
-                    for identifier in token.get_identifiers():
-                        result = extract_table_identifier(identifier)
-                        if result:
-                            tables.append(result)
-                    from_seen = False
-                elif isinstance(token, Identifier):
-                    result = extract_table_identifier(token)
-                    if result:
-                        tables.append(result)
-                    from_seen = False
-                elif token.ttype is T.Name or (token.ttype is T.Keyword and token.value.upper() not in ('JOIN', 'ON', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS', 'OUTER', 'NATURAL')):
-                    # Simple table name without alias
-                    if token.ttype is T.Name:
-                        tables.append((token.value.upper(), None))
-                        from_seen = False
-            
-            # Recursively process subqueries
-            if isinstance(token, Parenthesis):
-                inner_sql = token.value[1:-1].strip()
-                if inner_sql.upper().startswith('SELECT'):
-                    inner_parsed = sqlparse.parse(inner_sql)
-                    if inner_parsed:
-                        tables.extend(self._extract_table_names(inner_parsed[0]))
-        
-        return tables
-    
     def _find_matching_filter_columns(self, table_name: str, filter_columns: List[str]) -> List[str]:
         """
         Find which filter columns exist in a given table.
@@ -335,6 +407,13 @@ class RowLevelSecurityService:
         Returns:
             List of filter column names that exist in the table
         """
+        if self.column_index is not None and self.column_index.loaded:
+            table_key = table_name.upper()
+            return [
+                col for col in filter_columns
+                if table_key in self.column_index.tables_with_column(col)
+            ]
+        
         table_columns = self.get_table_columns(table_name)
         return [col for col in filter_columns if col in table_columns]
     
@@ -357,159 +436,95 @@ class RowLevelSecurityService:
             logger.debug("RLS: No filter values for user, returning original query")
             return sql, {}
         
-        # Strip trailing semicolons (Oracle doesn't want them in programmatic execution)
-        sql = sql.strip()
-        if sql.endswith(';'):
-            sql = sql[:-1].strip()
-        
-        # Parse the SQL
-        parsed = sqlparse.parse(sql)
-        if not parsed:
-            return sql, {}
-        
-        statement = parsed[0]
-        
-        # Get statement type
-        stmt_type = statement.get_type()
-        if stmt_type not in ('SELECT', 'UPDATE', 'DELETE'):
-            # Don't filter INSERT or other statement types
-            logger.debug(f"RLS: Skipping filter for statement type: {stmt_type}")
-            return sql, {}
-        
-        # Extract tables from the query
-        tables = self._extract_table_names(statement)
-        logger.debug(f"RLS: Extracted tables: {tables}")
-        
-        if not tables:
-            return sql, {}
-        
-        # Build filter conditions
-        filter_conditions = []
-        bind_params = {}
-        param_counter = 0
-        
-        filter_columns = list(user_filter_values.keys())
+        # Normalizing also strips trailing semicolons (Oracle doesn't want
+        # them in programmatic execution)
+        sql = normalize_sql(sql)
+        filter_columns = tuple(sorted(user_filter_values.keys()))
+        catalog_version = self.column_index.version if self.column_index is not None else 0
+        cache_key = (sql, filter_columns, catalog_version)
+        
+        cached = self.rewrite_cache.get(cache_key)
+        if cached is not None:
+            modified_sql, bind_columns, parse_seconds = cached
+            self._rewrite_seconds_saved += parse_seconds
+        else:
+            start = time.perf_counter()
+            modified_sql, bind_columns = self._rewrite(sql, list(filter_columns))
+            parse_seconds = time.perf_counter() - start
+            self._rewrite_parse_seconds += parse_seconds
+            self.rewrite_cache.set(cache_key, (modified_sql, bind_columns, parse_seconds))
         
-        for table_name, alias in tables:
-            # Check if table is excluded
-            if table_name in self.config.excluded_tables:
-                logger.debug(f"RLS: Table '{table_name}' is excluded from RLS")
-                continue
-            
-            # Find matching filter columns for this table
-            matching_columns = self._find_matching_filter_columns(table_name, filter_columns)
-            
-            if not matching_columns:
-                logger.debug(f"RLS: Table '{table_name}' has no matching filter columns")
-                continue
-            
-            # Build conditions for this table
-            table_prefix = alias if alias else table_name
-            for column in matching_columns:
-                param_name = f"rls_param_{param_counter}"
-                param_counter += 1
-                
-                condition = f"{table_prefix}.{column} = :{param_name}"
-                filter_conditions.append(condition)
-                bind_params[param_name] = user_filter_values[column]
-        
-        if not filter_conditions:
-            logger.debug("RLS: No filter conditions to apply")
+        if not bind_columns:
             return sql, {}
         
-        # Inject WHERE clause
-        combined_condition = " AND ".join(filter_conditions)
-        modified_sql = self._inject_where_clause(sql, combined_condition)
-        
-        logger.info(f"RLS: Applied filters. Original: {sql[:100]}...")
-        logger.info(f"RLS: Modified: {modified_sql[:100]}...")
+        bind_params = {name: user_filter_values[column] for name, column in bind_columns.items()}
         logger.debug(f"RLS: Bind params: {bind_params}")
-        
         return modified_sql, bind_params
     
-    def _inject_where_clause(self, sql: str, condition: str) -> str:
+    def _rewrite(self, sql: str, filter_columns: List[str]) -> Tuple[str, Dict[str, str]]:
         """
-        Inject a WHERE clause condition into a SQL query.
+        Rewrite a normalized query into a filtered SQL template.
         
-        Handles:
-        - Queries without existing WHERE clause
-        - Queries with existing WHERE clause (adds AND)
-        - Queries with GROUP BY, ORDER BY, etc.
+        The statement is parsed once by the single-pass rewriter, which adds
+        predicates to every query block (CTEs, set-operation branches, inline
+        views and subqueries) at that block's own scope.
         
         Args:
-            sql: The original SQL query
-            condition: The condition to add (without WHERE/AND prefix)
+            sql: The normalized SQL query
+            filter_columns: Filter columns the user has values for
             
         Returns:
-            Modified SQL with the condition injected
+            Tuple of (modified_sql, bind_columns) where bind_columns maps each
+            bind name in the template to the filter column whose value it takes.
+            bind_columns is empty when the query needs no filtering.
         """
-        # Parse the SQL
-        parsed = sqlparse.parse(sql)
-        if not parsed:
-            return sql
+        def matching_columns(table_name: str) -> List[str]:
+            if table_name in self.config.excluded_tables:
+                logger.debug(f"RLS: Table '{table_name}' is excluded from RLS")
+                return []
+            return self._find_matching_filter_columns(table_name, filter_columns)
         
-        statement = parsed[0]
+        modified_sql, bind_columns = rls_rewriter.rewrite(sql, matching_columns)
         
-        # Find if there's an existing WHERE clause
-        has_where = False
-        where_end_pos = -1
+        if not bind_columns:
+            logger.debug("RLS: No filter conditions to apply")
+            return sql, {}
         
-        tokens = list(statement.flatten())
+        logger.info(f"RLS: Applied filters. Original: {sql[:100]}...")
+        logger.info(f"RLS: Modified: {modified_sql[:100]}...")
         
-        for i, token in enumerate(tokens):
-            if token.ttype is T.Keyword and token.value.upper() == 'WHERE':
-                has_where = True
-                break
+        return modified_sql, bind_columns
+    
+    def rewrite_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get rewrite cache statistics for monitoring.
         
-        if has_where:
-            # Add condition with AND after existing WHERE conditions
-            # Find the position just before GROUP BY, ORDER BY, HAVING, LIMIT, UNION, etc.
-            
-            # Use regex to find where to insert
-            # Look for existing WHERE and insert before GROUP BY, ORDER BY, HAVING, etc.
-            pattern = r'(\bWHERE\b\s+.+?)(\s+(?:GROUP\s+BY|ORDER\s+BY|HAVING|LIMIT|UNION|INTERSECT|EXCEPT|MINUS|FETCH|OFFSET|FOR\s+UPDATE)\b|\s*$)'
-            
-            match = re.search(pattern, sql, re.IGNORECASE | re.DOTALL)
-            if match:
-                where_clause = match.group(1)
-                remainder = match.group(2)
-                before_where = sql[:match.start(1)]
-                
-                # Insert the AND condition
-                modified_sql = f"{before_where}{where_clause} AND ({condition}){remainder}"
-                return modified_sql
-            else:
-                # Fallback: just append AND at the end
-                return f"{sql} AND ({condition})"
-        else:
-            # No existing WHERE clause - need to insert one
-            # Find the position just before GROUP BY, ORDER BY, HAVING, etc.
-            
-            pattern = r'(\bFROM\b\s+.+?)(\s+(?:GROUP\s+BY|ORDER\s+BY|HAVING|LIMIT|UNION|INTERSECT|EXCEPT|MINUS|FETCH|OFFSET|FOR\s+UPDATE)\b|\s*$)'
-            
-            match = re.search(pattern, sql, re.IGNORECASE | re.DOTALL)
-            if match:
-                from_clause = match.group(1)
-                remainder = match.group(2)
-                before_from = sql[:match.start(1)]
-                
-                # Insert WHERE clause
-                modified_sql = f"{before_from}{from_clause} WHERE ({condition}){remainder}"
-                return modified_sql
-            else:
-                # Fallback: just append WHERE at the end
-                return f"{sql} WHERE ({condition})"
+        Returns:
+            Cache statistics plus total rewrite time spent on misses and
+            time saved by hits
+        """
+        stats = self.rewrite_cache.stats()
+        stats["parse_ms_total"] = round(self._rewrite_parse_seconds * 1000, 3)
+        stats["parse_ms_saved"] = round(self._rewrite_seconds_saved * 1000, 3)
+        return stats
     
     def clear_cache(self):
         """Clear all caches."""
         self._filter_columns_cache = None
         self._table_columns_cache.clear()
-        self._user_filter_values_cache.clear()
+        self.user_filter_cache.clear()
+        self.rewrite_cache.clear()
         logger.info("RLS: Caches cleared")
     
-    def clear_user_cache(self, username: str):
-        """Clear cache for a specific user."""
-        cache_key = username.upper()
-        if cache_key in self._user_filter_values_cache:
-            del self._user_filter_values_cache[cache_key]
+    def clear_user_cache(self, username: str = None):
+        """
+        Clear cached filter values.
+        
+        Args:
+            username: Optional specific user to clear. If None, clears all users.
+        """
+        if username is None:
+            self.user_filter_cache.clear()
+            logger.info("RLS: User filter cache cleared")
+        elif self.user_filter_cache.invalidate(username.upper()):
             logger.info(f"RLS: Cache cleared for user '{username}'")
@@ -0,0 +1,293 @@
+"""
+Oracle VPD Row-Level Security for Database Chat Application.
+
+In VPD mode the SQL text is never rewritten. Instead:
+
+1. An application context and a small PL/SQL package are installed. The
+   package sets/clears the context and provides the policy function.
+2. A DBMS_RLS policy is added to every table that contains an AI_USERS
+   filter column (and is not excluded). Policies are kept in sync as the
+   catalog or the set of filter columns changes.
+3. Before a NORMALUSER query runs, the user's filter values are stored in
+   the session's application context (and the client identifier is set to
+   the username for auditing); they are cleared before the pooled
+   connection is released.
+
+The policy function returns predicates such as
+EMPLOYEE_ID = SYS_CONTEXT('VANNA_RLS_CTX', 'EMPLOYEE_ID'), so the predicate
+text is identical for every user and Oracle shares one cursor per statement
+instead of hard-parsing each rewritten variant. Sessions without an active
+context (admins, superusers and internal components) are not filtered.
+
+Requires EXECUTE on DBMS_RLS and the CREATE ANY CONTEXT privilege.
+"""
+
+import logging
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import oracledb
+
+from .db_pool import OraclePool
+
+logger = logging.getLogger(__name__)
+
+_IDENTIFIER = re.compile(r"^[A-Z][A-Z0-9_$#]{0,127}$")
+
+
+def _check_identifier(name: str) -> str:
+    """Validate an unquoted Oracle identifier before embedding it in DDL."""
+    name = name.upper()
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid Oracle identifier for VPD: {name!r}")
+    return name
+
+
+class VpdPolicyManager:
+    """
+    Installs and maintains the VPD context, package and DBMS_RLS policies,
+    and sets the per-user context on pooled sessions.
+    """
+
+    def __init__(
+        self,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        context_name: str = "VANNA_RLS_CTX",
+        package_name: str = "VANNA_RLS_PKG",
+        policy_prefix: str = "VANNA_RLS"
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool: Optional shared Oracle connection pool
+            context_name: Name of the application context
+            package_name: Name of the PL/SQL package that owns the context
+            policy_prefix: Prefix for generated DBMS_RLS policy names
+        """
+        self.oracle_config = oracle_config
+        self.pool = pool
+        self.context_name = _check_identifier(context_name)
+        self.package_name = _check_identifier(package_name)
+        self.policy_prefix = _check_identifier(policy_prefix)
+        self._filter_columns: List[str] = []
+        self._policies: Dict[str, str] = {}
+        self._installed = False
+        self._synced = False
+        self._sessions_set = 0
+        self._syncs = 0
+
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+
+    @property
+    def installed(self) -> bool:
+        """Check if the context and package have been installed."""
+        return self._installed
+
+    @property
+    def synced(self) -> bool:
+        """Check if the last install and policy sync both completed."""
+        return self._synced
+
+    def policy_name(self, table_name: str) -> str:
+        """Stable policy name for a table (fits the 30 character limit)."""
+        return f"{self.policy_prefix}_{zlib.crc32(table_name.encode('utf-8')):08X}"
+
+    def _package_sql(self, filter_columns: List[str]) -> List[str]:
+        columns = ", ".join(f"'{c}'" for c in filter_columns) or "NULL"
+        spec = f"""
+CREATE OR REPLACE PACKAGE {self.package_name} AS
+  PROCEDURE set_value(p_name VARCHAR2, p_value VARCHAR2);
+  PROCEDURE activate;
+  PROCEDURE clear_values;
+  FUNCTION predicate(p_schema VARCHAR2, p_object VARCHAR2) RETURN VARCHAR2;
+END {self.package_name};"""
+        body = f"""
+CREATE OR REPLACE PACKAGE BODY {self.package_name} AS
+  PROCEDURE set_value(p_name VARCHAR2, p_value VARCHAR2) IS
+  BEGIN
+    DBMS_SESSION.SET_CONTEXT('{self.context_name}', p_name, p_value);
+  END;
+
+  PROCEDURE activate IS
+  BEGIN
+    DBMS_SESSION.SET_CONTEXT('{self.context_name}', 'RLS_ACTIVE', 'Y');
+  END;
+
+  PROCEDURE clear_values IS
+  BEGIN
+    DBMS_SESSION.CLEAR_ALL_CONTEXT('{self.context_name}');
+  END;
+
+  FUNCTION predicate(p_schema VARCHAR2, p_object VARCHAR2) RETURN VARCHAR2 IS
+    v_predicate VARCHAR2(4000);
+  BEGIN
+    IF SYS_CONTEXT('{self.context_name}', 'RLS_ACTIVE') IS NULL THEN
+      RETURN NULL;
+    END IF;
+    FOR c IN (
+      SELECT column_name FROM all_tab_columns
+      WHERE owner = p_schema AND table_name = p_object
+        AND column_name IN ({columns})
+      ORDER BY column_name
+    ) LOOP
+      IF SYS_CONTEXT('{self.context_name}', c.column_name) IS NOT NULL THEN
+        IF v_predicate IS NOT NULL THEN
+          v_predicate := v_predicate || ' AND ';
+        END IF;
+        v_predicate := v_predicate || c.column_name
+          || ' = SYS_CONTEXT(''{self.context_name}'', ''' || c.column_name || ''')';
+      END IF;
+    END LOOP;
+    RETURN v_predicate;
+  END;
+END {self.package_name};"""
+        return [
+            f"CREATE OR REPLACE CONTEXT {self.context_name} USING {self.package_name}",
+            spec.strip(),
+            body.strip(),
+        ]
+
+    def install(self, filter_columns: Iterable[str]):
+        """
+        Create or replace the application context and the policy package.
+
+        The package embeds the filter column list, so it is regenerated when
+        the AI_USERS filter columns change.
+
+        Raises:
+            oracledb.Error: If the DDL fails (e.g. missing privileges)
+        """
+        columns = sorted(_check_identifier(c) for c in filter_columns)
+        if self._installed and columns == self._filter_columns:
+            return
+        # New filter columns need a policy sync before VPD can be trusted
+        self._synced = False
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            for statement in self._package_sql(columns):
+                cursor.execute(statement)
+            cursor.close()
+        finally:
+            connection.close()
+        self._filter_columns = columns
+        self._installed = True
+        logger.info(f"VPD: Installed {self.package_name} for filter columns {columns}")
+
+    def sync_policies(self, tables: Set[str]):
+        """
+        Make the set of DBMS_RLS policies match the given tables.
+
+        Args:
+            tables: Table names that must be protected; names that are not
+                plain unquoted identifiers are skipped with a warning
+
+        Raises:
+            oracledb.Error: If a policy cannot be added or dropped
+        """
+        valid = set()
+        for table_name in tables:
+            if _IDENTIFIER.match(table_name.upper()):
+                valid.add(table_name.upper())
+            else:
+                logger.warning(f"VPD: Skipping table with quoted name {table_name!r}")
+        tables = valid
+        self._synced = False
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT OBJECT_NAME, POLICY_NAME FROM USER_POLICIES "
+                "WHERE POLICY_NAME LIKE :prefix ESCAPE '\\'",
+                {"prefix": f"{self.policy_prefix}\\_%"}
+            )
+            existing = {row[0]: row[1] for row in cursor.fetchall()}
+
+            for table_name in sorted(set(existing) - tables):
+                cursor.execute(
+                    "BEGIN DBMS_RLS.DROP_POLICY(object_schema => USER, "
+                    "object_name => :table_name, policy_name => :policy_name); END;",
+                    {"table_name": table_name, "policy_name": existing[table_name]}
+                )
+            for table_name in sorted(tables - set(existing)):
+                # Context-sensitive: the predicate is re-evaluated only when
+                # the application context changes, not on every execution
+                cursor.execute(
+                    "BEGIN DBMS_RLS.ADD_POLICY(object_schema => USER, "
+                    "object_name => :table_name, policy_name => :policy_name, "
+                    "function_schema => USER, policy_function => :policy_function, "
+                    "statement_types => 'SELECT,UPDATE,DELETE', "
+                    "policy_type => DBMS_RLS.CONTEXT_SENSITIVE); END;",
+                    {
+                        "table_name": table_name,
+                        "policy_name": self.policy_name(table_name),
+                        "policy_function": f"{self.package_name}.PREDICATE",
+                    }
+                )
+            cursor.close()
+        finally:
+            connection.close()
+        self._policies = {t: self.policy_name(t) for t in tables}
+        self._synced = True
+        self._syncs += 1
+        logger.info(f"VPD: {len(tables)} tables protected by policies")
+
+    def set_session(self, connection: oracledb.Connection, username: str, filter_values: Dict[str, Any]):
+        """
+        Store a user's filter values in the session context (one round trip).
+
+        Args:
+            connection: The connection the user's query will run on
+            username: The user (also set as client identifier for auditing)
+            filter_values: Filter column values for the user
+        """
+        connection.client_identifier = username
+        calls = [f"{self.package_name}.clear_values;"]
+        binds = {}
+        for i, (column, value) in enumerate(sorted(filter_values.items())):
+            calls.append(f"{self.package_name}.set_value('{_check_identifier(column)}', :v{i});")
+            binds[f"v{i}"] = None if value is None else str(value)
+        calls.append(f"{self.package_name}.activate;")
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN " + " ".join(calls) + " END;", binds)
+        finally:
+            cursor.close()
+        self._sessions_set += 1
+
+    def clear_session(self, connection: oracledb.Connection):
+        """Remove the user context before the connection goes back to the pool."""
+        connection.client_identifier = ""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"BEGIN {self.package_name}.clear_values; END;")
+        finally:
+            cursor.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get VPD statistics for monitoring.
+
+        Returns:
+            Dictionary with install state, protected tables and session counts
+        """
+        return {
+            "installed": self._installed,
+            "synced": self._synced,
+            "filter_columns": list(self._filter_columns),
+            "protected_tables": len(self._policies),
+            "policy_syncs": self._syncs,
+            "sessions_set": self._sessions_set,
+        }
@@ -13,6 +13,8 @@ from typing import List, Dict, Any, Optional
 import oracledb
 import asyncio
 
+from .db_pool import OraclePool
+
 logger = logging.getLogger(__name__)
 
 # Tables to exclude from training (system/internal tables)
@@ -37,7 +39,7 @@ class SchemaTrainer:
     The LLM can then search these memories when it needs schema context.
     """
     
-    def __init__(self, oracle_config, agent_memory, llm_service=None, openai_config=None):
+    def __init__(self, oracle_config, agent_memory, llm_service=None, openai_config=None, pool: Optional[OraclePool] = None):
         """
         Initialize the schema trainer.
         
@@ -46,14 +48,18 @@ class SchemaTrainer:
             agent_memory: MilvusAgentMemory instance for storing training data
             llm_service: Optional LLM service (kept for compatibility, not used for docs)
             openai_config: Optional OpenAI config for direct API calls
+            pool: Optional shared Oracle connection pool
         """
         self.oracle_config = oracle_config
+        self.pool = pool
         self.agent_memory = agent_memory
         self.llm_service = llm_service
         self.openai_config = openai_config
     
     def _get_connection(self) -> oracledb.Connection:
-        """Create a database connection."""
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
         return oracledb.connect(
             user=self.oracle_config.user,
             password=self.oracle_config.password,
@@ -6,27 +6,90 @@ security (RLS) filtering for NORMALUSER role. It wraps the standard
 RunSqlTool and injects WHERE clause filters based on user's AI_USERS data.
 
 For ADMIN and SUPERUSER roles, queries are executed without filtering.
+
+In VPD mode (RLS_MODE=vpd) NORMALUSER queries are sent unchanged; the
+user's filter values are set on the pooled session's application context
+and Oracle's DBMS_RLS policies filter the rows.
+
+With a ResultCache, repeated queries are answered from memory; entries are
+keyed by the final SQL, its binds and the user's RLS fingerprint, so users
+with different filter scopes never share results. Identical queries that
+arrive while one is already running wait for that execution instead of
+opening another cursor.
+
+Results are fetched straight into a pyarrow.Table (python-oracledb's
+DataFrame API). The LLM's markdown preview and the UI rows are encoded
+together from one formatted slice of its head (see result_encoding.py),
+and the result file is written straight from the Arrow buffers.
+
+With a ResultStore, the result stays in the server under a result id and
+the UI receives only its first page and schema; further pages are served,
+sorted and filtered, by /api/results/<id>.
+
+The result file saved for visualize_data is an Arrow IPC file by default
+(see result_files.py); CSV is generated only when it is downloaded.
+
+When an AsyncOraclePool is provided (ORACLE_EXECUTION_MODE=async), both
+filtered and unfiltered queries run through python-oracledb's async API
+and never block the event loop.
 """
 
+import asyncio
+import functools
 import logging
 import uuid
-from typing import Type, List, Optional, Dict, Any
+from typing import Type, List, Optional, Dict, Any, Iterator
 from pydantic import BaseModel, Field
-import pandas as pd
+import pyarrow as pa
 
 from vanna.core.tool import Tool, ToolContext, ToolResult
-from vanna.components import UiComponent, DataFrameComponent, SimpleTextComponent
-from vanna.capabilities.sql_runner.models import RunSqlToolArgs
-from vanna.integrations.local import LocalFileSystem
+from vanna.components import (
+    UiComponent,
+    DataFrameComponent,
+    SimpleTextComponent,
+    NotificationComponent,
+    ComponentType,
+)
 
+from .db_pool import OraclePool, AsyncOraclePool
+from .executor import BlockingExecutor, ORACLE_LANE
 from .rls_service import RowLevelSecurityService
+from .result_cache import CachePlan, ResultCache, query_identity, rls_fingerprint
+from .single_flight import SingleFlight
+from .result_fetch import BoundedFetch, FetchLimits, is_truncated
+from .result_store import ResultStore, column_types
+from .result_files import ARROW_EXTENSION, CSV_EXTENSION, RESULT_FILE_PREFIX, ResultFileSystem
+from .result_encoding import PreviewLimits, encode_result
+from .result_profile import ProfileLimits, profile_table
+from .approx_query import ApproximateAnswers
+from .plan_gate import PlanGate, PlanLimits, PlanVerdict, limit_rows
+from .query_timeout import (
+    CANCELLED_CODES,
+    QueryHandle,
+    QueryTimeout,
+    QueryTimeouts,
+    error_code,
+    is_call_timeout,
+)
 
 logger = logging.getLogger(__name__)
 
+# Rows sent to the UI table (DataFrameComponent displays at most 100)
+UI_MAX_ROWS = 100
+
 
 class SecureSqlArgs(BaseModel):
     """Arguments for the secure SQL tool."""
     sql: str = Field(description="The SQL query to execute")
+    approximate: bool = Field(
+        default=False,
+        description=(
+            "Set to true for exploratory aggregate questions that only need a rough answer "
+            "(\"roughly how many\", \"distribution of\") on very large tables. The query may then "
+            "run on a random sample or with APPROX_COUNT_DISTINCT/APPROX_PERCENTILE, and the "
+            "result is labeled as approximate with error bounds."
+        )
+    )
 
 
 class SecureRunSqlTool(Tool[SecureSqlArgs]):
@@ -45,19 +108,68 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
     - USER/NORMALUSER: Filtered access based on AI_USERS filter columns
     """
     
-    def __init__(self, sql_runner, rls_service: RowLevelSecurityService):
+    def __init__(
+        self,
+        sql_runner,
+        rls_service: RowLevelSecurityService,
+        pool: Optional[OraclePool] = None,
+        async_pool: Optional[AsyncOraclePool] = None,
+        executor: Optional[BlockingExecutor] = None,
+        result_cache: Optional[ResultCache] = None,
+        fetch_limits: Optional[FetchLimits] = None,
+        result_store: Optional[ResultStore] = None,
+        file_system: Optional[ResultFileSystem] = None,
+        file_format: str = "arrow",
+        preview_limits: Optional[PreviewLimits] = None,
+        profile_limits: Optional[ProfileLimits] = None,
+        query_timeouts: Optional[QueryTimeouts] = None,
+        plan_gate: Optional[PlanGate] = None,
+        approximate_answers: Optional[ApproximateAnswers] = None
+    ):
         """
         Initialize the secure SQL tool.
         
         Args:
             sql_runner: The database runner (e.g., OracleRunner) for executing queries
             rls_service: The RLS service for applying security filters
+            pool: Optional shared Oracle connection pool for filtered queries
+            async_pool: Optional async Oracle pool; when set, all queries use
+                the non-blocking execution path
+            executor: Optional shared executor for blocking database calls
+            result_cache: Optional cache of query results keyed by final SQL,
+                binds and RLS fingerprint
+            fetch_limits: Optional row/byte budgets for fetching results
+            result_store: Optional server-side store; when set, the UI gets
+                only the first page and pages through /api/results/<id>
+            file_system: Optional file system for result files (shared with
+                visualize_data)
+            file_format: "arrow" (memory-mappable Arrow IPC file) or "csv"
+            preview_limits: Optional size limits of the LLM's markdown preview
+            profile_limits: Optional size limits of the column profile added
+                for results larger than the preview; None disables profiling
+            query_timeouts: Optional per-role query time limits (defaults
+                apply when omitted)
+            plan_gate: Optional EXPLAIN PLAN cost gate checked before queries
+                are executed
+            approximate_answers: Optional approximate mode for queries run
+                with approximate=true; None runs them exactly
         """
         self.sql_runner = sql_runner
         self.rls_service = rls_service
-        self.file_system = LocalFileSystem()
-        # Cache for user filter values to avoid repeated DB queries in same session
-        self._user_filter_cache: Dict[str, Any] = {}
+        self.pool = pool
+        self.async_pool = async_pool
+        self.executor = executor or BlockingExecutor()
+        self.result_cache = result_cache
+        self.single_flight = SingleFlight("run_sql")
+        self.fetch_limits = fetch_limits or FetchLimits()
+        self.result_store = result_store
+        self.file_system = file_system or ResultFileSystem(executor=self.executor)
+        self.file_format = file_format
+        self.preview_limits = preview_limits or PreviewLimits()
+        self.profile_limits = profile_limits
+        self.query_timeouts = query_timeouts or QueryTimeouts()
+        self.plan_gate = plan_gate
+        self.approximate_answers = approximate_answers
     
     @property
     def name(self) -> str:
@@ -94,7 +206,7 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
     
     def _get_user_filter_values(self, user_id: str) -> Dict[str, Any]:
         """
-        Get user's filter values with caching.
+        Get user's filter values from the RLS service's shared cache.
         
         Args:
             user_id: The user's ID/username
@@ -102,66 +214,342 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
         Returns:
             Dictionary of filter column values
         """
-        if user_id not in self._user_filter_cache:
-            self._user_filter_cache[user_id] = self.rls_service.get_user_filter_values(user_id)
-        return self._user_filter_cache[user_id]
+        return self.rls_service.get_user_filter_values(user_id)
     
-    async def _execute_query(self, sql: str, bind_params: dict = None, context = None):
+    async def _execute_query(self, sql: str, bind_params: dict = None, context = None, timeout: float = None):
         """
-        Execute a SQL query using the sql_runner.
+        Execute a SQL query, fetching Arrow batches within the fetch budgets.
         
         Args:
             sql: The SQL query to execute
             bind_params: Optional bind parameters for the query
-            context: Optional ToolContext to pass to run_sql
+            context: Optional ToolContext (unused; kept for callers)
+            timeout: Optional call timeout in seconds
             
         Returns:
-            Query results (typically a pandas DataFrame)
+            Query results as a pyarrow.Table (see result_fetch.is_truncated)
+        """
+        if self.async_pool is not None:
+            return await self._execute_query_async(sql, bind_params, timeout)
+        
+        # Execute directly with oracledb on a pooled connection (a dedicated
+        # one without a pool); the blocking driver calls run on the oracle lane
+        return await self._fetch_table_cancellable(sql, bind_params, None, timeout)
+    
+    async def _fetch_table_cancellable(
+        self,
+        sql: str,
+        bind_params: dict = None,
+        vpd_user: tuple = None,
+        timeout: float = None
+    ) -> pa.Table:
+        """
+        Run _fetch_table on the oracle lane, interrupting it if the caller is cancelled.
+        
+        A cancelled executor future does not stop its worker thread, so the
+        database call itself is cancelled through a QueryHandle.
+        """
+        handle = QueryHandle()
+        try:
+            return await self.executor.run(
+                ORACLE_LANE, self._fetch_table, sql, bind_params, vpd_user, handle, timeout
+            )
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+    
+    def _fetch_table(
+        self,
+        sql: str,
+        bind_params: dict = None,
+        vpd_user: tuple = None,
+        handle: Optional[QueryHandle] = None,
+        timeout: float = None
+    ) -> pa.Table:
         """
-        # The sql_runner.run() method may not support bind_params directly
-        # We need to handle this based on the runner's capabilities
+        Execute a SQL query with oracledb and fetch it into Arrow (blocking).
+        
+        Batches are sized from the column widths and fetching stops at the
+        row or byte budget, so oversized results are truncated instead of loaded.
         
-        if bind_params:
-            # If we have bind params, we need to execute with them
-            # The OracleRunner typically uses oracledb which supports bind params
-            import oracledb
+        Args:
+            sql: The SQL query to execute
+            bind_params: Optional bind parameters for the query
+            vpd_user: Optional (username, filter_values); the values are set
+                on the session's VPD context for this query and cleared after
+            handle: Optional handle through which the caller cancels the query
+            timeout: Optional call timeout in seconds for each round trip
             
-            try:
-                connection = oracledb.connect(
-                    user=self.sql_runner.user,
-                    password=self.sql_runner.password,
-                    dsn=self.sql_runner.dsn
+        Returns:
+            Query results as a pyarrow.Table
+            
+        Raises:
+            QueryTimeout: If a round trip exceeded the timeout
+        """
+        import oracledb
+        
+        # Strip trailing semicolons (Oracle doesn't want them in programmatic execution)
+        sql = sql.rstrip()
+        if sql.endswith(';'):
+            sql = sql[:-1]
+        
+        connection = None
+        context_set = False
+        interrupted = False
+        try:
+            connection = self._connect()
+            if handle is not None:
+                handle.attach(connection)
+            if timeout:
+                connection.call_timeout = int(timeout * 1000)
+            if vpd_user is not None:
+                context_set = True
+                self.rls_service.apply_session(connection, *vpd_user)
+            fetch = BoundedFetch(self.fetch_limits)
+            table = fetch.fetch(connection, sql, bind_params)
+            
+            if fetch.truncated:
+                logger.warning(
+                    f"SecureRunSqlTool: Result truncated at {table.num_rows} rows "
+                    f"({fetch.bytes_fetched} bytes, {fetch.batches} batches)"
                 )
-                cursor = connection.cursor()
-                cursor.execute(sql, bind_params)
-                
-                # Fetch results
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                rows = cursor.fetchall()
+            return table
                 
-                cursor.close()
+        except oracledb.Error as e:
+            # An interrupted session may still be mid-call; it is not reused
+            if is_call_timeout(e):
+                interrupted = True
+                raise QueryTimeout(timeout)
+            if error_code(e) in CANCELLED_CODES and handle is not None and handle.cancelled:
+                interrupted = True
+                logger.info("SecureRunSqlTool: Query cancelled by the caller")
+                raise RuntimeError("Query cancelled")
+            logger.error(f"Database error executing secure query: {e}")
+            raise RuntimeError(f"Database error: {e}")
+        finally:
+            # Release the connection (returns it to the pool when pooled)
+            if handle is not None:
+                handle.detach()
+            if connection is not None:
+                self._release(connection, context_set, interrupted)
+    
+    def _connect(self):
+        """Get a pooled connection, or a dedicated one without a pool."""
+        import oracledb
+        
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.sql_runner.user,
+            password=self.sql_runner.password,
+            dsn=self.sql_runner.dsn
+        )
+    
+    def export_batches(
+        self,
+        sql: str,
+        bind_params: dict = None,
+        vpd_user: tuple = None,
+        batch_rows: int = 50000
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Re-run a query without fetch budgets, yielding Arrow record batches (blocking).
+        
+        Used by the export endpoint: the cursor stays open on the server and
+        only one batch is held in memory at a time. Closing the generator
+        (e.g. when the client disconnects) closes the cursor and releases
+        the connection.
+        
+        Args:
+            sql: The final (already RLS-filtered) SQL
+            bind_params: Bind parameters for the SQL
+            vpd_user: Optional (username, filter_values) for VPD mode
+            batch_rows: Rows per fetch round trip
+            
+        Yields:
+            pyarrow.RecordBatch objects
+        """
+        sql = sql.rstrip()
+        if sql.endswith(';'):
+            sql = sql[:-1]
+        
+        connection = self._connect()
+        context_set = False
+        try:
+            if vpd_user is not None:
+                context_set = True
+                self.rls_service.apply_session(connection, *vpd_user)
+            batches = connection.fetch_df_batches(sql, bind_params or {}, size=batch_rows)
+            try:
+                for batch in batches:
+                    yield from pa.table(batch).to_batches()
+            finally:
+                # Drops the cursor, ending an abandoned fetch early
+                batches.close()
+        finally:
+            self._release(connection, context_set)
+    
+    def _release(self, connection, context_set: bool, interrupted: bool = False):
+        """Release a connection, clearing the VPD context first if one was set.
+        
+        A pooled session whose context cannot be cleared, or whose call was
+        interrupted (timeout or cancel), is dropped from the pool so another
+        user (or an internal component) never inherits it.
+        """
+        import oracledb
+        
+        if interrupted:
+            if self.pool is not None:
+                self.pool.drop(connection)
+            else:
                 connection.close()
-                
-                # Convert to pandas DataFrame
-                if columns and rows:
-                    return pd.DataFrame(rows, columns=columns)
-                elif columns:
-                    return pd.DataFrame(columns=columns)
-                else:
-                    return pd.DataFrame()
-                    
+            return
+        connection.call_timeout = 0
+        if context_set:
+            try:
+                self.rls_service.clear_session(connection)
             except oracledb.Error as e:
-                logger.error(f"Database error executing secure query: {e}")
-                raise RuntimeError(f"Database error: {e}")
+                logger.error(f"SecureRunSqlTool: Could not clear VPD context, dropping session: {e}")
+                if self.pool is not None:
+                    self.pool.drop(connection)
+                    return
+        connection.close()
+    
+    async def _execute_query_async(self, sql: str, bind_params: dict = None, timeout: float = None) -> pa.Table:
+        """
+        Execute a SQL query on the async Oracle pool.
+        
+        Used for both filtered (bind params) and unfiltered queries. Arrow
+        batches are fetched within the fetch budgets. If the calling task is
+        cancelled, the database call is cancelled as well.
+        
+        Args:
+            sql: The SQL query to execute
+            bind_params: Optional bind parameters for the query
+            timeout: Optional call timeout in seconds for each round trip
+            
+        Returns:
+            Query results as a pyarrow.Table
+            
+        Raises:
+            QueryTimeout: If a round trip exceeded the timeout
+        """
+        import oracledb
+        
+        # Strip trailing semicolons (Oracle doesn't want them in programmatic execution)
+        sql = sql.rstrip()
+        if sql.endswith(';'):
+            sql = sql[:-1]
+        
+        try:
+            table = await self.async_pool.fetch_arrow(sql, bind_params, self.fetch_limits, timeout)
+        except oracledb.Error as e:
+            if is_call_timeout(e):
+                raise QueryTimeout(timeout)
+            logger.error(f"Database error executing async query: {e}")
+            raise RuntimeError(f"Database error: {e}")
+        
+        if is_truncated(table):
+            logger.warning(f"SecureRunSqlTool: Result truncated at {table.num_rows} rows")
+        return table
+    
+    async def _run_query(
+        self,
+        sql: str,
+        bind_params: dict,
+        vpd_user: tuple,
+        context,
+        plan: CachePlan = None,
+        timeout: float = None
+    ):
+        """
+        Execute the final SQL and store the result in the result cache.
+        
+        Args:
+            sql: The SQL to execute (already RLS-filtered)
+            bind_params: Bind parameters for the SQL
+            vpd_user: Optional (username, filter_values) for VPD mode
+            context: ToolContext passed to the runner
+            plan: Optional result cache plan for storing the result
+            timeout: Optional time limit in seconds; enforced per round trip
+                (call_timeout) and for the whole execution
+            
+        Returns:
+            Query results as a pyarrow.Table
+            
+        Raises:
+            QueryTimeout: If the query exceeded the time limit
+        """
+        if vpd_user is not None:
+            run = self._fetch_table_cancellable(sql, None, vpd_user, timeout)
+        else:
+            run = self._execute_query(sql, bind_params, context, timeout)
+        if timeout:
+            try:
+                # On the deadline the query task is cancelled, which cancels the call
+                table = await asyncio.wait_for(run, timeout)
+            except asyncio.TimeoutError:
+                raise QueryTimeout(timeout)
         else:
-            # No bind params, use the standard runner
-            # run_sql requires RunSqlToolArgs and ToolContext, and is async
-            if context is None:
-                raise ValueError("context is required for OracleRunner.run_sql()")
-            
-            sql_args = RunSqlToolArgs(sql=sql)
-            result = await self.sql_runner.run_sql(sql_args, context)
-            return result
+            table = await run
+        if plan is not None:
+            self.result_cache.put(plan, table)
+        return table
+    
+    @property
+    def _page_rows(self) -> int:
+        """Rows sent to the UI with a result."""
+        return self.result_store.page_size if self.result_store is not None else UI_MAX_ROWS
+    
+    def _build_table_component(
+        self,
+        table: pa.Table,
+        rows: list,
+        user,
+        export=None,
+        title: str = "Query Results"
+    ) -> DataFrameComponent:
+        """
+        Build the UI table for a result.
+        
+        With a result store, the result is stored under a new result id and
+        the component carries the first page, the schema and the page URL.
+        Without one, it carries the rows the table displays.
+        
+        Args:
+            table: The query result
+            rows: JSON-ready rows of the first page (from encode_result)
+            user: The User who ran the query (owner of the stored result)
+            export: Optional callable re-running the query for export (see
+                export_batches)
+            title: Table title
+            
+        Returns:
+            DataFrameComponent for the result
+        """
+        if self.result_store is None:
+            return DataFrameComponent.from_records(
+                records=rows,
+                title=title,
+                columns=table.column_names,
+                row_count=table.num_rows
+            )
+        
+        result_id = self.result_store.put(table, user.id, self._is_privileged_user(user), export)
+        page_size = self.result_store.page_size
+        return DataFrameComponent.from_records(
+            records=rows,
+            title=title,
+            columns=table.column_names,
+            column_types=column_types(table.schema),
+            row_count=table.num_rows,
+            page_size=page_size,
+            data={
+                "result_id": result_id,
+                "results_url": f"/api/results/{result_id}",
+                "expires_in": int(self.result_store.ttl),
+            }
+        )
     
     async def execute(self, context: ToolContext, args: SecureSqlArgs) -> ToolResult:
         """
@@ -181,62 +569,181 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
         logger.debug(f"SecureRunSqlTool: Original SQL: {original_sql}")
         
         try:
+            vpd_user = None
+            bind_params = None
+            sql = original_sql
             # Check if user is privileged
             if self._is_privileged_user(user):
                 logger.info(f"SecureRunSqlTool: User '{user.id}' is privileged, no RLS applied")
-                result_df = await self._execute_query(original_sql, None, context)
+                fingerprint = rls_fingerprint(None)
             else:
                 # User is NORMALUSER - apply RLS filtering
                 logger.info(f"SecureRunSqlTool: User '{user.id}' requires RLS filtering")
                 
-                # Get user's filter values
-                filter_values = self._get_user_filter_values(user.id)
+                # Get user's filter values (may query AI_USERS)
+                filter_values = await self.executor.run(
+                    ORACLE_LANE, self._get_user_filter_values, user.id
+                )
+                fingerprint = rls_fingerprint(filter_values or {})
                 
-                if filter_values:
-                    # Apply RLS filters to the query
-                    modified_sql, bind_params = self.rls_service.apply_rls_filters(
+                if filter_values and self.rls_service.vpd_enabled:
+                    # Database-native RLS: the SQL runs unchanged on a session
+                    # carrying the user's context (always the sync pool path)
+                    logger.info(f"SecureRunSqlTool: VPD mode, executing original query for '{user.id}'")
+                    vpd_user = (user.id, filter_values)
+                elif filter_values:
+                    # Apply RLS filters to the query (may query table metadata)
+                    sql, bind_params = await self.executor.run(
+                        ORACLE_LANE,
+                        self.rls_service.apply_rls_filters,
                         original_sql, 
                         filter_values
                     )
                     
-                    logger.info(f"SecureRunSqlTool: RLS applied, modified query: {modified_sql[:200]}...")
-                    result_df = await self._execute_query(modified_sql, bind_params, context)
+                    logger.info(f"SecureRunSqlTool: RLS applied, modified query: {sql[:200]}...")
                 else:
                     # No filter values - execute original query
                     # This could mean the user has NULL values in filter columns
                     logger.warning(f"SecureRunSqlTool: No filter values for user '{user.id}', executing original query")
-                    result_df = await self._execute_query(original_sql, None, context)
+            
+            timeout = self.query_timeouts.for_groups(user.group_memberships)
+            
+            # Approximate mode rewrites only the SAMPLE clause and aggregate
+            # calls, so the RLS predicates already in the SQL are kept
+            approx = None
+            export_sql = sql
+            if args.approximate and self.approximate_answers is not None:
+                approx = await self.executor.run(
+                    ORACLE_LANE, self.approximate_answers.rewrite, sql, self._table_num_rows
+                )
+                sql = approx.sql
+                if approx.applied:
+                    logger.info(f"SecureRunSqlTool: Approximate query for '{user.id}': {sql[:200]}")
+            
+            # Identify the query by its final SQL, binds and the user's RLS
+            # fingerprint (None for statements that are not queries)
+            identity = query_identity(sql, bind_params, fingerprint)
+            
+            # Check the optimizer's estimates before any cache lookup; a
+            # limited query is identified (cached and shared) by its own SQL
+            plan_verdict = None
+            plan_limits = self.plan_gate.limits_for(user.group_memberships) if self.plan_gate is not None else None
+            if identity is not None and plan_limits is not None:
+                plan_verdict = await self._check_plan(sql, bind_params, vpd_user, plan_limits)
+                if plan_verdict is not None and plan_verdict.action == "rejected":
+                    logger.warning(
+                        f"SecureRunSqlTool: Plan check rejected query for '{user.id}': "
+                        f"{'; '.join(plan_verdict.violations)}"
+                    )
+                    return self._plan_rejected_result(user, plan_verdict)
+                if plan_verdict is not None and plan_verdict.action == "limited":
+                    sql = plan_verdict.sql
+                    identity = query_identity(sql, bind_params, fingerprint)
+            
+            plan = self.result_cache.plan(identity) if self.result_cache is not None else None
+            if self.result_cache is None:
+                cache_status = "disabled"
+            else:
+                cache_status = "miss" if plan is not None else "bypass"
+            cache_age = None
+            deduplicated = False
+            cached = self.result_cache.get(plan) if plan is not None else None
+            
+            if cached is not None:
+                table, cache_age = cached
+                cache_status = "hit"
+                logger.info(f"SecureRunSqlTool: Result cache hit for '{user.id}' (age {cache_age}s)")
+            elif identity is not None:
+                # Identical queries already running share that execution
+                # (Arrow tables are immutable, so followers share it as is).
+                # Only callers with the same time limit share a flight, so
+                # nobody inherits another role's deadline
+                table, deduplicated = await self.single_flight.run(
+                    (identity.key, timeout),
+                    lambda: self._run_query(sql, bind_params, vpd_user, context, plan, timeout)
+                )
+                if deduplicated:
+                    logger.info(f"SecureRunSqlTool: Joined an identical in-flight query for '{user.id}'")
+            else:
+                table = await self._run_query(sql, bind_params, vpd_user, context, timeout=timeout)
+                if self.result_cache is not None:
+                    self.result_cache.statement_executed(sql)
+            
+            approx_bounds = []
+            if approx is not None:
+                table, approx_bounds = approx.finish(table)
             
             # Build result
-            row_count = len(result_df) if hasattr(result_df, '__len__') else 0
+            row_count = table.num_rows
+            truncated = is_truncated(table)
+            if plan_verdict is not None and plan_verdict.action == "limited" and row_count >= plan_verdict.row_limit:
+                # Cut by the plan check's FETCH FIRST below the fetch budget
+                truncated = True
             
-            # Generate unique CSV filename
-            filename = f"query_result_{uuid.uuid4().hex[:8]}.csv"
+            # Generate unique result filename (the CSV name is served on demand)
+            basename = f"{RESULT_FILE_PREFIX}{uuid.uuid4().hex[:8]}"
+            csv_filename = basename + CSV_EXTENSION
+            filename = csv_filename if self.file_format == "csv" else basename + ARROW_EXTENSION
+            
+            # Encode the LLM preview and the first UI page together
+            encoded = encode_result(table, self._page_rows, self.preview_limits)
             
             # Create result summary for LLM
             if row_count == 0:
                 result_text = "Query executed successfully. No rows returned."
             else:
                 result_text = f"Query executed successfully. Returned {row_count} row(s)."
-                if row_count <= 10:
-                    result_text += f"\n\nData:\n{result_df.to_string()}"
+            if approx is not None:
+                result_text += f"\n\n{approx.describe(approx_bounds)}"
+            if row_count > 0:
+                if encoded.preview_rows == row_count:
+                    result_text += f"\n\nData:\n{encoded.preview}"
                 else:
-                    result_text += f"\n\nFirst 10 rows:\n{result_df.head(10).to_string()}"
+                    result_text += f"\n\nFirst {encoded.preview_rows} rows:\n{encoded.preview}"
+                    # Summarize the rows the LLM does not see, so it need
+                    # not query again for counts, ranges or distinct values
+                    if self.profile_limits is not None:
+                        profile = profile_table(table, self.profile_limits, truncated)
+                        if profile:
+                            result_text += f"\n\n{profile}"
+            if plan_verdict is not None and plan_verdict.action == "limited":
+                result_text += (
+                    f"\n\nNOTE: The plan check estimated this query would be too large for your role "
+                    f"({'; '.join(plan_verdict.violations)}), so it was run with FETCH FIRST "
+                    f"{plan_verdict.row_limit} ROWS ONLY. Add filters or aggregate to get a complete answer."
+                )
+            if truncated:
+                result_text += (
+                    f"\n\nNOTE: The result was truncated after {row_count} rows because it exceeded "
+                    f"the fetch limit. More rows exist. Refine the query (add filters, aggregate, "
+                    f"or select fewer columns) instead of relying on this partial result."
+                )
             
-            # Save CSV file and create UI components
+            # Save the result file and create UI components
             ui_component = None
+            result_id = None
             if row_count > 0:
                 try:
-                    # Save DataFrame to CSV
-                    csv_content = result_df.to_csv(index=False)
-                    await self.file_system.write_file(filename, csv_content, context, overwrite=True)
+                    if self.file_format == "csv":
+                        # Encoded from the Arrow buffers straight into the file
+                        await self.file_system.write_csv(filename, table, context)
+                    else:
+                        # Continue with the memory-mapped file so the stored
+                        # result does not keep its own heap copy
+                        table = await self.file_system.write_table(filename, table, context)
                     logger.info(f"SecureRunSqlTool: Saved query results to {filename}")
                     
-                    # Create DataFrameComponent for rich table display
-                    dataframe_component = DataFrameComponent.from_records(
-                        records=result_df.to_dict('records'),
-                        title="Query Results"
-                    )
+                    # Create DataFrameComponent for rich table display from the
+                    # encoded first page. Queries (never other statements) can
+                    # be re-run for export; approximate results export exactly
+                    export = None
+                    if identity is not None:
+                        export = functools.partial(
+                            self.export_batches, export_sql if approx is not None else sql, bind_params, vpd_user
+                        )
+                    title = "Query Results (approximate)" if approx is not None and approx.applied else "Query Results"
+                    dataframe_component = self._build_table_component(table, encoded.rows, user, export, title)
+                    result_id = dataframe_component.data.get("result_id")
                     
                     # Create SimpleTextComponent with summary
                     simple_component = SimpleTextComponent(
@@ -249,12 +756,12 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
                         simple_component=simple_component
                     )
                     
-                    # Update result_for_llm with CSV filename and visualization instructions
+                    # Update result_for_llm with the filename and visualization instructions
                     result_text += f"\n\nResults saved to file: {filename}"
                     result_text += f"\n\nIMPORTANT: FOR VISUALIZE_DATA USE FILENAME: {filename}"
                     
                 except Exception as e:
-                    logger.warning(f"SecureRunSqlTool: Failed to save CSV or create UI components: {e}")
+                    logger.warning(f"SecureRunSqlTool: Failed to save result file or create UI components: {e}")
                     # Continue without UI components if there's an error
             
             return ToolResult(
@@ -263,12 +770,32 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
                 ui_component=ui_component,
                 metadata={
                     "row_count": row_count,
+                    "truncated": truncated,
                     "rls_applied": not self._is_privileged_user(user),
                     "user_id": user.id,
-                    "csv_filename": filename if row_count > 0 else None
+                    "result_filename": filename if row_count > 0 else None,
+                    "csv_filename": csv_filename if row_count > 0 else None,
+                    "result_id": result_id,
+                    "result_cache": cache_status,
+                    "result_cache_age_seconds": cache_age,
+                    "deduplicated": deduplicated,
+                    "plan_check": plan_verdict.metadata() if plan_verdict is not None else None,
+                    "approximate": approx.metadata(approx_bounds) if approx is not None else None
                 }
             )
             
+        except QueryTimeout as e:
+            self.query_timeouts.record_timeout()
+            logger.warning(f"SecureRunSqlTool: Query for '{user.id}' timed out after {e.seconds:g}s and was cancelled")
+            return self._timeout_result(user, e.seconds)
+            
+        except asyncio.CancelledError:
+            # Client disconnected or the agent run was aborted; the database
+            # call has been cancelled on the way up
+            self.query_timeouts.record_cancellation()
+            logger.info(f"SecureRunSqlTool: Query for '{user.id}' cancelled")
+            raise
+            
         except Exception as e:
             logger.error(f"SecureRunSqlTool: Error executing query: {e}")
             import traceback
@@ -281,14 +808,193 @@ class SecureRunSqlTool(Tool[SecureSqlArgs]):
                 metadata={"user_id": user.id}
             )
     
+    def _table_num_rows(self, owner: Optional[str], table_name: str) -> Optional[int]:
+        """
+        Get a table's NUM_ROWS statistic for approximate mode (blocking).
+        
+        Returns:
+            The cached or freshly read row count, or None if it is unknown
+            or cannot be read (the query is then not sampled)
+        """
+        import oracledb
+        
+        def load():
+            connection = self._connect()
+            try:
+                return self.approximate_answers.num_rows(connection, owner, table_name)
+            finally:
+                self._release(connection, False)
+        
+        try:
+            return self.approximate_answers.cached_num_rows(owner, table_name, load)
+        except oracledb.Error as e:
+            logger.warning(f"SecureRunSqlTool: Could not read statistics of {table_name}: {e}")
+            return None
+    
+    def _explain(self, sql: str, bind_params: dict = None, vpd_user: tuple = None):
+        """
+        Explain a query on its own session (blocking).
+        
+        Args:
+            sql: The final SQL
+            bind_params: Bind parameters for the SQL
+            vpd_user: Optional (username, filter_values); the plan then
+                includes the VPD policy predicates
+            
+        Returns:
+            PlanSummary of the query
+        """
+        connection = self._connect()
+        context_set = False
+        try:
+            if vpd_user is not None:
+                context_set = True
+                self.rls_service.apply_session(connection, *vpd_user)
+            return self.plan_gate.explain(connection, sql, bind_params)
+        finally:
+            self._release(connection, context_set)
+    
+    def _cached_plan(self, sql: str, bind_params: dict = None, vpd_user: tuple = None):
+        """Get the plan of a query from the plan cache, explaining it on a miss (blocking)."""
+        return self.plan_gate.cached_plan(
+            sql, vpd_user is not None, lambda: self._explain(sql, bind_params, vpd_user)
+        )
+    
+    async def _check_plan(
+        self,
+        sql: str,
+        bind_params: dict,
+        vpd_user: tuple,
+        limits: PlanLimits
+    ) -> Optional[PlanVerdict]:
+        """
+        Check a query's optimizer estimates against the user's limits.
+        
+        In "limit" mode a query whose only problem is the row estimate gets
+        FETCH FIRST (at most one row past the fetch budget, so the result is
+        still marked truncated) and is explained again. If the limited form
+        cannot be explained, the query is rejected rather than run unchecked.
+        
+        Args:
+            sql: The final SQL
+            bind_params: Bind parameters for the SQL
+            vpd_user: Optional (username, filter_values) for VPD mode
+            limits: The user's plan limits
+            
+        Returns:
+            PlanVerdict, or None if the plan could not be obtained (the query
+            then runs unchecked)
+        """
+        import oracledb
+        
+        gate = self.plan_gate
+        try:
+            summary = await self.executor.run(ORACLE_LANE, self._cached_plan, sql, bind_params, vpd_user)
+            violations, rows_only = gate.violations(summary, limits)
+            if not violations:
+                verdict = PlanVerdict("passed", summary, [], sql)
+            elif gate.action == "limit" and rows_only:
+                row_limit = self.fetch_limits.max_rows + 1
+                if limits.max_rows:
+                    row_limit = min(row_limit, limits.max_rows)
+                limited_sql = limit_rows(sql, row_limit)
+                try:
+                    limited = await self.executor.run(
+                        ORACLE_LANE, self._cached_plan, limited_sql, bind_params, vpd_user
+                    )
+                except (oracledb.Error, ValueError) as e:
+                    # The query itself is over its limits; never fail open here
+                    logger.warning(f"SecureRunSqlTool: Limited query could not be explained, rejecting: {e}")
+                    limited = None
+                remaining = gate.violations(limited, limits)[0] if limited is not None else violations
+                if limited is None:
+                    verdict = PlanVerdict("rejected", summary, violations, sql)
+                elif remaining:
+                    verdict = PlanVerdict("rejected", limited, remaining, sql)
+                else:
+                    verdict = PlanVerdict("limited", summary, violations, limited_sql, row_limit)
+            else:
+                verdict = PlanVerdict("rejected", summary, violations, sql)
+        except (oracledb.Error, ValueError) as e:
+            # The gate must not take queries down with it (e.g. no PLAN_TABLE)
+            gate.record("error")
+            logger.warning(f"SecureRunSqlTool: Plan check failed, running query unchecked: {e}")
+            return None
+        gate.record(verdict.action)
+        return verdict
+    
+    def _plan_rejected_result(self, user, verdict: PlanVerdict) -> ToolResult:
+        """
+        Build the result of a query refused by the plan check.
+        
+        The plan summary goes to the LLM so it can see which operations
+        are expensive and rewrite the query.
+        """
+        reasons = "; ".join(verdict.violations)
+        message = (
+            f"Query not executed: the optimizer estimates it is too expensive for your role "
+            f"({reasons}).\n\n{verdict.summary.describe()}\n\n"
+            f"Rewrite the query before running it again: add selective WHERE filters, make sure "
+            f"every joined table has a join condition, avoid full scans of large tables, and "
+            f"aggregate with GROUP BY or limit the rows with FETCH FIRST n ROWS ONLY."
+        )
+        return ToolResult(
+            success=False,
+            result_for_llm=message,
+            ui_component=UiComponent(
+                rich_component=NotificationComponent(
+                    type=ComponentType.NOTIFICATION,
+                    level="warning",
+                    message=f"Query not executed: {reasons}.",
+                ),
+                simple_component=SimpleTextComponent(text=message),
+            ),
+            error=f"Query rejected by the plan check: {reasons}",
+            metadata={
+                "user_id": user.id,
+                "error_type": "plan_rejected",
+                "plan_check": verdict.metadata(),
+            }
+        )
+    
+    def _timeout_result(self, user, seconds: float) -> ToolResult:
+        """
+        Build the result of a query that exceeded its time limit.
+        
+        Tells the LLM why the query was stopped and how to narrow it, so it
+        does not retry the same statement.
+        """
+        message = (
+            f"Query timed out: it ran longer than the {seconds:g} second limit for your role "
+            f"and was cancelled. Do not run the same query again. Narrow it first: add WHERE "
+            f"filters (for example a date range), check that every joined table has a join "
+            f"condition (a missing one produces a Cartesian product), aggregate with GROUP BY "
+            f"instead of returning detail rows, or limit the rows with FETCH FIRST n ROWS ONLY."
+        )
+        return ToolResult(
+            success=False,
+            result_for_llm=message,
+            ui_component=UiComponent(
+                rich_component=NotificationComponent(
+                    type=ComponentType.NOTIFICATION,
+                    level="warning",
+                    message=f"Query cancelled after {seconds:g} seconds (time limit for your role).",
+                ),
+                simple_component=SimpleTextComponent(text=message),
+            ),
+            error=f"Query exceeded the time limit of {seconds:g} seconds",
+            metadata={
+                "user_id": user.id,
+                "error_type": "query_timeout",
+                "timeout_seconds": seconds,
+            }
+        )
+    
     def clear_user_cache(self, user_id: str = None):
         """
-        Clear the user filter cache.
+        Clear the shared user filter cache.
         
         Args:
             user_id: Optional specific user to clear. If None, clears all.
         """
-        if user_id:
-            self._user_filter_cache.pop(user_id, None)
-        else:
-            self._user_filter_cache.clear()
+        self.rls_service.clear_user_cache(user_id or None)
@@ -9,30 +9,68 @@ import asyncio
 import os
 import traceback
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
-from flask import Flask, request, jsonify, send_from_directory, abort
+from flask import Flask, Response, request, jsonify, send_from_directory, abort, stream_with_context
 from flask_cors import CORS
 from ldap3.core.exceptions import LDAPException
 from vanna.servers.flask.app import VannaFlaskServer as BaseVannaFlaskServer
+from vanna.servers.base import ChatRequest
 from vanna.servers.flask.routes import register_chat_routes
+from vanna.core.user import User
 from vanna.core.user.request_context import RequestContext
 
 from .config import config
+from .metrics import collect_metrics
+from .result_files import ARROW_EXTENSION, CSV_EXTENSION, RESULT_FILE_PREFIX, iter_csv, user_directory
+from .result_encoding import dumps
+from .result_export import EXPORT_FORMATS, ExportBusy, ResultExporter
+from .result_store import ResultNotFound, ResultQueryError, ResultStore
 from .templates import get_ldap_login_html
 
+# Seconds between keep-alive comments while a chat step is running
+SSE_HEARTBEAT_SECONDS = 5
+
 
 class VannaFlaskServer(BaseVannaFlaskServer):
     """Custom Flask server with LDAP authentication support.
     
     This server extends the base Vanna Flask server to provide:
     - Custom LDAP login page
+    - SSE chat stream that cancels the running step (and query) when the
+      client disconnects
     - Static asset serving from /assets
-    - Generated file serving from /api/files
-    - Auth test endpoint for LDAP validation
+    - Generated file serving from /api/files (CSV generated on demand from
+      Arrow result files)
+    - Auth test endpoint for LDAP validation (issues signed session tokens)
+    - Logout endpoint clearing the session token cookie
+    - Paginated result endpoint (/api/results/<id>) for stored run_sql results
+      and streaming export of their full query (/api/results/<id>/export)
     - Health check endpoint
+    - Runtime metrics endpoint for admins (connection pool statistics, etc.)
     """
     
+    def __init__(
+        self,
+        agent,
+        config: Optional[Dict[str, Any]] = None,
+        result_store: Optional[ResultStore] = None,
+        result_exporter: Optional[ResultExporter] = None
+    ):
+        """Initialize the server.
+        
+        Args:
+            agent: The agent to serve.
+            config: Optional server configuration.
+            result_store: Optional store of run_sql results served by
+                /api/results.
+            result_exporter: Optional exporter streaming stored results from
+                /api/results/<id>/export.
+        """
+        self.result_store = result_store
+        self.result_exporter = result_exporter
+        super().__init__(agent, config)
+    
     def create_app(self) -> Flask:
         """Create and configure the Flask application.
         
@@ -54,9 +92,14 @@ class VannaFlaskServer(BaseVannaFlaskServer):
         # Override index with custom LDAP login
         app.view_functions['index'] = self._create_custom_index()
         
+        # Override the SSE chat stream so a client disconnect cancels the run
+        app.view_functions['chat_sse'] = self._create_chat_sse()
+        
         # Register additional endpoints
         self._register_auth_endpoint(app)
+        self._register_results_endpoint(app)
         self._register_health_endpoint(app)
+        self._register_metrics_endpoint(app)
         
         return app
     
@@ -90,27 +133,63 @@ class VannaFlaskServer(BaseVannaFlaskServer):
                     pass
                 abort(404)
         
+        def find_generated_file(cwd: Path, filename: str) -> Optional[Path]:
+            """Find a generated file in the working directory or one level below."""
+            filepath = cwd / filename
+            if filepath.exists() and filepath.is_file():
+                return filepath
+            for subdir in cwd.iterdir():
+                if subdir.is_dir():
+                    filepath = subdir / filename
+                    if filepath.exists() and filepath.is_file():
+                        return filepath
+            return None
+        
+        def find_result_file(cwd: Path, filename: str, user: User) -> Optional[Path]:
+            """Find a run_sql result file in the user's own folder (any folder for admins/superusers)."""
+            if self._is_privileged(user):
+                return find_generated_file(cwd, filename)
+            filepath = user_directory(cwd, user.id) / filename
+            if filepath.is_file():
+                return filepath
+            return None
+        
         @app.route("/api/files/<filename>")
         def serve_file(filename: str):
-            """Serve generated files (images, CSVs) from the working directory."""
+            """Serve generated files (images, CSVs, Arrow results) from the working directory.
+            
+            run_sql result files (query_result_*) are served only to an
+            authenticated user whose folder holds them. A CSV that was never
+            written is streamed on demand from the Arrow result file of the
+            same name.
+            """
             cwd = Path(os.getcwd())
             
-            allowed_extensions = {'.png', '.jpg', '.jpeg', '.svg', '.csv', '.json'}
-            _, ext = os.path.splitext(filename)
+            allowed_extensions = {'.png', '.jpg', '.jpeg', '.svg', '.csv', '.json', ARROW_EXTENSION}
+            stem, ext = os.path.splitext(filename)
             if ext.lower() not in allowed_extensions:
                 abort(404)
             
-            # Check root directory
-            filepath = cwd / filename
-            if filepath.exists() and filepath.is_file():
-                return send_from_directory(str(cwd), filename)
+            if stem.startswith(RESULT_FILE_PREFIX) and ext.lower() in (ARROW_EXTENSION, CSV_EXTENSION):
+                user, error = self._authenticate_request()
+                if error is not None:
+                    return error
+                find_file = lambda name: find_result_file(cwd, name, user)
+            else:
+                find_file = lambda name: find_generated_file(cwd, name)
             
-            # Check subdirectories (one level deep)
-            for subdir in cwd.iterdir():
-                if subdir.is_dir():
-                    filepath = subdir / filename
-                    if filepath.exists() and filepath.is_file():
-                        return send_from_directory(str(subdir), filename)
+            filepath = find_file(filename)
+            if filepath is not None:
+                return send_from_directory(str(filepath.parent), filepath.name)
+            
+            if ext.lower() == CSV_EXTENSION:
+                arrow_path = find_file(stem + ARROW_EXTENSION)
+                if arrow_path is not None:
+                    return Response(
+                        stream_with_context(iter_csv(arrow_path)),
+                        mimetype="text/csv",
+                        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+                    )
             
             print(f"File not found: {filename} in {cwd} or subdirectories")
             abort(404)
@@ -140,18 +219,110 @@ class VannaFlaskServer(BaseVannaFlaskServer):
             )
         return custom_index
     
+    def _create_chat_sse(self):
+        """Create the SSE chat view function.
+        
+        Same stream as the base route, but each agent step runs as a task
+        and a keep-alive comment is written every SSE_HEARTBEAT_SECONDS while
+        it is pending. Writing to a disconnected client fails, the server
+        closes the stream, and the pending step is cancelled, which cancels
+        a running run_sql query on the database.
+        
+        Returns:
+            View function for /api/vanna/v2/chat_sse.
+        """
+        chat_handler = self.chat_handler
+        
+        def chat_sse():
+            try:
+                data = request.get_json()
+                if not data:
+                    return jsonify({"error": "JSON body required"}), 400
+                data["request_context"] = RequestContext(
+                    cookies=dict(request.cookies),
+                    headers=dict(request.headers),
+                    remote_addr=request.remote_addr,
+                    query_params=dict(request.args),
+                )
+                chat_request = ChatRequest(**data)
+            except Exception as e:
+                traceback.print_exc()
+                return jsonify({"error": f"Invalid request: {str(e)}"}), 400
+            
+            def generate():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                stream = chat_handler.handle_stream(chat_request)
+                
+                async def next_chunk():
+                    return await stream.__anext__()
+                
+                step = None
+                try:
+                    while True:
+                        step = loop.create_task(next_chunk())
+                        while not step.done():
+                            loop.run_until_complete(asyncio.wait({step}, timeout=SSE_HEARTBEAT_SECONDS))
+                            if not step.done():
+                                # SSE comment, ignored by clients
+                                yield ": keep-alive\n\n"
+                        try:
+                            chunk = step.result()
+                        except StopAsyncIteration:
+                            yield "data: [DONE]\n\n"
+                            return
+                        yield f"data: {chunk.model_dump_json()}\n\n"
+                finally:
+                    if step is not None and not step.done():
+                        print("Chat client disconnected, cancelling the running step")
+                        step.cancel()
+                        try:
+                            loop.run_until_complete(step)
+                        except (asyncio.CancelledError, Exception):
+                            pass
+                    try:
+                        loop.run_until_complete(stream.aclose())
+                    except Exception:
+                        pass
+                    loop.close()
+            
+            return Response(
+                generate(),
+                mimetype="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no",
+                }
+            )
+        return chat_sse
+    
     def _register_auth_endpoint(self, app: Flask) -> None:
-        """Register the authentication test endpoint.
+        """Register the login (authentication test) and logout endpoints.
+        
+        A successful login issues a signed session token, returned in the
+        response body and set as an HttpOnly cookie, so later requests are
+        authenticated without contacting LDAP until the token expires.
         
         Args:
             app: Flask application instance.
         """
+        session_cookie = config.session.cookie_name
+        
         @app.route("/api/vanna/v2/auth_test", methods=["POST"])
         def auth_test():
-            """Test LDAP authentication and return user info."""
+            """Test LDAP authentication, return user info and issue a session token."""
+            # Always validate the submitted credentials, never an existing
+            # session: drop the token cookie and any non-Basic Authorization
+            # header (a Bearer token would otherwise renew itself without LDAP)
+            cookies = {k: v for k, v in request.cookies.items() if k != session_cookie}
+            headers = {
+                k: v for k, v in request.headers.items()
+                if k.lower() != 'authorization' or v.startswith('Basic ')
+            }
             request_context = RequestContext(
-                cookies=dict(request.cookies),
-                headers=dict(request.headers),
+                cookies=cookies,
+                headers=headers,
                 remote_addr=request.remote_addr,
                 query_params=dict(request.args),
             )
@@ -168,13 +339,26 @@ class VannaFlaskServer(BaseVannaFlaskServer):
                         "error": "Invalid username or password. Please check your credentials and try again."
                     }), 401
                 
-                return jsonify({
+                token = self.agent.user_resolver.issue_session_token(user)
+                response = jsonify({
                     "success": True,
                     "user": user.id,
                     "email": user.email,
                     "groups": user.group_memberships,
-                    "is_admin": 'admin' in user.group_memberships
+                    "is_admin": 'admin' in user.group_memberships,
+                    "session_token": token,
+                    "expires_in": int(config.session.token_ttl) if token else None
                 })
+                if token:
+                    response.set_cookie(
+                        session_cookie,
+                        token,
+                        max_age=int(config.session.token_ttl),
+                        httponly=True,
+                        samesite="Lax",
+                        secure=request.is_secure
+                    )
+                return response
             except LDAPException as e:
                 print(f"LDAP error in auth_test: {e}")
                 return jsonify({
@@ -186,6 +370,148 @@ class VannaFlaskServer(BaseVannaFlaskServer):
                 return jsonify({"error": f"Authentication failed: {e}"}), 401
             finally:
                 loop.close()
+        
+        @app.route("/api/vanna/v2/logout", methods=["POST"])
+        def logout():
+            """Clear the HttpOnly session token cookie."""
+            response = jsonify({"success": True})
+            response.delete_cookie(session_cookie)
+            return response
+    
+    def _resolve_request_user(self) -> User:
+        """Resolve the user of the current request (session token, cookies or Basic auth).
+        
+        Returns:
+            The resolved user (the guest user when unauthenticated).
+        """
+        request_context = RequestContext(
+            cookies=dict(request.cookies),
+            headers=dict(request.headers),
+            remote_addr=request.remote_addr,
+            query_params=dict(request.args),
+        )
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(
+                self.agent.user_resolver.resolve_user(request_context)
+            )
+        finally:
+            loop.close()
+    
+    def _authenticate_request(self) -> Tuple[Optional[User], Any]:
+        """Resolve the user of a request that needs an authenticated user.
+        
+        Returns:
+            Tuple of (user, None), or (None, error response) when the request
+            is not authenticated.
+        """
+        try:
+            user = self._resolve_request_user()
+        except LDAPException as e:
+            print(f"LDAP error resolving request user: {e}")
+            return None, (jsonify({"error": "Unable to connect to authentication server."}), 401)
+        except RuntimeError as e:
+            # Wrong Basic or cookie credentials
+            print(f"Authentication failed resolving request user: {e}")
+            return None, (jsonify({"error": "Authentication required"}), 401)
+        if user.id == config.ldap.guest_username:
+            return None, (jsonify({"error": "Authentication required"}), 401)
+        return user, None
+    
+    @staticmethod
+    def _is_privileged(user: User) -> bool:
+        """Check whether a user currently has unfiltered (admin/superuser) access."""
+        return bool({'admin', 'superuser'} & {g.lower() for g in user.group_memberships or []})
+    
+    def _register_results_endpoint(self, app: Flask) -> None:
+        """Register the paginated result and export endpoints.
+        
+        GET /api/results/<id>?offset=&limit=&sort=&filter= returns one page
+        of a stored run_sql result, sorted and filtered in the server.
+        GET /api/results/<id>/export?format=csv|parquet|ndjson&gzip= re-runs
+        its query and streams the complete result. Only the user who ran the
+        query can read either.
+        
+        Args:
+            app: Flask application instance.
+        """
+        @app.route("/api/results/<result_id>")
+        def result_page(result_id: str):
+            """Serve one page of a stored query result."""
+            if self.result_store is None:
+                abort(404)
+            
+            user, error = self._authenticate_request()
+            if error is not None:
+                return error
+            
+            try:
+                offset = int(request.args.get("offset", 0))
+                limit = int(request.args.get("limit", self.result_store.page_size))
+            except ValueError:
+                return jsonify({"error": "offset and limit must be integers"}), 400
+            
+            privileged = self._is_privileged(user)
+            try:
+                page = self.result_store.page(
+                    result_id,
+                    user.id,
+                    privileged,
+                    offset=offset,
+                    limit=limit,
+                    sort=request.args.get("sort"),
+                    filter=request.args.get("filter")
+                )
+            except ResultNotFound:
+                return jsonify({"error": "Result not found or expired"}), 404
+            except ResultQueryError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            # Rows are already JSON-ready (see result_encoding.json_rows)
+            return app.response_class(dumps(page), mimetype="application/json")
+        
+        @app.route("/api/results/<result_id>/export")
+        def result_export(result_id: str):
+            """Stream the complete result of a stored query as a download."""
+            if self.result_store is None or self.result_exporter is None:
+                abort(404)
+            
+            user, error = self._authenticate_request()
+            if error is not None:
+                return error
+            
+            fmt = request.args.get("format", "csv").lower()
+            if fmt not in EXPORT_FORMATS:
+                return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+            # Parquet is already compressed; gzip only pays off for text formats
+            gzip = request.args.get("gzip", "false" if fmt == "parquet" else "true").lower() in ("1", "true", "yes")
+            
+            try:
+                stored = self.result_store.get(result_id, user.id, self._is_privileged(user))
+            except ResultNotFound:
+                return jsonify({"error": "Result not found or expired"}), 404
+            if stored.export is None:
+                return jsonify({"error": "This result cannot be exported"}), 400
+            
+            try:
+                chunks = self.result_exporter.stream(stored.export, fmt, gzip)
+            except ExportBusy:
+                return jsonify({"error": "Too many exports in progress, please retry shortly"}), 429
+            
+            mimetype, extension = EXPORT_FORMATS[fmt]
+            filename = f"query_result_{result_id[:8]}{extension}"
+            if gzip:
+                mimetype, filename = "application/gzip", filename + ".gz"
+            # The exporter is passed as is (not stream_with_context) so the
+            # WSGI server's close() on disconnect reaches the cursor
+            return Response(
+                chunks,
+                mimetype=mimetype,
+                headers={
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                    "X-Accel-Buffering": "no",
+                }
+            )
     
     def _register_health_endpoint(self, app: Flask) -> None:
         """Register the health check endpoint.
@@ -196,3 +522,18 @@ class VannaFlaskServer(BaseVannaFlaskServer):
         @app.route("/health")
         def health_check() -> Dict[str, str]:
             return {"status": "healthy", "service": "vanna"}
+    
+    def _register_metrics_endpoint(self, app: Flask) -> None:
+        """Register the runtime metrics endpoint (admins only).
+        
+        Args:
+            app: Flask application instance.
+        """
+        @app.route("/api/metrics")
+        def metrics():
+            user, error = self._authenticate_request()
+            if error is not None:
+                return error
+            if 'admin' not in {g.lower() for g in user.group_memberships or []}:
+                return jsonify({"error": "Admin access required"}), 403
+            return collect_metrics()
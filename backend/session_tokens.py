@@ -0,0 +1,121 @@
+"""
+Signed Session Tokens for Database Chat Application.
+
+After a successful LDAP login the server issues a compact, expiring token
+signed with HMAC-SHA256 using a server secret. The token carries the user id,
+email and groups, so HybridUserResolver can authenticate later requests with
+a constant-time signature check and no LDAP or database round trip.
+
+Token format: base64url(JSON payload) + "." + base64url(HMAC-SHA256 signature)
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+from vanna.core.user import User
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    padding = "=" * (-len(data) % 4)
+    return base64.urlsafe_b64decode(data + padding)
+
+
+class SessionTokenSigner:
+    """Issues and verifies HMAC-signed, expiring session tokens."""
+
+    def __init__(self, secret: str, ttl: float):
+        """
+        Initialize the signer.
+
+        Args:
+            secret: Server secret used as the HMAC key
+            ttl: Token lifetime in seconds
+        """
+        self._key = secret.encode("utf-8")
+        self.ttl = ttl
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._key, body.encode("ascii"), hashlib.sha256).digest())
+
+    def _signature_matches(self, body: str, signature: str) -> bool:
+        # Tokens come straight from requests: non-ASCII text is a bad
+        # signature, not an error
+        try:
+            return hmac.compare_digest(self._sign(body).encode("ascii"), signature.encode("ascii"))
+        except (UnicodeError, ValueError):
+            return False
+
+    def issue(self, user: User) -> str:
+        """
+        Issue a signed token for an authenticated user.
+
+        Args:
+            user: The authenticated user
+
+        Returns:
+            Signed session token string
+        """
+        now = int(time.time())
+        payload = {
+            "sub": user.id,
+            "email": user.email,
+            "groups": list(user.group_memberships or []),
+            "iat": now,
+            "exp": now + int(self.ttl),
+        }
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return f"{body}.{self._sign(body)}"
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verify a token's signature.
+
+        The signature is compared in constant time. Expiry is not checked
+        here so callers can tell an expired token from a forged one; use
+        is_expired() on the returned payload.
+
+        Args:
+            token: The session token
+
+        Returns:
+            The token payload if the signature is valid, otherwise None
+        """
+        try:
+            body, signature = token.split(".", 1)
+        except (AttributeError, ValueError):
+            return None
+
+        if not self._signature_matches(body, signature):
+            return None
+
+        try:
+            payload = json.loads(_b64decode(body))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+        if not isinstance(payload, dict) or "sub" not in payload or "exp" not in payload:
+            return None
+        return payload
+
+    @staticmethod
+    def is_expired(payload: Dict[str, Any]) -> bool:
+        """Check if a verified token payload has expired."""
+        return time.time() >= payload.get("exp", 0)
+
+    @staticmethod
+    def to_user(payload: Dict[str, Any]) -> User:
+        """Build a User from a verified token payload."""
+        return User(
+            id=payload["sub"],
+            email=payload.get("email"),
+            username=payload["sub"],
+            group_memberships=payload.get("groups") or ['user']
+        )
@@ -0,0 +1,118 @@
+"""
+Single-Flight Execution for Database Chat Application.
+
+When several identical calls are in flight at the same time, only the first
+(the leader) runs; the others (followers) await the leader's result instead
+of repeating the work. Used by run_sql so that N users loading the same
+dashboard open one Oracle cursor, not N.
+
+Each Flask request runs its own event loop, so the registry is guarded by
+a thread lock and results are published through concurrent.futures.Future,
+which any loop can await.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _LeaderCancelled(Exception):
+    """The leader was cancelled; followers retry instead of failing."""
+
+
+class SingleFlight:
+    """
+    Registry of in-flight calls keyed by an identity.
+
+    A leader that fails passes its exception to its followers. A leader that
+    is cancelled does not; its followers start over and one of them becomes
+    the new leader.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """
+        Initialize the registry.
+
+        Args:
+            name: Name used in statistics and log messages
+        """
+        self.name = name
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._followers = 0
+        self._shared_failures = 0
+        self._leader_cancellations = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run call() unless an identical call is already in flight.
+
+        Args:
+            key: Identity of the call; calls with equal keys are deduplicated
+            call: Coroutine function producing the result
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result came
+            from another caller's execution
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = concurrent.futures.Future()
+                    self._leaders += 1
+                else:
+                    self._followers += 1
+
+            if not leader:
+                try:
+                    # shield: a cancelled follower must not cancel the shared future
+                    return await asyncio.shield(asyncio.wrap_future(future)), True
+                except _LeaderCancelled:
+                    continue
+                except Exception:
+                    with self._lock:
+                        self._shared_failures += 1
+                    raise
+
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._leader_cancellations += 1
+                future.set_exception(_LeaderCancelled())
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result, False
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get deduplication statistics for monitoring.
+
+        Returns:
+            Dictionary with in-flight count, executions (leaders),
+            deduplicated calls (followers) and shared failures
+        """
+        with self._lock:
+            total = self._leaders + self._followers
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._leaders,
+                "deduplicated": self._followers,
+                "dedup_rate": round(self._followers / total, 4) if total else 0.0,
+                "shared_failures": self._shared_failures,
+                "leader_cancellations": self._leader_cancellations,
+            }
@@ -0,0 +1,177 @@
+"""
+SQL Version Report Tool for Database Chat Application.
+
+This module provides a custom tool that allows admin users to check how well
+row-level security statements share cursors. It reports V$SQLAREA version
+counts per statement: with deterministic RLS bind names every user of a
+query shape should hit the same parent cursor, so a high version count
+points at statements that still spawn child cursors (see V$SQL_SHARED_CURSOR
+for the reason).
+
+Requires SELECT on V_$SQLAREA (e.g. via SELECT_CATALOG_ROLE).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Type
+
+import oracledb
+from pydantic import BaseModel, Field
+from vanna.core.tool import Tool, ToolContext, ToolResult
+
+from .db_pool import OraclePool
+from .executor import BlockingExecutor, ORACLE_LANE
+
+logger = logging.getLogger(__name__)
+
+
+class SqlVersionReportArgs(BaseModel):
+    """Arguments for the SQL version report tool."""
+    rls_only: bool = Field(
+        default=True,
+        description="If true, only report statements rewritten by row-level security (containing :rls_ binds)."
+    )
+    min_versions: int = Field(
+        default=1,
+        ge=1,
+        description="Only report statements with at least this many child cursors."
+    )
+    limit: int = Field(
+        default=20,
+        ge=1,
+        le=200,
+        description="Maximum number of statements to report, highest version count first."
+    )
+
+
+class SqlVersionReportTool(Tool[SqlVersionReportArgs]):
+    """Tool for reporting shared-cursor version counts from V$SQLAREA."""
+
+    def __init__(
+        self,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        executor: Optional[BlockingExecutor] = None
+    ):
+        """
+        Initialize the report tool.
+
+        Args:
+            oracle_config: Oracle database configuration
+            pool: Optional shared Oracle connection pool
+            executor: Optional shared executor for blocking database calls
+        """
+        super().__init__()
+        self.oracle_config = oracle_config
+        self.pool = pool
+        self.executor = executor or BlockingExecutor()
+
+    @property
+    def name(self) -> str:
+        return "sql_version_report"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Admin only. Report Oracle shared cursor version counts (V$SQLAREA) per SQL statement "
+            "for the application schema, to verify that row-level security queries share one cursor "
+            "per query shape across users."
+        )
+
+    def get_args_schema(self) -> Type[SqlVersionReportArgs]:
+        return SqlVersionReportArgs
+
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+
+    def _fetch_report(self, rls_only: bool, min_versions: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Query V$SQLAREA for statements parsed by the application schema.
+
+        Args:
+            rls_only: Restrict to statements containing :rls_ binds
+            min_versions: Minimum VERSION_COUNT to report
+            limit: Maximum number of rows
+
+        Returns:
+            List of dictionaries, highest version count first
+        """
+        sql = (
+            "SELECT SQL_ID, VERSION_COUNT, LOADED_VERSIONS, EXECUTIONS, PARSE_CALLS, "
+            "SUBSTR(SQL_TEXT, 1, 200) "
+            "FROM V$SQLAREA "
+            "WHERE PARSING_SCHEMA_NAME = SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') "
+            "AND VERSION_COUNT >= :min_versions "
+        )
+        binds: Dict[str, Any] = {"min_versions": min_versions, "row_limit": limit}
+        if rls_only:
+            sql += "AND SQL_TEXT LIKE '%:rls\\_%' ESCAPE '\\' "
+        sql += "ORDER BY VERSION_COUNT DESC, EXECUTIONS DESC FETCH FIRST :row_limit ROWS ONLY"
+
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, binds)
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        return [
+            {
+                "sql_id": sql_id,
+                "version_count": version_count,
+                "loaded_versions": loaded_versions,
+                "executions": executions,
+                "parse_calls": parse_calls,
+                "sql_text": sql_text,
+            }
+            for sql_id, version_count, loaded_versions, executions, parse_calls, sql_text in rows
+        ]
+
+    async def execute(self, context: ToolContext, args: SqlVersionReportArgs) -> ToolResult:
+        """Execute the version count report."""
+        user = context.user
+        user_groups = {g.lower() for g in (user.group_memberships if user else None) or []}
+        if 'admin' not in user_groups:
+            return ToolResult(
+                success=False,
+                result_for_llm="Error: Only admin users can view the SQL version report."
+            )
+
+        try:
+            report = await self.executor.run(
+                ORACLE_LANE, self._fetch_report, args.rls_only, args.min_versions, args.limit
+            )
+        except oracledb.Error as e:
+            logger.error(f"Error in SqlVersionReportTool: {e}")
+            return ToolResult(
+                success=False,
+                result_for_llm=f"Error reading V$SQLAREA (SELECT_CATALOG_ROLE may be required): {str(e)}"
+            )
+
+        if not report:
+            return ToolResult(
+                success=True,
+                result_for_llm="No matching statements in the shared pool.",
+                metadata={"statements": []}
+            )
+
+        lines = [f"Top {len(report)} statements by version count:"]
+        for row in report:
+            lines.append(
+                f"- {row['sql_id']}: {row['version_count']} versions "
+                f"({row['loaded_versions']} loaded), {row['executions']} executions, "
+                f"{row['parse_calls']} parse calls: {row['sql_text']}"
+            )
+        return ToolResult(
+            success=True,
+            result_for_llm="\n".join(lines),
+            metadata={"statements": report}
+        )
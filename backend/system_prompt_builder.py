@@ -17,6 +17,7 @@ from typing import List, Dict, Any, Optional
 from vanna.core.system_prompt import SystemPromptBuilder, DefaultSystemPromptBuilder
 from vanna.core.user import User
 
+from .executor import BlockingExecutor, ORACLE_LANE
 from .rls_service import RowLevelSecurityService
 
 logger = logging.getLogger(__name__)
@@ -37,7 +38,8 @@ class UserAwareSystemPromptBuilder(SystemPromptBuilder):
         rls_service: RowLevelSecurityService,
         company_name: str = "Database Chat",
         include_rls_values: bool = True,
-        schema_summary: str = None
+        schema_summary: str = None,
+        executor: Optional[BlockingExecutor] = None
     ):
         """
         Initialize the user-aware system prompt builder.
@@ -47,21 +49,18 @@ class UserAwareSystemPromptBuilder(SystemPromptBuilder):
             company_name: Company/application name for the prompt
             include_rls_values: Whether to include RLS filter values in prompt
             schema_summary: Pre-generated schema summary to include in prompts
+            executor: Optional shared executor for blocking filter-value lookups
         """
         self.rls_service = rls_service
         self.company_name = company_name
         self.include_rls_values = include_rls_values
         self.schema_summary = schema_summary
+        self.executor = executor or BlockingExecutor()
         self._default_builder = DefaultSystemPromptBuilder()
-        
-        # Cache for user filter values
-        self._user_filter_cache: Dict[str, Dict[str, Any]] = {}
     
     def _get_user_filter_values(self, username: str) -> Dict[str, Any]:
-        """Get user's filter values with caching."""
-        if username not in self._user_filter_cache:
-            self._user_filter_cache[username] = self.rls_service.get_user_filter_values(username)
-        return self._user_filter_cache[username]
+        """Get user's filter values from the RLS service's shared cache."""
+        return self.rls_service.get_user_filter_values(username)
     
     def _is_privileged_user(self, user: User) -> bool:
         """Check if user has privileged access (admin or superuser)."""
@@ -104,8 +103,13 @@ class UserAwareSystemPromptBuilder(SystemPromptBuilder):
         if base_prompt is None:
             base_prompt = ""
         
-        # Build user context section
-        user_context = self._build_user_context(user)
+        # Build user context section (filter values may query AI_USERS)
+        filter_values = None
+        if self.include_rls_values:
+            filter_values = await self.executor.run(
+                ORACLE_LANE, self._get_user_filter_values, user.id
+            )
+        user_context = self._build_user_context(user, filter_values)
         
         # Build schema context if available
         schema_context = ""
@@ -266,7 +270,7 @@ Remember: The goal is to enhance understanding through visual representation whe
         logger.debug(f"SystemPrompt: Built prompt for user '{user.id}' with context")
         return full_prompt
     
-    def _build_user_context(self, user: User) -> str:
+    def _build_user_context(self, user: User, filter_values: Optional[Dict[str, Any]] = None) -> str:
         """Build the user context section of the prompt."""
         lines = []
         
@@ -297,7 +301,8 @@ Remember: The goal is to enhance understanding through visual representation whe
         
         # Include RLS filter values if enabled
         if self.include_rls_values:
-            filter_values = self._get_user_filter_values(user.id)
+            if filter_values is None:
+                filter_values = self._get_user_filter_values(user.id)
             if filter_values:
                 lines.append("")
                 lines.append("**User Identity Columns (use these to filter 'my data' queries):**")
@@ -310,8 +315,5 @@ Remember: The goal is to enhance understanding through visual representation whe
         return "\n".join(lines)
     
     def clear_cache(self, username: str = None):
-        """Clear the user filter cache."""
-        if username:
-            self._user_filter_cache.pop(username, None)
-        else:
-            self._user_filter_cache.clear()
+        """Clear the shared user filter cache."""
+        self.rls_service.clear_user_cache(username or None)
@@ -0,0 +1,403 @@
+"""
+In-Memory AI_USERS Directory for Database Chat Application.
+
+Authentication needs each user's roles and row-level security needs each
+user's filter values; both come from the AI_USERS table. Instead of querying
+AI_USERS per user with UPPER(USERNAME) = UPPER(:username) (which cannot use
+a plain index), the directory bulk-loads the whole table once at startup
+into a dictionary keyed by upper-cased username and serves both from memory.
+
+The directory is kept current by:
+- Incremental refresh on a schedule: only rows whose ORA_ROWSCN is newer
+  than the last load are fetched, plus a cheap USERNAME scan to drop
+  deleted users.
+- Optional Oracle Continuous Query Notification (CQN): a change on AI_USERS
+  triggers an immediate incremental refresh. CQN needs python-oracledb thick
+  mode and the CHANGE NOTIFICATION privilege; if it is unavailable the
+  directory falls back to the schedule.
+
+Usernames that are not in AI_USERS are remembered for a short TTL, so
+repeated requests from an unknown user do not query the table each time.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import oracledb
+
+from .cache import TTLCache
+from .db_pool import OraclePool
+
+logger = logging.getLogger(__name__)
+
+# Standard columns in AI_USERS that are NOT filter columns
+STANDARD_COLUMNS = {'USERNAME', 'IS_ADMIN', 'IS_SUPERUSER', 'IS_NORMALUSER'}
+
+
+def roles_from_flags(is_admin: Any, is_superuser: Any, is_normaluser: Any) -> List[str]:
+    """
+    Map AI_USERS role flags to group names.
+
+    Returns:
+        List containing 'admin', 'superuser' and/or 'user'; 'user' is the
+        fallback when no flag is set
+    """
+    groups = []
+    if is_admin == 1:
+        groups.append('admin')
+    if is_superuser == 1:
+        groups.append('superuser')
+    if is_normaluser == 1:
+        groups.append('user')
+    if not groups:
+        groups.append('user')
+    return groups
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """One AI_USERS row: the user's groups and non-NULL filter column values."""
+    username: str
+    groups: Tuple[str, ...]
+    filter_values: Dict[str, Any] = field(default_factory=dict)
+
+
+class UserDirectory:
+    """
+    In-memory copy of AI_USERS shared by the user resolver and the RLS service.
+
+    Lookups never touch the database once the directory is loaded, except
+    for usernames that are not in memory: those are fetched individually so
+    users added since the last refresh can log in immediately. Names the
+    lookup did not find are cached for miss_ttl seconds; the cache is cleared
+    whenever AI_USERS rows are loaded or a change notification arrives.
+    """
+
+    def __init__(
+        self,
+        oracle_config,
+        pool: Optional[OraclePool] = None,
+        refresh_interval: float = 60.0,
+        use_cqn: bool = False,
+        miss_ttl: float = 10.0,
+        miss_cache_size: int = 10000
+    ):
+        """
+        Initialize the directory.
+
+        Args:
+            oracle_config: Oracle database configuration with user, password, dsn
+            pool: Optional shared Oracle connection pool
+            refresh_interval: Seconds between incremental refreshes; 0 disables
+                the background refresh thread
+            use_cqn: Register a Continuous Query Notification on AI_USERS
+            miss_ttl: Seconds an unknown username is remembered; 0 disables
+            miss_cache_size: Maximum number of unknown usernames remembered
+        """
+        self.oracle_config = oracle_config
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self.use_cqn = use_cqn
+
+        self._users: Dict[str, UserRecord] = {}
+        self._filter_columns: List[str] = []
+        self._last_scn: int = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._unknown_users = TTLCache(
+            max_size=miss_cache_size,
+            ttl=miss_ttl,
+            name="user_directory_misses"
+        )
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cqn_connection = None
+        self._subscription = None
+
+        self._full_loads = 0
+        self._incremental_refreshes = 0
+        self._rows_refreshed = 0
+        self._point_lookups = 0
+        self._notifications = 0
+        self._last_refresh_ms = 0.0
+        self._last_refresh_at: Optional[float] = None
+
+    def _get_connection(self) -> oracledb.Connection:
+        """Get a connection from the shared pool, or a new one if no pool is set."""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return oracledb.connect(
+            user=self.oracle_config.user,
+            password=self.oracle_config.password,
+            dsn=self.oracle_config.dsn
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the initial bulk load has completed."""
+        return self._loaded
+
+    @property
+    def filter_columns(self) -> List[str]:
+        """Filter columns of AI_USERS (every non-standard column), in column order."""
+        with self._lock:
+            return list(self._filter_columns)
+
+    def _parse_rows(self, columns: List[str], rows: List[tuple]) -> Tuple[Dict[str, UserRecord], int]:
+        """Build user records from AI_USERS rows selected with a trailing ORA_ROWSCN."""
+        index = {name: i for i, name in enumerate(columns)}
+        filter_columns = [c for c in columns[:-1] if c not in STANDARD_COLUMNS]
+        records = {}
+        max_scn = 0
+        for row in rows:
+            username = row[index['USERNAME']]
+            if username is None:
+                continue
+            records[username.upper()] = UserRecord(
+                username=username,
+                groups=tuple(roles_from_flags(
+                    row[index['IS_ADMIN']],
+                    row[index['IS_SUPERUSER']],
+                    row[index['IS_NORMALUSER']]
+                )),
+                filter_values={
+                    c: row[index[c]] for c in filter_columns if row[index[c]] is not None
+                }
+            )
+            max_scn = max(max_scn, row[-1] or 0)
+        return records, max_scn
+
+    def _select(self, where: str = "", params: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[tuple]]:
+        """Select AI_USERS rows (all columns plus ORA_ROWSCN) in one round trip."""
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.arraysize = 1000
+            cursor.prefetchrows = 1000
+            cursor.execute(f"SELECT u.*, ORA_ROWSCN FROM AI_USERS u {where}", params or {})
+            columns = [desc[0].upper() for desc in cursor.description]
+            rows = cursor.fetchall()
+            cursor.close()
+            return columns, rows
+        finally:
+            connection.close()
+
+    def load(self):
+        """
+        Bulk-load the whole AI_USERS table, replacing the in-memory copy.
+
+        Raises:
+            oracledb.Error: If the table cannot be read
+        """
+        start = time.perf_counter()
+        columns, rows = self._select()
+        records, max_scn = self._parse_rows(columns, rows)
+        with self._lock:
+            self._users = records
+            self._filter_columns = [c for c in columns[:-1] if c not in STANDARD_COLUMNS]
+            self._last_scn = max_scn
+            self._loaded = True
+            self._full_loads += 1
+            self._last_refresh_ms = round((time.perf_counter() - start) * 1000, 3)
+            self._last_refresh_at = time.time()
+        self._unknown_users.clear()
+        logger.info(
+            f"UserDirectory: Loaded {len(records)} users, "
+            f"filter columns {self._filter_columns} in {self._last_refresh_ms}ms"
+        )
+
+    def refresh(self):
+        """
+        Apply changes made since the last load.
+
+        Rows with ORA_ROWSCN above the last seen SCN are upserted (ORA_ROWSCN
+        is block-granular unless the table uses ROWDEPENDENCIES, so a few
+        unchanged rows may be re-read). Deleted users are dropped by comparing
+        usernames. A change to the table's columns forces a full reload.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # A refresh is already running
+        try:
+            if not self._loaded:
+                self.load()
+                return
+
+            start = time.perf_counter()
+            columns, rows = self._select("WHERE ORA_ROWSCN > :scn", {"scn": self._last_scn})
+            if [c for c in columns[:-1] if c not in STANDARD_COLUMNS] != self._filter_columns:
+                logger.info("UserDirectory: AI_USERS columns changed, reloading")
+                self.load()
+                return
+            changed, max_scn = self._parse_rows(columns, rows)
+
+            connection = self._get_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.arraysize = 1000
+                cursor.execute("SELECT UPPER(USERNAME) FROM AI_USERS WHERE USERNAME IS NOT NULL")
+                present = {row[0] for row in cursor.fetchall()}
+                cursor.close()
+            finally:
+                connection.close()
+
+            with self._lock:
+                users = {k: v for k, v in self._users.items() if k in present}
+                removed = len(self._users) - len(users)
+                users.update(changed)
+                self._users = users
+                self._last_scn = max(self._last_scn, max_scn)
+                self._incremental_refreshes += 1
+                self._rows_refreshed += len(changed)
+                self._last_refresh_ms = round((time.perf_counter() - start) * 1000, 3)
+                self._last_refresh_at = time.time()
+
+            if changed:
+                # Users added since the lookup that missed them
+                self._unknown_users.clear()
+            if changed or removed:
+                logger.info(f"UserDirectory: Refreshed {len(changed)} users, removed {removed}")
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, username: str) -> Optional[UserRecord]:
+        """
+        Look up a user.
+
+        Args:
+            username: The username (case-insensitive)
+
+        Returns:
+            The user's record, or None if the user is not in AI_USERS
+
+        Raises:
+            oracledb.Error: If a database lookup is needed and fails
+        """
+        key = username.upper()
+        with self._lock:
+            record = self._users.get(key)
+        if record is not None:
+            return record
+        if self._unknown_users.get(key):
+            return None
+
+        # Not in memory: the user may have been added since the last refresh
+        self._point_lookups += 1
+        columns, rows = self._select("WHERE UPPER(USERNAME) = :username", {"username": key})
+        records, _ = self._parse_rows(columns, rows)
+        record = records.get(key)
+        if record is not None:
+            with self._lock:
+                self._users[key] = record
+        else:
+            self._unknown_users.set(key, True)
+        return record
+
+    def _on_change(self, message):
+        """CQN callback: forget unknown users and wake the refresh thread."""
+        self._notifications += 1
+        self._unknown_users.clear()
+        self._wake.set()
+
+    def _register_cqn(self):
+        """Register a Continuous Query Notification on AI_USERS."""
+        try:
+            self._cqn_connection = oracledb.connect(
+                user=self.oracle_config.user,
+                password=self.oracle_config.password,
+                dsn=self.oracle_config.dsn,
+                events=True
+            )
+            self._subscription = self._cqn_connection.subscribe(
+                namespace=oracledb.SUBSCR_NAMESPACE_DBCHANGE,
+                qos=oracledb.SUBSCR_QOS_QUERY | oracledb.SUBSCR_QOS_RELIABLE,
+                callback=self._on_change
+            )
+            self._subscription.registerquery("SELECT USERNAME FROM AI_USERS")
+            logger.info("UserDirectory: Registered change notification on AI_USERS")
+        except (oracledb.Error, AttributeError) as e:
+            logger.warning(f"UserDirectory: Change notification unavailable, using scheduled refresh: {e}")
+            self._subscription = None
+            if self._cqn_connection is not None:
+                self._cqn_connection.close()
+                self._cqn_connection = None
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.refresh_interval or None)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except oracledb.Error as e:
+                logger.error(f"UserDirectory: Refresh failed: {e}")
+
+    def start(self):
+        """
+        Load the directory and start background refresh.
+
+        A failed initial load is logged, not raised: lookups then fall back
+        to per-user queries and the refresh thread retries the bulk load.
+        """
+        try:
+            self.load()
+        except oracledb.Error as e:
+            logger.error(f"UserDirectory: Initial load failed: {e}")
+
+        if self.use_cqn:
+            self._register_cqn()
+
+        if self._thread is None and (self.refresh_interval > 0 or self._subscription is not None):
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name="user-directory-refresh",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop background refresh and drop the change notification."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._cqn_connection is not None:
+            try:
+                if self._subscription is not None:
+                    self._cqn_connection.unsubscribe(self._subscription)
+            except oracledb.Error:
+                pass
+            self._cqn_connection.close()
+            self._cqn_connection = None
+            self._subscription = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get directory statistics for monitoring.
+
+        Returns:
+            Dictionary with user count, refresh counters and timings
+        """
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "users": len(self._users),
+                "filter_columns": list(self._filter_columns),
+                "last_scn": self._last_scn,
+                "full_loads": self._full_loads,
+                "incremental_refreshes": self._incremental_refreshes,
+                "rows_refreshed": self._rows_refreshed,
+                "point_lookups": self._point_lookups,
+                "unknown_users": self._unknown_users.stats(),
+                "change_notifications": self._notifications,
+                "cqn_registered": self._subscription is not None,
+                "last_refresh_ms": self._last_refresh_ms,
+                "last_refresh_at": self._last_refresh_at,
+            }
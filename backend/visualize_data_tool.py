@@ -0,0 +1,118 @@
+"""
+Visualize Data Tool for Database Chat Application.
+
+This module extends Vanna's VisualizeDataTool to read the Arrow IPC result
+files written by run_sql. The file is memory-mapped and the chart's
+DataFrame is built straight from its columns instead of re-parsing a CSV.
+CSV files (e.g. written with write_file) are still handled by the base tool.
+"""
+
+import logging
+from typing import Optional, Type
+
+from pydantic import Field
+from vanna.core.tool import ToolContext, ToolResult
+from vanna.components import (
+    UiComponent,
+    ChartComponent,
+    NotificationComponent,
+    ComponentType,
+    SimpleTextComponent,
+)
+from vanna.tools import VisualizeDataTool
+from vanna.tools.visualize_data import VisualizeDataArgs
+
+from .result_files import ARROW_EXTENSION, ResultFileSystem
+
+logger = logging.getLogger(__name__)
+
+
+class VisualizeResultArgs(VisualizeDataArgs):
+    """Arguments for the visualize_data tool."""
+    filename: str = Field(description="Name of the result file to visualize (.arrow from run_sql, or .csv)")
+
+
+class ArrowVisualizeDataTool(VisualizeDataTool):
+    """VisualizeDataTool that reads memory-mapped Arrow result files."""
+
+    def __init__(self, file_system: Optional[ResultFileSystem] = None, plotly_generator=None):
+        """
+        Initialize the tool.
+
+        Args:
+            file_system: ResultFileSystem for reading result files
+            plotly_generator: Optional PlotlyChartGenerator
+        """
+        super().__init__(file_system=file_system or ResultFileSystem(), plotly_generator=plotly_generator)
+
+    @property
+    def description(self) -> str:
+        return (
+            "Create a visualization from a query result file (the .arrow file saved by run_sql, "
+            "or a CSV file). The tool automatically selects an appropriate chart type based on the data."
+        )
+
+    def get_args_schema(self) -> Type[VisualizeResultArgs]:
+        return VisualizeResultArgs
+
+    async def execute(self, context: ToolContext, args: VisualizeDataArgs) -> ToolResult:
+        """Generate a visualization; Arrow files are memory-mapped, others use the base tool."""
+        if not args.filename.lower().endswith(ARROW_EXTENSION):
+            return await super().execute(context, args)
+
+        try:
+            table = await self.file_system.read_table(args.filename, context)
+            df = table.to_pandas()
+            title = args.title or f"Visualization of {args.filename}"
+            chart_dict = self.plotly_generator.generate_chart(df, title)
+        except FileNotFoundError as e:
+            return self._error(f"File not found: {args.filename}", e, "file_not_found")
+        except ValueError as e:
+            return self._error(f"Cannot visualize data: {str(e)}", e, "visualization_error")
+        except Exception as e:
+            logger.error(f"Unexpected error creating visualization for {args.filename}", exc_info=True)
+            return self._error(f"Error creating visualization: {str(e)}", e, "general_error")
+
+        row_count, col_count = table.num_rows, table.num_columns
+        result = f"Created visualization from '{args.filename}' ({row_count} rows, {col_count} columns)."
+        chart_component = ChartComponent(
+            chart_type="plotly",
+            data=chart_dict,
+            title=title,
+            config={
+                "data_shape": {"rows": row_count, "columns": col_count},
+                "source_file": args.filename,
+            },
+        )
+        return ToolResult(
+            success=True,
+            result_for_llm=result,
+            ui_component=UiComponent(
+                rich_component=chart_component,
+                simple_component=SimpleTextComponent(text=result),
+            ),
+            metadata={
+                "filename": args.filename,
+                "rows": row_count,
+                "columns": col_count,
+                "chart": chart_dict,
+            },
+        )
+
+    def _error(self, message: str, error: Exception, error_type: str) -> ToolResult:
+        """Build a failed ToolResult with an error notification."""
+        logger.error(f"ArrowVisualizeDataTool: {message}")
+        return ToolResult(
+            success=False,
+            result_for_llm=message,
+            ui_component=UiComponent(
+                rich_component=NotificationComponent(
+                    type=ComponentType.NOTIFICATION,
+                    level="error",
+                    message=message,
+                ),
+                simple_component=SimpleTextComponent(text=message),
+            ),
+            error=str(error),
+            metadata={"error_type": error_type},
+        )
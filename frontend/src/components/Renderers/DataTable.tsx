@@ -1,22 +1,34 @@
-import { useState, useMemo } from 'react';
+import { useState, useMemo, useEffect } from 'react';
+import { apiClient } from '@/services/api-client';
 
 interface Props {
     data: any[];
     columns: string[];
     maxRows?: number;
+    // Server-side result: data holds the first page, the rest is paged via /api/results
+    resultId?: string;
+    rowCount?: number;
 }
 
 type SortDirection = 'asc' | 'desc' | null;
 
 /**
  * DataTable Component
- * 
+ *
  * Displays tabular data with:
  * - Column sorting
  * - Row limiting with "show more"
+ * - Server-side paging, sorting and filtering for stored results
  * - Responsive design
  */
-export default function DataTable({ data, columns, maxRows = 10 }: Props) {
+export default function DataTable(props: Props) {
+    if (props.resultId) {
+        return <ServerDataTable {...props} resultId={props.resultId} />;
+    }
+    return <LocalDataTable {...props} />;
+}
+
+function LocalDataTable({ data, columns, maxRows = 10 }: Props) {
     const [sortColumn, setSortColumn] = useState<string | null>(null);
     const [sortDirection, setSortDirection] = useState<SortDirection>(null);
     const [showAll, setShowAll] = useState(false);
@@ -42,66 +54,24 @@ export default function DataTable({ data, columns, maxRows = 10 }: Props) {
     const displayData = showAll ? sortedData : sortedData.slice(0, maxRows);
 
     const handleSort = (column: string) => {
-        if (sortColumn === column) {
-            // Cycle through: asc -> desc -> null
-            setSortDirection(
-                sortDirection === 'asc' ? 'desc' : sortDirection === 'desc' ? null : 'asc'
-            );
-            if (sortDirection === 'desc') setSortColumn(null);
-        } else {
-            setSortColumn(column);
-            setSortDirection('asc');
-        }
+        const next = nextSort(sortColumn, sortDirection, column);
+        setSortColumn(next.column);
+        setSortDirection(next.direction);
     };
 
     if (!data || data.length === 0) {
-        return (
-            <div className="bg-gray-50 border border-gray-200 rounded-lg p-4 text-center text-gray-500">
-                No data to display
-            </div>
-        );
+        return <EmptyTable />;
     }
 
     return (
         <div className="my-4">
-            <div className="overflow-x-auto rounded-lg border border-gray-200 shadow-sm">
-                <table className="min-w-full divide-y divide-gray-200">
-                    <thead className="bg-gray-50">
-                        <tr>
-                            {columns.map((column) => (
-                                <th
-                                    key={column}
-                                    onClick={() => handleSort(column)}
-                                    className="px-6 py-3 text-left text-xs font-medium text-gray-700 uppercase tracking-wider cursor-pointer hover:bg-gray-100 transition select-none"
-                                >
-                                    <div className="flex items-center gap-2">
-                                        <span>{column}</span>
-                                        {sortColumn === column && (
-                                            <span className="text-vanna-teal">
-                                                {sortDirection === 'asc' ? '↑' : '↓'}
-                                            </span>
-                                        )}
-                                    </div>
-                                </th>
-                            ))}
-                        </tr>
-                    </thead>
-                    <tbody className="bg-white divide-y divide-gray-200">
-                        {displayData.map((row, idx) => (
-                            <tr key={idx} className="hover:bg-gray-50 transition">
-                                {columns.map((column) => (
-                                    <td
-                                        key={column}
-                                        className="px-6 py-4 whitespace-nowrap text-sm text-gray-900"
-                                    >
-                                        {row[column] != null ? String(row[column]) : <span className="text-gray-400">—</span>}
-                                    </td>
-                                ))}
-                            </tr>
-                        ))}
-                    </tbody>
-                </table>
-            </div>
+            <TableView
+                columns={columns}
+                rows={displayData}
+                sortColumn={sortColumn}
+                sortDirection={sortDirection}
+                onSort={handleSort}
+            />
 
             {/* Show more/less button */}
             {data.length > maxRows && (
@@ -126,3 +96,200 @@ export default function DataTable({ data, columns, maxRows = 10 }: Props) {
         </div>
     );
 }
+
+/**
+ * Table for a result kept on the server. Pages inside the first page sent
+ * with the message are rendered locally; other pages, sorting and filtering
+ * are requested from /api/results/<id>.
+ */
+function ServerDataTable({ data, columns, maxRows = 10, resultId, rowCount }: Props & { resultId: string }) {
+    const [sortColumn, setSortColumn] = useState<string | null>(null);
+    const [sortDirection, setSortDirection] = useState<SortDirection>(null);
+    const [filterInput, setFilterInput] = useState('');
+    const [filter, setFilter] = useState('');
+    const [offset, setOffset] = useState(0);
+    const [rows, setRows] = useState<any[]>(data.slice(0, maxRows));
+    const [total, setTotal] = useState(rowCount ?? data.length);
+    const [loading, setLoading] = useState(false);
+    const [error, setError] = useState<string | null>(null);
+
+    const sort = sortColumn && sortDirection
+        ? (sortDirection === 'desc' ? `-${sortColumn}` : sortColumn)
+        : '';
+
+    // Debounce filter typing
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setFilter(filterInput.trim());
+            setOffset(0);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [filterInput]);
+
+    useEffect(() => {
+        // The unsorted, unfiltered first page arrived with the message
+        if (!sort && !filter && offset + maxRows <= data.length) {
+            setRows(data.slice(offset, offset + maxRows));
+            setTotal(rowCount ?? data.length);
+            setError(null);
+            return;
+        }
+
+        let cancelled = false;
+        setLoading(true);
+        apiClient
+            .getResultPage(resultId, {
+                offset,
+                limit: maxRows,
+                sort: sort || undefined,
+                filter: filter || undefined,
+            })
+            .then((page) => {
+                if (cancelled) return;
+                setRows(page.rows);
+                setTotal(page.total_rows);
+                setError(null);
+            })
+            .catch((e: Error) => {
+                if (!cancelled) setError(e.message);
+            })
+            .finally(() => {
+                if (!cancelled) setLoading(false);
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [resultId, data, rowCount, maxRows, offset, sort, filter]);
+
+    const handleSort = (column: string) => {
+        const next = nextSort(sortColumn, sortDirection, column);
+        setSortColumn(next.column);
+        setSortDirection(next.direction);
+        setOffset(0);
+    };
+
+    const lastOffset = Math.max(0, Math.floor((total - 1) / maxRows) * maxRows);
+
+    return (
+        <div className="my-4">
+            <div className="mb-2 flex items-center justify-between gap-2">
+                <input
+                    type="text"
+                    value={filterInput}
+                    onChange={(e) => setFilterInput(e.target.value)}
+                    placeholder="Filter rows (or COLUMN:text)"
+                    className="px-3 py-1 text-sm border border-gray-200 rounded-lg w-64 focus:outline-none focus:border-vanna-teal"
+                />
+                {loading && <span className="text-xs text-gray-500">Loading…</span>}
+            </div>
+
+            {error ? (
+                <div className="bg-red-50 border border-red-200 rounded-lg p-4 text-center text-red-600 text-sm">
+                    {error}
+                </div>
+            ) : rows.length === 0 ? (
+                <EmptyTable />
+            ) : (
+                <TableView
+                    columns={columns}
+                    rows={rows}
+                    sortColumn={sortColumn}
+                    sortDirection={sortDirection}
+                    onSort={handleSort}
+                />
+            )}
+
+            {/* Paging */}
+            <div className="mt-3 flex items-center justify-center gap-4 text-sm">
+                <button
+                    onClick={() => setOffset(Math.max(0, offset - maxRows))}
+                    disabled={offset === 0 || loading}
+                    className="px-3 py-1 text-vanna-teal hover:text-vanna-navy transition font-medium disabled:text-gray-300"
+                >
+                    Previous
+                </button>
+                <span className="text-xs text-gray-500">
+                    Rows {total === 0 ? 0 : offset + 1}–{Math.min(offset + maxRows, total)} of {total}
+                </span>
+                <button
+                    onClick={() => setOffset(Math.min(lastOffset, offset + maxRows))}
+                    disabled={offset >= lastOffset || loading}
+                    className="px-3 py-1 text-vanna-teal hover:text-vanna-navy transition font-medium disabled:text-gray-300"
+                >
+                    Next
+                </button>
+            </div>
+        </div>
+    );
+}
+
+// Cycle through: asc -> desc -> none
+function nextSort(
+    sortColumn: string | null,
+    sortDirection: SortDirection,
+    column: string
+): { column: string | null; direction: SortDirection } {
+    if (sortColumn !== column) return { column, direction: 'asc' };
+    if (sortDirection === 'asc') return { column, direction: 'desc' };
+    if (sortDirection === 'desc') return { column: null, direction: null };
+    return { column, direction: 'asc' };
+}
+
+function EmptyTable() {
+    return (
+        <div className="bg-gray-50 border border-gray-200 rounded-lg p-4 text-center text-gray-500">
+            No data to display
+        </div>
+    );
+}
+
+interface TableViewProps {
+    columns: string[];
+    rows: any[];
+    sortColumn: string | null;
+    sortDirection: SortDirection;
+    onSort: (column: string) => void;
+}
+
+function TableView({ columns, rows, sortColumn, sortDirection, onSort }: TableViewProps) {
+    return (
+        <div className="overflow-x-auto rounded-lg border border-gray-200 shadow-sm">
+            <table className="min-w-full divide-y divide-gray-200">
+                <thead className="bg-gray-50">
+                    <tr>
+                        {columns.map((column) => (
+                            <th
+                                key={column}
+                                onClick={() => onSort(column)}
+                                className="px-6 py-3 text-left text-xs font-medium text-gray-700 uppercase tracking-wider cursor-pointer hover:bg-gray-100 transition select-none"
+                            >
+                                <div className="flex items-center gap-2">
+                                    <span>{column}</span>
+                                    {sortColumn === column && (
+                                        <span className="text-vanna-teal">
+                                            {sortDirection === 'asc' ? '↑' : '↓'}
+                                        </span>
+                                    )}
+                                </div>
+                            </th>
+                        ))}
+                    </tr>
+                </thead>
+                <tbody className="bg-white divide-y divide-gray-200">
+                    {rows.map((row, idx) => (
+                        <tr key={idx} className="hover:bg-gray-50 transition">
+                            {columns.map((column) => (
+                                <td
+                                    key={column}
+                                    className="px-6 py-4 whitespace-nowrap text-sm text-gray-900"
+                                >
+                                    {row[column] != null ? String(row[column]) : <span className="text-gray-400">—</span>}
+                                </td>
+                            ))}
+                        </tr>
+                    ))}
+                </tbody>
+            </table>
+        </div>
+    );
+}
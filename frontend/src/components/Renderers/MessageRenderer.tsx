@@ -38,7 +38,14 @@ function ContentItem({ content }: { content: MessageContent }) {
             return <CodeBlock code={content.code} language={content.language} />;
 
         case 'dataframe':
-            return <DataTable data={content.data} columns={content.columns} />;
+            return (
+                <DataTable
+                    data={content.data}
+                    columns={content.columns}
+                    resultId={content.resultId}
+                    rowCount={content.rowCount}
+                />
+            );
 
         case 'plotly':
             return <PlotlyChart data={content.data} layout={content.layout} />;
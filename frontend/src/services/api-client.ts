@@ -7,6 +7,8 @@ import type {
     RequestContext,
     UIConfig,
     ApiError,
+    ResultPage,
+    ResultPageParams,
 } from '@/types';
 
 /**
@@ -83,8 +85,13 @@ class ApiClient {
     }
 
     logout(): void {
-        this.clearAuth();
-        window.location.href = '/login';
+        // Clear the HttpOnly session token cookie on the server before leaving
+        this.client.post('/api/vanna/v2/logout')
+            .catch(() => undefined)
+            .finally(() => {
+                this.clearAuth();
+                window.location.href = '/login';
+            });
     }
 
     // ===== Streaming Chat (SSE) =====
@@ -227,6 +234,26 @@ class ApiClient {
         }
     }
 
+    // ===== Query Results =====
+
+    /**
+     * Fetch one page of a server-side query result (sorted/filtered by the server)
+     */
+    async getResultPage(resultId: string, params: ResultPageParams): Promise<ResultPage> {
+        try {
+            const response = await this.client.get<ResultPage>(
+                `/api/results/${encodeURIComponent(resultId)}`,
+                { params }
+            );
+            return response.data;
+        } catch (error) {
+            const axiosError = error as AxiosError<ApiError>;
+            throw new Error(
+                axiosError.response?.data?.error || 'Failed to load results'
+            );
+        }
+    }
+
     // ===== Configuration =====
 
     async getConfig(): Promise<UIConfig> {
@@ -85,6 +85,8 @@ export interface AuthResponse {
     email: string;
     groups: string[];
     is_admin: boolean;
+    session_token?: string | null;
+    expires_in?: number | null;
 }
 
 // ===== Message Types =====
@@ -142,6 +144,9 @@ export interface DataFrameContent {
     type: 'dataframe';
     data: any[];
     columns: string[];
+    // Set when the full result is kept server-side (first page in data)
+    resultId?: string;
+    rowCount?: number;
 }
 
 export interface PlotlyContent {
@@ -220,6 +225,28 @@ export interface UIConfig {
     loggedInPrefix?: string;
 }
 
+// ===== Result Page Types =====
+
+export interface ResultPageParams {
+    offset: number;
+    limit: number;
+    sort?: string;    // "COL", "-COL" (descending), comma-separated
+    filter?: string;  // substring, or "COL:text" for one column
+}
+
+export interface ResultPage {
+    result_id: string;
+    columns: string[];
+    column_types: Record<string, string>;
+    row_count: number;
+    total_rows: number;  // rows matching the filter
+    truncated: boolean;
+    offset: number;
+    limit: number;
+    rows: any[];
+    expires_in: number;
+}
+
 // ===== Connection Types =====
 
 export type ConnectionStatus = 'connected' | 'connecting' | 'disconnected';
@@ -1,6 +1,7 @@
 import type {
     ChatStreamChunk,
     AssistantMessage,
+    DataFrameContent,
     MessageContent,
     ToolExecution,
     VannaComponent,
@@ -141,11 +142,7 @@ export class ChunkReducer {
             case 'dataframe':
             case 'table':
                 // Table content
-                this.messageBuffer.content!.push({
-                    type: 'dataframe',
-                    data: chunk.data || [],
-                    columns: chunk.columns || [],
-                });
+                this.messageBuffer.content!.push(this.toDataFrameContent(chunk));
                 break;
 
             case 'plotly':
@@ -205,6 +202,21 @@ export class ChunkReducer {
         }
     }
 
+    /**
+     * Build table content; server-side results carry their first page in
+     * `rows` and the result id in `data.result_id`
+     */
+    private toDataFrameContent(table: any): DataFrameContent {
+        const rows = table.rows || (Array.isArray(table.data) ? table.data : []);
+        return {
+            type: 'dataframe',
+            data: rows,
+            columns: table.columns || [],
+            resultId: table.data?.result_id,
+            rowCount: table.row_count ?? rows.length,
+        };
+    }
+
     /**
      * Process rich content object from chunk (legacy format)
      */
@@ -228,11 +240,7 @@ export class ChunkReducer {
 
             case 'dataframe':
             case 'table':
-                this.messageBuffer.content!.push({
-                    type: 'dataframe',
-                    data: rich.data || [],
-                    columns: rich.columns || [],
-                });
+                this.messageBuffer.content!.push(this.toDataFrameContent(rich));
                 break;
 
             case 'plotly':
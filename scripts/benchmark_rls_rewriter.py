@@ -0,0 +1,74 @@
+"""
+Benchmark the single-pass RLS rewriter.
+
+Builds queries of growing size (CTEs, UNION ALL branches, inline views and
+correlated subqueries), rewrites each one several times and prints the cost
+per character. For a linear rewriter the last column stays roughly flat as
+the SQL grows.
+
+Usage:
+    python scripts/benchmark_rls_rewriter.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.rls_rewriter import rewrite
+
+FILTER_COLUMNS = {
+    "EMPLOYEES": ["EMPLOYEE_ID"],
+    "SALARIES": ["EMPLOYEE_ID"],
+    "DEPARTMENTS": ["DEPARTMENT_ID"],
+}
+
+
+def matching_columns(table_name):
+    return FILTER_COLUMNS.get(table_name, [])
+
+
+def build_query(branches):
+    """Build a query with one CTE and `branches` UNION ALL branches."""
+    cte = (
+        "WITH recent AS (SELECT employee_id, amount FROM salaries s "
+        "WHERE s.paid_on > SYSDATE - 30)"
+    )
+    parts = []
+    for i in range(branches):
+        parts.append(
+            f"SELECT e.employee_id, e.name, r.amount, "
+            f"(SELECT MAX(amount) FROM salaries x WHERE x.employee_id = e.employee_id) max_amount "
+            f"FROM employees e JOIN recent r ON r.employee_id = e.employee_id "
+            f"JOIN (SELECT department_id, name FROM departments WHERE active = 1) d "
+            f"ON d.department_id = e.department_id "
+            f"WHERE e.grade = {i} OR EXISTS (SELECT 1 FROM departments d2 "
+            f"WHERE d2.manager_id = e.employee_id)"
+        )
+    return cte + " " + " UNION ALL ".join(parts) + " ORDER BY 1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Rewrites per query size")
+    args = parser.parse_args()
+
+    print(f"{'branches':>8} {'chars':>8} {'binds':>6} {'ms/rewrite':>11} {'us/char':>8}")
+    for branches in (1, 2, 4, 8, 16, 32, 64, 128):
+        sql = build_query(branches)
+        rewritten, binds = rewrite(sql, matching_columns)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            rewrite(sql, matching_columns)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(
+            f"{branches:>8} {len(sql):>8} {len(binds):>6} "
+            f"{elapsed * 1000:>11.3f} {elapsed * 1e6 / len(sql):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Check the RLS rewriter against example queries.
+
+Each case is a query and the SQL the rewriter is expected to produce for a
+NORMALUSER filtered on EMPLOYEE_ID / DEPARTMENT_ID. Prints one line per
+case and exits non-zero if any rewrite differs.
+
+Usage:
+    python scripts/check_rls_rewriter.py
+"""
+
+import os
+import sys
+
+# Add parent to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.rls_rewriter import rewrite
+
+FILTER_COLUMNS = {
+    "EMPLOYEES": ["EMPLOYEE_ID"],
+    "DEPARTMENTS": ["DEPARTMENT_ID"],
+}
+
+CASES = [
+    (
+        "plain table with alias",
+        "SELECT e.name FROM employees e",
+        "SELECT e.name FROM employees e WHERE (E.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "existing WHERE with OR",
+        "SELECT name FROM employees WHERE a = 1 OR b = 2",
+        "SELECT name FROM employees WHERE (a = 1 OR b = 2) AND (EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "flashback AS OF TIMESTAMP with alias",
+        "SELECT e.name FROM employees AS OF TIMESTAMP SYSTIMESTAMP - INTERVAL '1' HOUR e",
+        "SELECT e.name FROM employees AS OF TIMESTAMP SYSTIMESTAMP - INTERVAL '1' HOUR e "
+        "WHERE (E.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "flashback AS OF SCN without alias",
+        "SELECT name FROM employees AS OF SCN :scn WHERE grade = 3",
+        "SELECT name FROM employees AS OF SCN :scn WHERE (grade = 3) "
+        "AND (EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "flashback AS OF TIMESTAMP literal in a join",
+        "SELECT e.name FROM employees AS OF TIMESTAMP TIMESTAMP '2024-01-01 00:00:00' e "
+        "JOIN departments d ON d.department_id = e.department_id",
+        "SELECT e.name FROM employees AS OF TIMESTAMP TIMESTAMP '2024-01-01 00:00:00' e "
+        "JOIN departments d ON d.department_id = e.department_id "
+        "WHERE (D.DEPARTMENT_ID = :rls_department_id AND E.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "flashback VERSIONS BETWEEN",
+        "SELECT v.name FROM employees VERSIONS BETWEEN SCN MINVALUE AND MAXVALUE v",
+        "SELECT v.name FROM employees VERSIONS BETWEEN SCN MINVALUE AND MAXVALUE v "
+        "WHERE (V.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "database link without alias",
+        "SELECT name FROM employees@hr_link",
+        "SELECT name FROM employees@hr_link WHERE (EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "database link with alias",
+        "SELECT e.name FROM hr.employees@hr_link.example.com e",
+        "SELECT e.name FROM hr.employees@hr_link.example.com e WHERE (E.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "database link with flashback",
+        "SELECT name FROM employees@hr_link AS OF SCN 1234",
+        "SELECT name FROM employees@hr_link AS OF SCN 1234 WHERE (EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "CTE name not filtered",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM employees",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM employees",
+    ),
+    (
+        "schema-qualified table sharing a CTE name",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM hr.employees",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM hr.employees "
+        "WHERE (HR.EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+    (
+        "database link table sharing a CTE name",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM employees@hr_link",
+        "WITH employees AS (SELECT 1 x FROM dual) SELECT * FROM employees@hr_link "
+        "WHERE (EMPLOYEES.EMPLOYEE_ID = :rls_employee_id)",
+    ),
+]
+
+
+def matching_columns(table_name):
+    return FILTER_COLUMNS.get(table_name, [])
+
+
+def main():
+    failed = 0
+    for name, sql, expected in CASES:
+        rewritten, _ = rewrite(sql, matching_columns)
+        if rewritten == expected:
+            print(f"ok    {name}")
+        else:
+            failed += 1
+            print(f"FAIL  {name}\n      expected: {expected}\n      got:      {rewritten}")
+    print(f"{len(CASES) - failed}/{len(CASES)} passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())